@@ -0,0 +1,50 @@
+import random
+import tempfile
+import time
+
+from irfold import IRfoldEngine
+
+if __name__ == "__main__":
+
+    # Folding over all IRs exhausts memory for sequences much longer than 400 nt, see benchmark_mwis.py
+    n_seqs = 3
+    min_stem_len = 6
+    random.seed(0)
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        engine = IRfoldEngine(
+            out_dir,
+            ir_search_backend="watson_crick",
+            approx_energies=True,
+            solver_params={"max_time_in_seconds": 60.0},
+        )
+
+        for seq_len in [200, 400, 1000, 2000, 4000]:
+            seqs = [
+                "".join(random.choice("ACGU") for _ in range(seq_len))
+                for _ in range(n_seqs)
+            ]
+            for seq in seqs:  # IR search is excluded from the fold times
+                engine.find_irs(seq)
+
+            print(f"Sequence length           : {seq_len}")
+            print(
+                f"Mean IRs found            : {sum(len(engine.find_irs(seq)) for seq in seqs) / n_seqs:.0f}"
+            )
+            if seq_len <= 400:
+                start = time.perf_counter()
+                obj_fn_values = [engine.fold(seq)[1] for seq in seqs]
+                print(f"Full objective values     : {obj_fn_values}")
+                print(
+                    f"Full mean fold time (s)   : {(time.perf_counter() - start) / n_seqs:.3f}"
+                )
+
+            start = time.perf_counter()
+            obj_fn_values = [
+                engine.fold_coarse_to_fine(seq, min_stem_len=min_stem_len)[1]
+                for seq in seqs
+            ]
+            print(f"Coarse to fine obj values : {obj_fn_values}")
+            print(
+                f"Coarse to fine time (s)   : {(time.perf_counter() - start) / n_seqs:.3f}\n"
+            )
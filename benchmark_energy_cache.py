@@ -0,0 +1,88 @@
+import random
+import tempfile
+import time
+
+from irfold import IRfold, IRfoldEngine
+from irfold.util import (
+    LocalEnergyCache,
+    calc_ir_free_energies,
+    calc_ir_free_energies_cached,
+)
+
+
+def random_seq(seq_len):
+    return "".join(random.choice("ACGU") for _ in range(seq_len))
+
+
+if __name__ == "__main__":
+
+    # A gene family: transcripts diverged from a common ancestor by point substitutions at 5% of positions, except
+    # within the hairpins conserved across the family
+    n_seqs = 20
+    random.seed(0)
+    conserved_hairpins = [
+        "GGCUAGCGCAUUCGCGCUAGCC",
+        "GCCGAUGGAAACAUCGGC",
+        "CUGCGCUUCGGCGCAG",
+    ]
+    ancestor, conserved_positions = random_seq(40), set()
+    for hairpin in conserved_hairpins:
+        ancestor += random_seq(2)
+        conserved_positions.update(range(len(ancestor), len(ancestor) + len(hairpin)))
+        ancestor += hairpin + random_seq(20)
+    seqs = [
+        "".join(
+            (
+                random.choice("ACGU")
+                if pos not in conserved_positions and random.random() < 0.05
+                else base
+            )
+            for pos, base in enumerate(ancestor)
+        )
+        for _ in range(n_seqs)
+    ]
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        energy_cache = LocalEnergyCache()
+        engines = {
+            "no cache": IRfoldEngine(out_dir),
+            "local energy cache": IRfoldEngine(out_dir, energy_cache=energy_cache),
+        }
+
+        print(f"Sequences : {n_seqs} of mean length {sum(map(len, seqs)) / n_seqs:.0f}")
+        results = {}
+        for name, engine in engines.items():
+            for seq in seqs:  # IR search is excluded from the batch times
+                engine.find_irs(seq)
+            start = time.perf_counter()
+            results[name] = engine.fold_batch(seqs, n_solve_workers=1)
+            print(f"{name:<19}: {time.perf_counter() - start:.3f} s")
+
+        assert results["no cache"] == results["local energy cache"]
+
+        # Energy evaluation alone, with a fresh cache
+        found_irs = [engines["no cache"].find_irs(seq) for seq in seqs]
+        start = time.perf_counter()
+        for seq, irs in zip(seqs, found_irs):
+            IRfold._get_ir_coefficients(irs, len(seq), seq, out_dir, "seq")
+        print(
+            f"Energy evaluation, per IR structure   : {time.perf_counter() - start:.3f} s"
+        )
+        start = time.perf_counter()
+        for seq, irs in zip(seqs, found_irs):
+            calc_ir_free_energies(irs, seq)
+        print(
+            f"Energy evaluation, per sequence       : {time.perf_counter() - start:.3f} s"
+        )
+        family_cache = LocalEnergyCache()
+        start = time.perf_counter()
+        for seq, irs in zip(seqs, found_irs):
+            calc_ir_free_energies_cached(irs, seq, family_cache)
+        print(
+            f"Energy evaluation, local energy cache : {time.perf_counter() - start:.3f} s"
+        )
+        stats = energy_cache.stats()
+        print(
+            f"Energy cache hits {stats['hits']}, misses {stats['misses']}, entries {stats['entries']}, "
+            f"hit rate {100 * energy_cache.hit_rate:.1f}%"
+        )
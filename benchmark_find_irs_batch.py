@@ -0,0 +1,40 @@
+import random
+import tempfile
+import time
+
+from irfold import IRfold
+
+if __name__ == "__main__":
+
+    n_seqs = 200
+    random.seed(0)
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        for min_len, max_len in [(20, 40), (70, 90), (110, 130)]:
+            seqs = [
+                "".join(
+                    random.choice("ACGU")
+                    for _ in range(random.randint(min_len, max_len))
+                )
+                for _ in range(n_seqs)
+            ]
+
+            start = time.perf_counter()
+            per_seq_irs = [
+                IRfold._find_irs(seq, out_dir, seq_name=f"seq_{i}")
+                for i, seq in enumerate(seqs)
+            ]
+            per_seq_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            batch_irs = IRfold._find_irs_batch(seqs, out_dir)
+            batch_time = time.perf_counter() - start
+
+            n_matching = sum(
+                sorted(a) == sorted(b) for a, b in zip(per_seq_irs, batch_irs)
+            )
+
+            print(f"Sequence lengths           : {min_len}-{max_len}")
+            print(f"One process per sequence   : {n_seqs / per_seq_time:.1f} seqs/s")
+            print(f"Packed (_find_irs_batch)   : {n_seqs / batch_time:.1f} seqs/s")
+            print(f"Sequences with equal IRs   : {n_matching}/{n_seqs}\n")
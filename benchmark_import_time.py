@@ -0,0 +1,33 @@
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+IMPORT_STATEMENTS = [
+    "import irfold",
+    "from irfold.util import ir_pair_invalid_relative_pos, irs_to_dot_bracket",
+    f"from irfold import IRfold; IRfold.fold('GGGAAACCC', {tempfile.gettempdir()!r})",
+]
+
+if __name__ == "__main__":
+
+    n_repeats = 5
+
+    for import_statement in IMPORT_STATEMENTS:
+        # Each measurement is a fresh interpreter, as a newly started worker would be
+        run_times = []
+        for _ in range(n_repeats):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", import_statement], check=True)
+            run_times.append(time.perf_counter() - start)
+
+        print(f"Statement             : {import_statement}")
+        print(f"Median wall time (s)  : {statistics.median(run_times):.3f}\n")
+
+    baseline_times = []
+    for _ in range(n_repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        baseline_times.append(time.perf_counter() - start)
+    print(f"Interpreter startup (s): {statistics.median(baseline_times):.3f}")
@@ -0,0 +1,56 @@
+import random
+import tempfile
+import time
+
+from irfold import IRfoldEngine
+
+if __name__ == "__main__":
+
+    # CP-SAT exhausts memory building the model of sequences much longer than 400 nt
+    n_seqs = 5
+    random.seed(0)
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        engines = {
+            solve_backend: IRfoldEngine(
+                out_dir,
+                ir_search_backend="watson_crick",
+                approx_energies=True,
+                solve_backend=solve_backend,
+                solver_params={"max_time_in_seconds": 60.0},
+            )
+            for solve_backend in ("cp_sat", "mwis")
+        }
+
+        for seq_len in [100, 200, 400]:
+            seqs = [
+                "".join(random.choice("ACGU") for _ in range(seq_len))
+                for _ in range(n_seqs)
+            ]
+
+            fold_times, obj_fn_values = {}, {}
+            for solve_backend, engine in engines.items():
+                for seq in seqs:  # IR search is excluded from the fold times
+                    engine.find_irs(seq)
+                start = time.perf_counter()
+                obj_fn_values[solve_backend] = [engine.fold(seq)[1] for seq in seqs]
+                fold_times[solve_backend] = (time.perf_counter() - start) / n_seqs
+
+            optimality_gaps = [
+                (optimum - heuristic) / optimum if optimum else 0.0
+                for optimum, heuristic in zip(
+                    obj_fn_values["cp_sat"], obj_fn_values["mwis"]
+                )
+            ]
+
+            print(f"Sequence length             : {seq_len}")
+            print(
+                f"Mean IRs found              : {sum(len(engines['mwis'].find_irs(seq)) for seq in seqs) / n_seqs:.0f}"
+            )
+            print(f"CP-SAT objective values     : {obj_fn_values['cp_sat']}")
+            print(f"MWIS objective values       : {obj_fn_values['mwis']}")
+            print(
+                f"Mean optimality gap         : {100 * sum(optimality_gaps) / n_seqs:.1f}%"
+            )
+            print(f"CP-SAT mean fold time (s)   : {fold_times['cp_sat']:.3f}")
+            print(f"MWIS mean fold time (s)     : {fold_times['mwis']:.3f}\n")
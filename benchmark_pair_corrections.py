@@ -0,0 +1,60 @@
+import random
+import tempfile
+import time
+
+from irfold import IRfold, IRfoldEngine
+from irfold.util import IRSet, calc_free_energy
+
+if __name__ == "__main__":
+
+    n_seqs = 5
+    random.seed(0)
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        engines = {
+            pair_corrections: IRfoldEngine(out_dir, pair_corrections=pair_corrections)
+            for pair_corrections in (False, True)
+        }
+
+        for seq_len in [40, 60, 80, 100]:
+            seqs = [
+                "".join(random.choice("ACGU") for _ in range(seq_len))
+                for _ in range(n_seqs)
+            ]
+            print(f"Sequence length : {seq_len}")
+
+            for pair_corrections, engine in engines.items():
+                build_seconds, n_variables, fold_seconds = 0.0, 0, 0.0
+                additivity_errors, free_energies = [], []
+                for seq in seqs:
+                    found_irs = IRSet.from_irs(engine.find_irs(seq))
+
+                    start = time.perf_counter()
+                    ilp_model, _ = IRfold._get_ilp_model(
+                        found_irs,
+                        seq_len,
+                        seq,
+                        out_dir,
+                        "seq",
+                        pair_corrections=pair_corrections,
+                    )
+                    build_seconds += time.perf_counter() - start
+                    n_variables += len(ilp_model.Proto().variables)
+
+                    start = time.perf_counter()
+                    db_repr, obj_fn_value = engine.fold(seq)
+                    fold_seconds += time.perf_counter() - start
+
+                    free_energy = calc_free_energy(db_repr, seq, out_dir, "seq")
+                    additivity_errors.append(abs(obj_fn_value - free_energy))
+                    free_energies.append(free_energy)
+
+                print(
+                    f"  pair corrections {str(pair_corrections):>5} : "
+                    f"mean variables {n_variables / n_seqs:6.0f}, "
+                    f"mean build time {build_seconds / n_seqs:6.3f} s, "
+                    f"mean fold time {fold_seconds / n_seqs:6.3f} s, "
+                    f"mean |objective - free energy| {sum(additivity_errors) / n_seqs:5.2f}, "
+                    f"mean free energy {sum(free_energies) / n_seqs:6.2f}"
+                )
+            print()
@@ -0,0 +1,90 @@
+import random
+import tempfile
+import time
+
+from irfold import IRfoldEngine
+from irfold.util import prune_irs_by_pair_probability
+
+
+def base_pairs(db_repr):
+    pairs, stack = set(), []
+    for pos, c in enumerate(db_repr):
+        if c == "(":
+            stack.append(pos)
+        elif c == ")":
+            pairs.add((stack.pop(), pos))
+    return pairs
+
+
+def f1_score(predicted, reference):
+    if not predicted and not reference:
+        return 1.0
+    n_shared = len(predicted & reference)
+    return 2 * n_shared / (len(predicted) + len(reference))
+
+
+if __name__ == "__main__":
+
+    n_seqs = 5
+    random.seed(0)
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        engines = {
+            min_pair_probability: IRfoldEngine(
+                out_dir,
+                ir_search_backend="watson_crick",
+                approx_energies=True,
+                min_pair_probability=min_pair_probability,
+                solver_params={"max_time_in_seconds": 60.0},
+            )
+            for min_pair_probability in (None, 1e-3, 1e-2, 1e-1)
+        }
+
+        for seq_len in [100, 200, 400]:
+            seqs = [
+                "".join(random.choice("ACGU") for _ in range(seq_len))
+                for _ in range(n_seqs)
+            ]
+
+            folds, fold_times = {}, {}
+            for min_pair_probability, engine in engines.items():
+                for seq in seqs:  # IR search is excluded from the fold times
+                    engine.find_irs(seq)
+                start = time.perf_counter()
+                folds[min_pair_probability] = [engine.fold(seq) for seq in seqs]
+                fold_times[min_pair_probability] = (
+                    time.perf_counter() - start
+                ) / n_seqs
+
+            print(f"Sequence length : {seq_len}")
+            for min_pair_probability, engine in engines.items():
+                n_irs = [
+                    len(
+                        engine.find_irs(seq)
+                        if min_pair_probability is None
+                        else prune_irs_by_pair_probability(
+                            engine.find_irs(seq), seq, min_pair_probability
+                        )
+                    )
+                    for seq in seqs
+                ]
+                optimality_gaps = [
+                    (optimum - pruned) / optimum if optimum else 0.0
+                    for (_, optimum), (_, pruned) in zip(
+                        folds[None], folds[min_pair_probability]
+                    )
+                ]
+                f1_scores = [
+                    f1_score(base_pairs(pruned), base_pairs(optimum))
+                    for (optimum, _), (pruned, _) in zip(
+                        folds[None], folds[min_pair_probability]
+                    )
+                ]
+                print(
+                    f"  min pair probability {str(min_pair_probability):>6} : "
+                    f"mean IRs {sum(n_irs) / n_seqs:7.0f}, "
+                    f"mean fold time {fold_times[min_pair_probability]:7.3f} s, "
+                    f"mean optimality gap {100 * sum(optimality_gaps) / n_seqs:5.1f}%, "
+                    f"mean base pair F1 vs unpruned {sum(f1_scores) / n_seqs:.2f}"
+                )
+            print()
@@ -1,36 +1,164 @@
-__all__ = ["IRfold"]
+from __future__ import annotations
 
+__all__ = ["IRfold", "IRfoldEngine"]
+
+import os
 import re
+import bisect
+import hashlib
+import heapq
 import multiprocessing as mp
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Tuple, List
+from typing import Callable, Dict, Tuple, List, Union
+
+import numpy as np
 
 
 from .util import (
-    ir_has_valid_gap_size,
     IR,
+    IRSet,
     irs_to_dot_bracket,
+    irs_to_dot_bracket_batch,
+    dot_bracket_batch_as_bytes,
     calc_free_energy,
+    calc_ir_free_energies,
+    calc_ir_free_energies_nn,
+    EnergyModel,
+    IRModel,
+    IR_MODEL_CP_MODEL_FILE,
+    point_mutation_ir_update,
+    derive_lower_mismatch_irs,
+    find_watson_crick_irs,
     ir_pair_invalid_relative_pos,
     get_valid_gap_sz_ir_n_tuples,
     write_solver_performance_to_file,
     create_seq_file,
     run_cmd,
-)
-from ortools.sat.python.cp_model import (
-    CpModel,
-    CpSolver,
-    IntVar,
-    LinearExpr,
-    OPTIMAL,
-    FEASIBLE,
+    lazy_import,
+    FoldResultCache,
+    fold_cache_key,
+    FoldBudget,
+    FoldBudgetExceededError,
+    FoldReport,
+    ModelSizeEstimate,
+    FOLD_FALLBACKS,
+    estimate_model_size,
+    greedy_ir_selection,
+    FoldCostModel,
+    ScheduledFold,
+    group_helices,
+    max_disjoint_irs,
+    helix_pair_relative_positions,
+    build_conflict_graph,
+    mwis_ir_selection,
+    IncumbentSolution,
+    write_anytime_curve_to_file,
+    load_solver_profile,
+    StructureConstraints,
+    irs_pairing_positions_mask,
+    filter_irs_by_constraints,
+    prune_irs_by_pair_probability,
+    LocalEnergyCache,
+    calc_ir_free_energies_cached,
+    find_adjacent_ir_pairs,
+    irs_by_paired_position,
+    calc_ir_pair_corrections,
+    COARSE_MIN_STEM_LEN,
+    NO_REGION,
+    coarse_ir_mask,
+    refinement_regions,
 )
 
-from tqdm import tqdm
+# OR-Tools, tqdm and asyncio take longer to import than the rest of the package, they are loaded on first use
+cp_model = lazy_import("ortools.sat.python.cp_model")
+cp_model_pb2 = lazy_import("ortools.sat.cp_model_pb2")
+tqdm = lazy_import("tqdm")
+asyncio = lazy_import("asyncio")
 
-IUPACPAL_LOCK = mp.Lock()
+# IUPACpal runs writing the same sequence and output files are serialised, runs on different files are concurrent
+IUPACPAL_FILE_LOCKS: Dict[str, threading.Lock] = {}
+IUPACPAL_FILE_LOCKS_LOCK = threading.Lock()
 FE_CALC_LOCK = mp.Lock()
 
+# Line of IUPACpal output giving a strand of an IR, e.g. "1        gag        3"
+IUPACPAL_STRAND_LINE = re.compile(r"^\s*(\d+)\s+(\S+)\s+(\d+)\s*$")
+
+# Separates sequences packed into one IUPACpal run, IUPACpal's match matrix matches "$" with no base
+IUPACPAL_SPACER: str = "$$"
+
+# Maximum length of a packed sequence passed to IUPACpal when finding IRs in many sequences at once, IUPACpal's run
+# time grows faster than linearly in sequence length so longer packs lose the gain from fewer process starts
+IUPACPAL_MAX_PACK_LEN: int = 1000
+
+# Longest sequence packed with others when finding IRs in many sequences at once, longer sequences are searched on
+# their own. Packed search is ahead below ~70 nt (518 vs 281 seqs/s at 20-40 nt, 133 vs 121 at 60-80) and behind
+# above ~80 nt (81 vs 98 seqs/s at 70-90 nt, 41 vs 54 at 110-130), see benchmark_find_irs_batch.py
+IUPACPAL_MAX_PACKED_SEQ_LEN: int = 72
+
+# Number of single IR dot bracket reprs rendered at once when computing IR free energies
+DOT_BRACKET_BATCH_SIZE: int = 1024
+
+# IR search backends an IRfoldEngine can use, "watson_crick" finds IRs with no mismatches in-process
+IR_SEARCH_BACKENDS: Tuple[str, ...] = ("iupacpal", "watson_crick")
+
+# Formulations of the optimisation problem an IRfoldEngine can solve, "ir" has a Boolean variable per IR and "helix"
+# an integer variable per slot for a sub-stem of a maximal helix, see IRfold._get_helix_model
+MODEL_FORMULATIONS: Tuple[str, ...] = ("ir", "helix")
+
+# Backends an IRfoldEngine can select IRs with, "cp_sat" solves the model to optimality and "mwis" selects IRs
+# heuristically as a maximum weight independent set of their conflict graph, see mwis_ir_selection
+SOLVE_BACKENDS: Tuple[str, ...] = ("cp_sat", "mwis")
+
+# Variable choosing a helix's sub-stem, by index into the helix's candidate IRs offset by one, 0 for no sub-stem
+HelixSlot = Tuple["cp_model.IntVar", np.ndarray]
+
+# Number of sequences whose found IRs an IRfoldEngine keeps
+IR_CACHE_SIZE: int = 128
+
+
+@lru_cache(maxsize=None)
+def _incumbent_callback_type() -> type:
+    """Returns the CP-SAT solution callback type passing each incumbent to a function as an IncumbentSolution, defined
+    on first use as OR-Tools is loaded lazily."""
+
+    class IncumbentCallback(cp_model.CpSolverSolutionCallback):
+        def __init__(
+            self,
+            on_incumbent: Callable[[IncumbentSolution], None],
+            ir_set: IRSet,
+            seq_len: int,
+            variables: list,
+            get_active_ir_idxs: Callable[
+                [cp_model.CpSolverSolutionCallback, list], List[int]
+            ],
+        ):
+            super().__init__()
+            self.on_incumbent = on_incumbent
+            self.ir_set: IRSet = ir_set
+            self.seq_len: int = seq_len
+            self.variables: list = variables
+            self.get_active_ir_idxs = get_active_ir_idxs
+
+        def OnSolutionCallback(self) -> None:
+            self.on_incumbent(
+                IncumbentSolution(
+                    irs_to_dot_bracket(
+                        self.ir_set[self.get_active_ir_idxs(self, self.variables)],
+                        self.seq_len,
+                    ),
+                    self.ObjectiveValue(),
+                    self.BestObjectiveBound(),
+                    self.WallTime(),
+                )
+            )
+
+    return IncumbentCallback
+
 
 class IRfold:
     @classmethod
@@ -44,80 +172,510 @@ class IRfold:
         show_prog: bool = False,
         max_mismatches: int = 0,
         show_warnings: bool = False,
+        n_workers: int = 1,
+        approx_energies: bool = False,
+        result_cache: FoldResultCache = None,
+        budget: FoldBudget = None,
+        solve_backend: str = "cp_sat",
+        on_incumbent: Callable[[IncumbentSolution], None] = None,
+        solver_profile: str = None,
+        constraints: StructureConstraints = None,
+        min_pair_probability: float = None,
     ) -> Tuple[str, float]:
+        """Folds the sequence with the default engine, see IRfoldEngine.default. Configuration given here applies to
+        this call only. If a result cache is given, the result is looked up in and added to it. If a budget is
+        given, folds whose model would exceed it are pruned, see IRfoldEngine.fold_with_report. solve_backend is
+        one of SOLVE_BACKENDS, "mwis" trades optimality for speed on very large IR sets. on_incumbent is called
+        with each improving solution CP-SAT finds, see IRfoldEngine.fold_with_report. solver_profile names the
+        CP-SAT parameters to solve with, see load_solver_profile. constraints restricts the structure to one with
+        the given positions unpaired or paired, see IRfoldEngine.fold_with_report. IRs whose mean base pair
+        probability is below min_pair_probability are discarded before the model is built.
+        """
+        return IRfoldEngine.default().fold(
+            sequence,
+            out_dir,
+            seq_name=seq_name,
+            save_performance=save_performance,
+            show_prog=show_prog,
+            max_mismatches=max_mismatches,
+            show_warnings=show_warnings,
+            n_workers=n_workers,
+            approx_energies=approx_energies,
+            result_cache=result_cache,
+            budget=budget,
+            solve_backend=solve_backend,
+            on_incumbent=on_incumbent,
+            solver_profile=solver_profile,
+            constraints=constraints,
+            min_pair_probability=min_pair_probability,
+        )
 
-        # Find IRs in sequence
-        found_irs: List[IR] = cls._find_irs(
-            sequence, out_dir, seq_name=seq_name, max_mismatches=max_mismatches
+    @classmethod
+    async def fold_async(
+        cls,
+        sequence: str,
+        out_dir: str = ".",
+        *,
+        seq_name: str = "seq",
+        max_mismatches: int = 0,
+        timeout: float = None,
+    ) -> Tuple[str, float]:
+        """Folds the sequence with the default engine without blocking the event loop, see IRfoldEngine.fold_async.
+        The rest of the default engine's configuration applies."""
+        return await IRfoldEngine.default().fold_async(
+            sequence,
+            out_dir,
+            seq_name=seq_name,
+            max_mismatches=max_mismatches,
+            timeout=timeout,
         )
 
-        n_irs_found: int = len(found_irs)
-        seq_len: int = len(sequence)
-        if n_irs_found == 0:  # Return sequence if no IRs found
-            db_repr, obj_fn_value = "".join(["." for _ in range(seq_len)]), 0
-            if save_performance:
-                write_solver_performance_to_file(
-                    db_repr, obj_fn_value, 0.0, seq_len, out_dir, cls.__name__
-                )
-            return db_repr, obj_fn_value
+    @classmethod
+    def fold_k_best(
+        cls,
+        sequence: str,
+        k: int,
+        out_dir: str = ".",
+        *,
+        seq_name: str = "seq",
+        max_mismatches: int = 0,
+    ) -> List[Tuple[str, float]]:
+        """Returns the k lowest objective function value structures of the sequence with the default engine, see
+        IRfoldEngine.fold_k_best."""
+        return IRfoldEngine.default().fold_k_best(
+            sequence, k, out_dir, seq_name=seq_name, max_mismatches=max_mismatches
+        )
 
-        # Define constraint programming problem and solve
-        ilp_model, variables = cls._get_ilp_model(
-            found_irs,
-            seq_len,
+    @classmethod
+    def fold_coarse_to_fine(
+        cls,
+        sequence: str,
+        out_dir: str = ".",
+        *,
+        seq_name: str = "seq",
+        max_mismatches: int = 0,
+        min_stem_len: int = COARSE_MIN_STEM_LEN,
+        n_refine_workers: int = None,
+    ) -> Tuple[str, float]:
+        """Folds a long sequence over its long IRs first, then refines each loop of the result with the remaining
+        IRs, with the default engine, see IRfoldEngine.fold_coarse_to_fine."""
+        return IRfoldEngine.default().fold_coarse_to_fine(
+            sequence,
+            out_dir,
+            seq_name=seq_name,
+            max_mismatches=max_mismatches,
+            min_stem_len=min_stem_len,
+            n_refine_workers=n_refine_workers,
+        )
+
+    @classmethod
+    def fold_sweep(
+        cls,
+        sequence: str,
+        energy_models: List[Union[EnergyModel, float]],
+        out_dir: str = ".",
+        *,
+        seq_name: str = "seq",
+        show_prog: bool = False,
+        max_mismatches: int = 0,
+        n_workers: int = 1,
+    ) -> List[Tuple[str, float]]:
+        """Folds the sequence once per energy model, floats are taken as temperatures under the default parameters.
+
+        IR search, gap size filtering and IR pair validation are done once and shared by every energy model, only
+        the objective coefficients are recomputed per model. With n_workers > 1 the energy models are evaluated and
+        solved in parallel. Returns one (dot bracket repr, objective function value) per energy model, in order.
+        """
+        found_irs: IRSet = IRSet.from_irs(
+            cls._find_irs(
+                sequence, out_dir, seq_name=seq_name, max_mismatches=max_mismatches
+            )
+        )
+        valid_gap_sz_mask = found_irs.valid_gap_size_mask()
+        invalid_gap_sz_ir_idxs: List[int] = [
+            int(i) for i in (~valid_gap_sz_mask).nonzero()[0]
+        ]
+        incompatible_ir_pair_idxs: List[Tuple[int, int]] = (
+            cls._get_incompatible_ir_pair_idxs(
+                found_irs, invalid_gap_sz_ir_idxs, show_prog=show_prog
+            )
+            if valid_gap_sz_mask.sum() > 1
+            else []
+        )
+        energy_models = [
+            m if isinstance(m, EnergyModel) else EnergyModel(temperature=m)
+            for m in energy_models
+        ]
+
+        fold_args = [
+            (found_irs, incompatible_ir_pair_idxs, sequence, energy_model)
+            for energy_model in energy_models
+        ]
+        if n_workers > 1 and len(energy_models) > 1:
+            with ProcessPoolExecutor(
+                max_workers=min(n_workers, len(energy_models))
+            ) as executor:
+                return list(executor.map(cls._fold_with_energy_model, *zip(*fold_args)))
+        return [
+            cls._fold_with_energy_model(*args)
+            for args in tqdm.tqdm(
+                fold_args, desc="Folding per energy model", disable=not show_prog
+            )
+        ]
+
+    @classmethod
+    def build_ir_model(
+        cls,
+        sequence: str,
+        out_dir: str = ".",
+        *,
+        seq_name: str = "seq",
+        show_prog: bool = False,
+        max_mismatches: int = 0,
+        show_warnings: bool = False,
+        n_workers: int = 1,
+    ) -> IRModel:
+        """Finds the IRs in the sequence, validates IR pairs and evaluates IR free energies, returning everything
+        needed to solve the optimisation problem as an IRModel."""
+        found_irs: IRSet = IRSet.from_irs(
+            cls._find_irs(
+                sequence, out_dir, seq_name=seq_name, max_mismatches=max_mismatches
+            )
+        )
+        ir_set: IRSet = found_irs.filter_valid_gap_size()
+        incompatible_ir_pair_idxs: List[Tuple[int, int]] = (
+            cls._get_incompatible_ir_pair_idxs(ir_set, [], show_prog=show_prog)
+        )
+        variable_coefficients: List[int] = cls._get_ir_coefficients(
+            ir_set,
+            len(sequence),
             sequence,
             out_dir,
             seq_name,
-            show_prog=show_prog,
             show_warnings=show_warnings,
+            n_workers=n_workers,
         )
 
-        solver: CpSolver = CpSolver()
+        return IRModel(
+            sequence,
+            ir_set,
+            np.array(incompatible_ir_pair_idxs, dtype=np.int32).reshape(-1, 2),
+            np.array(variable_coefficients, dtype=np.int64),
+            max_mismatches,
+        )
 
-        with tqdm(
-            desc=f"Running solver ({len(variables)} variables)",
-            disable=not show_prog,
-        ) as _:
-            status = solver.Solve(ilp_model)
+    @staticmethod
+    def solve_ir_model(
+        ir_model: IRModel,
+        *,
+        hint_ir_idxs: List[int] = None,
+        solver_params: Dict[str, Union[int, float, bool, str]] = None,
+    ) -> Tuple[str, float, List[int]]:
+        """Solves the IR model, optionally hinting the solver with the indices of IRs from a previous solution and
+        setting the CP-SAT parameters in solver_params. Returns the dot bracket repr, objective function value and
+        indices of the IRs in the solution.
+        """
+        seq_len: int = len(ir_model.sequence)
+        ilp_model, variables = IRfold._build_ilp_model(
+            list(range(len(ir_model.ir_set))),
+            ir_model.incompatible_ir_pair_idxs.tolist(),
+            ir_model.variable_coefficients.tolist(),
+        )
+        if hint_ir_idxs is not None:
+            hint_ir_idxs_set = set(hint_ir_idxs)
+            for ir_idx, var in enumerate(variables):
+                ilp_model.AddHint(var, ir_idx in hint_ir_idxs_set)
 
-        if status == OPTIMAL or status == FEASIBLE:
-            # Return dot bracket repr and objective function's final value
-            active_ir_idxs: List[int] = [
-                int(re.findall(r"-?\d+\.?\d*", v.Name())[0])
-                for v in variables
-                if solver.Value(v) == 1
+        solver: cp_model.CpSolver = IRfold._new_solver(solver_params)
+        status = solver.Solve(ilp_model)
+        if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
+            active_ir_idxs: List[int] = IRfold._get_active_ir_idxs(solver, variables)
+            return (
+                irs_to_dot_bracket(ir_model.ir_set[active_ir_idxs], seq_len),
+                solver.ObjectiveValue(),
+                active_ir_idxs,
+            )
+        return "".join(["." for _ in range(seq_len)]), 0, []
+
+    @staticmethod
+    def save_ir_model(ir_model: IRModel, artifact_dir: str) -> Path:
+        """Saves the IR model (see IRModel.save) together with its CP-SAT model as a binary CpModelProto, so it can
+        be solved later, elsewhere or with different solver parameters without rebuilding. Returns the artifact
+        directory."""
+        artifact_path: Path = ir_model.save(artifact_dir)
+        ilp_model, _ = IRfold._build_ilp_model(
+            list(range(len(ir_model.ir_set))),
+            ir_model.incompatible_ir_pair_idxs.tolist(),
+            ir_model.variable_coefficients.tolist(),
+        )
+        ilp_model.ExportToFile(str(artifact_path / IR_MODEL_CP_MODEL_FILE))
+        return artifact_path
+
+    @staticmethod
+    def load_ilp_model(
+        artifact_dir: str,
+    ) -> Tuple[cp_model.CpModel, List[cp_model.IntVar]]:
+        """Loads the CP-SAT model saved by save_ir_model, returning it and its variables in IR order."""
+        model_proto = cp_model_pb2.CpModelProto()
+        with open(Path(artifact_dir) / IR_MODEL_CP_MODEL_FILE, "rb") as f_in:
+            model_proto.ParseFromString(f_in.read())
+
+        ilp_model: cp_model.CpModel = cp_model.CpModel()
+        if hasattr(ilp_model.Proto(), "CopyFrom"):
+            ilp_model.Proto().CopyFrom(model_proto)
+        else:
+            # Newer OR-Tools wrap the model proto natively, it can only be filled from text format
+            ilp_model.Proto().parse_text_format(str(model_proto))
+
+        return ilp_model, [
+            ilp_model.GetBoolVarFromProtoIndex(var_idx)
+            for var_idx in range(len(model_proto.variables))
+        ]
+
+    @classmethod
+    def refold_point_mutation(
+        cls,
+        base_ir_model: IRModel,
+        position: int,
+        base: str,
+        *,
+        hint_ir_idxs: List[int] = None,
+    ) -> Tuple[Tuple[str, float], IRModel]:
+        """Folds the sequence of base_ir_model with the base at position substituted, updating only the IRs, pair
+        incompatibilities and coefficients the mutation touches instead of rebuilding the model. hint_ir_idxs are
+        the indices of the IRs in the base model's solution, used to hint the solver.
+
+        Requires an IR model built with max_mismatches=0, mutant IRs are found as maximal runs of Watson-Crick pairs
+        around the mutated position (see point_mutation_ir_update). Returns the mutant's (dot bracket repr, objective
+        function value) and IR model, which can be used as the base of further mutations.
+        """
+        if base_ir_model.max_mismatches != 0:
+            raise ValueError(
+                "Incremental re-folding requires an IR model built with max_mismatches=0"
+            )
+
+        base_sequence: str = base_ir_model.sequence
+        mutant_sequence: str = (
+            base_sequence[:position] + base + base_sequence[position + 1 :]
+        )
+
+        unaffected_mask, new_irs = point_mutation_ir_update(
+            base_ir_model.ir_set, mutant_sequence, position
+        )
+        new_irs = new_irs.filter_valid_gap_size()
+        kept_irs: IRSet = base_ir_model.ir_set[unaffected_mask]
+        mutant_ir_set: IRSet = IRSet.concatenate([kept_irs, new_irs])
+        n_kept_irs: int = len(kept_irs)
+
+        # Base model IR index to mutant model IR index, -1 for IRs no longer present
+        base_to_mutant_idx: np.ndarray = np.full(
+            len(base_ir_model.ir_set), -1, dtype=np.int64
+        )
+        base_to_mutant_idx[unaffected_mask] = np.arange(n_kept_irs)
+
+        # Pairs between kept IRs carry over, pairs involving a new IR are validated
+        kept_pair_idxs: np.ndarray = base_to_mutant_idx[
+            base_ir_model.incompatible_ir_pair_idxs
+        ].reshape(-1, 2)
+        kept_pair_idxs = kept_pair_idxs[(kept_pair_idxs >= 0).all(axis=1)]
+        mutant_irs: List[IR] = mutant_ir_set.to_irs()
+        new_pair_idxs: List[Tuple[int, int]] = [
+            (ir_a_idx, ir_b_idx)
+            for ir_b_idx in range(n_kept_irs, len(mutant_irs))
+            for ir_a_idx in range(ir_b_idx)
+            if ir_pair_invalid_relative_pos(mutant_irs[ir_a_idx], mutant_irs[ir_b_idx])
+        ]
+        incompatible_ir_pair_idxs: np.ndarray = np.concatenate(
+            [
+                kept_pair_idxs.astype(np.int32),
+                np.array(new_pair_idxs, dtype=np.int32).reshape(-1, 2),
             ]
-            db_repr: str = irs_to_dot_bracket(
-                [found_irs[i] for i in active_ir_idxs], seq_len
+        )
+
+        # An IR's free energy depends on the bases from one before its left strand to one after its right strand
+        variable_coefficients: np.ndarray = np.concatenate(
+            [
+                base_ir_model.variable_coefficients[unaffected_mask],
+                np.zeros(len(new_irs), dtype=np.int64),
+            ]
+        )
+        stale_coefficient_idxs: np.ndarray = np.concatenate(
+            [
+                (
+                    (kept_irs.left_start - 1 <= position)
+                    & (kept_irs.right_end + 1 >= position)
+                ).nonzero()[0],
+                np.arange(n_kept_irs, len(mutant_ir_set)),
+            ]
+        )
+        variable_coefficients[stale_coefficient_idxs] = np.round(
+            calc_ir_free_energies(
+                mutant_ir_set[stale_coefficient_idxs], mutant_sequence
             )
-            obj_fn_value: float = solver.ObjectiveValue()
+        ).astype(np.int64)
 
-            if save_performance:
-                dot_bracket_repr_mfe: float = calc_free_energy(
-                    db_repr, sequence, out_dir, seq_name, show_warnings=show_warnings
-                )
-                write_solver_performance_to_file(
-                    db_repr,
-                    obj_fn_value,
-                    dot_bracket_repr_mfe,
-                    seq_len,
+        mutant_ir_model: IRModel = IRModel(
+            mutant_sequence,
+            mutant_ir_set,
+            incompatible_ir_pair_idxs,
+            variable_coefficients,
+            base_ir_model.max_mismatches,
+        )
+        mutant_hint_ir_idxs: List[int] = None
+        if hint_ir_idxs is not None:
+            mutant_hint_ir_idxs = [
+                int(base_to_mutant_idx[i])
+                for i in hint_ir_idxs
+                if base_to_mutant_idx[i] >= 0
+            ]
+        db_repr, obj_fn_value, _ = cls.solve_ir_model(
+            mutant_ir_model, hint_ir_idxs=mutant_hint_ir_idxs
+        )
+
+        return (db_repr, obj_fn_value), mutant_ir_model
+
+    @classmethod
+    def scan_point_mutations(
+        cls,
+        sequence: str,
+        positions: List[int],
+        out_dir: str = ".",
+        *,
+        seq_name: str = "seq",
+        bases: str = "ACGU",
+        show_prog: bool = False,
+        n_workers: int = 1,
+    ) -> Dict[Tuple[int, str], Tuple[str, float]]:
+        """Folds every single point mutant of the sequence at the given positions, substituting each of bases that
+        differs from the wild type base. The wild type model is built once and each mutant is derived from it with
+        refold_point_mutation, hinted with the wild type solution. Returns a dict keyed by (position, base).
+        """
+        base_ir_model: IRModel = cls.build_ir_model(
+            sequence, out_dir, seq_name=seq_name, n_workers=n_workers
+        )
+        _, _, base_active_ir_idxs = cls.solve_ir_model(base_ir_model)
+
+        mutations: List[Tuple[int, str]] = [
+            (position, base)
+            for position in positions
+            for base in bases
+            if base != sequence[position]
+        ]
+        return {
+            (position, base): cls.refold_point_mutation(
+                base_ir_model, position, base, hint_ir_idxs=base_active_ir_idxs
+            )[0]
+            for position, base in tqdm.tqdm(
+                mutations, desc="Folding point mutants", disable=not show_prog
+            )
+        }
+
+    @classmethod
+    def fold_mismatch_sweep(
+        cls,
+        sequence: str,
+        mismatch_levels: List[int] = (0, 1),
+        out_dir: str = ".",
+        *,
+        seq_name: str = "seq",
+        show_prog: bool = False,
+        show_warnings: bool = False,
+        n_workers: int = 1,
+    ) -> Dict[int, Tuple[str, float]]:
+        """Folds the sequence at each maximum number of mismatches in mismatch_levels, equivalent to calling fold with
+        each max_mismatches, from a single IUPACpal run at the highest level.
+
+        The IRs of lower levels are derived from those of the highest level, see derive_lower_mismatch_irs. Pair
+        validation and energy evaluation are done once over the union of every level's IRs and each level's model is
+        the restriction of that model to its IRs. Returns a dict keyed by mismatch level.
+        """
+        max_level: int = max(mismatch_levels)
+        found_irs, ir_mismatch_offsets = cls._find_irs_with_mismatches(
+            sequence, out_dir, seq_name=seq_name, max_mismatches=max_level
+        )
+
+        level_irs: Dict[int, List[IR]] = {
+            level: (
+                found_irs
+                if level == max_level
+                else derive_lower_mismatch_irs(found_irs, ir_mismatch_offsets, level)[0]
+            )
+            for level in sorted(set(mismatch_levels))
+        }
+
+        # Each level's IRs index into the union of all levels' IRs with valid gap sizes
+        union_ir_idxs: Dict[IR, int] = {}
+        for irs in level_irs.values():
+            for ir in IRSet.from_irs(irs).filter_valid_gap_size().to_irs():
+                union_ir_idxs.setdefault(ir, len(union_ir_idxs))
+        union_ir_set: IRSet = IRSet.from_irs(list(union_ir_idxs.keys()))
+
+        union_ir_model: IRModel = IRModel(
+            sequence,
+            union_ir_set,
+            np.array(
+                cls._get_incompatible_ir_pair_idxs(
+                    union_ir_set, [], show_prog=show_prog
+                ),
+                dtype=np.int32,
+            ).reshape(-1, 2),
+            np.array(
+                cls._get_ir_coefficients(
+                    union_ir_set,
+                    len(sequence),
+                    sequence,
                     out_dir,
-                    cls.__name__,
-                    n_irs_found,
-                    len(variables),
-                    solver.WallTime(),
-                    solver.NumBranches(),
-                    solver.NumConflicts(),
-                )
-            return db_repr, obj_fn_value
-        else:
-            # The optimisation problem does not have a solution
-            db_repr, obj_fn_value = "".join(["." for _ in range(seq_len)]), 0
-            if save_performance:
-                write_solver_performance_to_file(
-                    db_repr, obj_fn_value, 0.0, seq_len, out_dir, cls.__name__
-                )
-            return db_repr, obj_fn_value
+                    seq_name,
+                    show_warnings=show_warnings,
+                    n_workers=n_workers,
+                ),
+                dtype=np.int64,
+            ),
+            max_level,
+        )
+
+        results: Dict[int, Tuple[str, float]] = {}
+        for level, irs in level_irs.items():
+            level_ir_idxs: List[int] = [
+                union_ir_idxs[ir] for ir in irs if ir in union_ir_idxs
+            ]
+            db_repr, obj_fn_value, _ = cls.solve_ir_model(
+                union_ir_model.subset(level_ir_idxs, max_mismatches=level)
+            )
+            results[level] = (db_repr, obj_fn_value)
+
+        return results
+
+    @staticmethod
+    def _fold_with_energy_model(
+        ir_set: IRSet,
+        incompatible_ir_pair_idxs: List[Tuple[int, int]],
+        sequence: str,
+        energy_model: EnergyModel,
+    ) -> Tuple[str, float]:
+        seq_len: int = len(sequence)
+        valid_ir_idxs: List[int] = [
+            int(i) for i in ir_set.valid_gap_size_mask().nonzero()[0]
+        ]
+        variable_coefficients: List[int] = [
+            round(ir_free_energy)
+            for ir_free_energy in calc_ir_free_energies(
+                ir_set[valid_ir_idxs], sequence, energy_model=energy_model
+            )
+        ]
+        ilp_model, variables = IRfold._build_ilp_model(
+            valid_ir_idxs, incompatible_ir_pair_idxs, variable_coefficients
+        )
+
+        solver: cp_model.CpSolver = cp_model.CpSolver()
+        status = solver.Solve(ilp_model)
+        if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
+            active_ir_idxs: List[int] = IRfold._get_active_ir_idxs(solver, variables)
+            return (
+                irs_to_dot_bracket(ir_set[active_ir_idxs], seq_len),
+                solver.ObjectiveValue(),
+            )
+        return "".join(["." for _ in range(seq_len)]), 0
 
     @staticmethod
     def _find_irs(
@@ -127,70 +685,215 @@ class IRfold:
         seq_name: str = "seq",
         max_mismatches: int = 0,
     ) -> List[IR]:
-        with IUPACPAL_LOCK:
-            out_dir_path: Path = Path(out_dir).resolve()
-            if not out_dir_path.exists():
-                out_dir_path = Path.cwd().resolve()
+        found_irs, _ = IRfold._find_irs_with_mismatches(
+            sequence, out_dir, seq_name=seq_name, max_mismatches=max_mismatches
+        )
+        return found_irs
+
+    @staticmethod
+    def _find_irs_with_mismatches(
+        sequence: str,
+        out_dir: str = ".",
+        *,
+        seq_name: str = "seq",
+        max_mismatches: int = 0,
+        max_ir_len: int = None,
+        max_gap: int = None,
+    ) -> Tuple[List[IR], List[List[int]]]:
+        """Returns the IRs found by IUPACpal and, for each IR, the offsets from its outermost base pair of the base
+        pairs that are mismatches. The number of mismatches of an IR is the length of its offset list.
+        IR length and gap size are only bounded by the sequence length unless max_ir_len or max_gap are given.
+        """
+        out_dir_path: Path = Path(out_dir).resolve()
+        if not out_dir_path.exists():
+            out_dir_path = Path.cwd().resolve()
+        seq_file: str = str(out_dir_path / f"{seq_name}.fasta")
+        with IUPACPAL_FILE_LOCKS_LOCK:
+            file_lock: threading.Lock = IUPACPAL_FILE_LOCKS.setdefault(
+                seq_file, threading.Lock()
+            )
 
+        with file_lock:
             # Check IUPACpal has been compiled to this cwd
             iupacpal_exe: Path = Path(__file__).parent / "IUPACpal"
             if not iupacpal_exe.exists():
                 raise FileNotFoundError("Could not find IUPACpal executable.")
 
             # Write sequence to file for IUPACpal
-            seq_file: str = str(out_dir_path / f"{seq_name}.fasta")
             create_seq_file(sequence, seq_name, seq_file)
             irs_output_file: str = str(out_dir_path / f"{seq_name}_found_irs.txt")
 
-            # ToDo: Refactor this to capture stdout of running IUPACpal instead of writing to file then extracting
-            _, out, _ = run_cmd(
-                [
-                    str(iupacpal_exe),
-                    "-f",
-                    seq_file,
-                    "-s",
-                    seq_name,
-                    "-m",
-                    str(2),
-                    "-M",
-                    str(len(sequence)),
-                    "-g",
-                    str(len(sequence) - 1),
-                    "-x",
-                    str(max_mismatches),
-                    "-o",
-                    str(out_dir_path / f"{seq_name}_found_irs.txt"),
-                ]
-            )
-
-            if "Error" not in str(out):
-                # Extract IR indices from format IUPACpal outputs
-                found_irs: List[IR] = []
+            iupacpal_cmd: List[str] = [
+                str(iupacpal_exe),
+                "-f",
+                seq_file,
+                "-s",
+                seq_name,
+                "-m",
+                str(2),
+                "-M",
+                str(len(sequence) if max_ir_len is None else max_ir_len),
+                "-g",
+                str(len(sequence) - 1 if max_gap is None else max_gap),
+                "-x",
+                str(max_mismatches),
+                "-o",
+                str(out_dir_path / f"{seq_name}_found_irs.txt"),
+            ]
+            # IUPACpal writes verbose debug output to stdout, which is discarded as reading it back through a pipe
+            # costs more than the palindrome search for short sequences
+            returncode, _, _ = run_cmd(iupacpal_cmd, capture_stdout=False)
 
+            if returncode == 0:
                 with open(irs_output_file) as f_in:
-                    lines: List[str] = list(
-                        line for line in (l.strip() for l in f_in) if line
+                    return IRfold._parse_iupacpal_output(
+                        [line.rstrip("\n") for line in f_in]
+                    )
+            else:
+                # IUPACpal reports errors on stdout, re-run capturing it for the error message
+                _, out, _ = run_cmd(iupacpal_cmd)
+                raise Exception(str(out.decode("utf-8")))
+
+    @staticmethod
+    def _parse_iupacpal_output(
+        lines: List[str],
+    ) -> Tuple[List[IR], List[List[int]]]:
+        """Parses the lines of IUPACpal's output into IRs and their mismatch offsets, see _find_irs_with_mismatches."""
+        # Extract IR indices from format IUPACpal outputs, each IR is formatted as three lines: left strand with its
+        # start and end positions, an alignment line marking matching base pairs with "|" and the right strand with
+        # its end and start positions
+        found_irs: List[IR] = []
+        ir_mismatch_offsets: List[List[int]] = []
+
+        ir_lines: List[str] = lines[lines.index("Palindromes:") + 1 :]
+        line_idx: int = 0
+        while line_idx < len(ir_lines):
+            left_strand_match = IUPACPAL_STRAND_LINE.match(ir_lines[line_idx])
+            if left_strand_match is None:
+                line_idx += 1
+                continue
+            alignment_line: str = ir_lines[line_idx + 1]
+            right_strand_match = IUPACPAL_STRAND_LINE.match(ir_lines[line_idx + 2])
+            line_idx += 3
+
+            left_start, left_end = (
+                int(left_strand_match.group(1)) - 1,
+                int(left_strand_match.group(3)) - 1,
+            )
+            right_start, right_end = (
+                int(right_strand_match.group(3)) - 1,
+                int(right_strand_match.group(1)) - 1,
+            )
+            found_irs.append(((left_start, left_end), (right_start, right_end)))
+
+            strand_len: int = left_end - left_start + 1
+            alignment_start: int = left_strand_match.start(2)
+            alignment: str = alignment_line[
+                alignment_start : alignment_start + strand_len
+            ].ljust(strand_len)
+            ir_mismatch_offsets.append([i for i, c in enumerate(alignment) if c != "|"])
+
+        return found_irs, ir_mismatch_offsets
+
+    @staticmethod
+    def _find_irs_batch(
+        sequences: List[str],
+        out_dir: str = ".",
+        *,
+        seq_name: str = "batch",
+        max_mismatches: int = 0,
+        max_pack_len: int = IUPACPAL_MAX_PACK_LEN,
+        max_packed_seq_len: int = IUPACPAL_MAX_PACKED_SEQ_LEN,
+    ) -> List[List[IR]]:
+        """Finds the IRs in each of many short sequences, packing sequences into as few IUPACpal runs as possible to
+        amortise process startup and file round trips. Returns, per sequence, the IRs _find_irs would return.
+        Sequences longer than max_packed_seq_len, for which a run of their own is faster, are searched on their own.
+
+        Sequences are packed in order of length separated by IUPACPAL_SPACER, which matches no base, so no IR can
+        extend from one sequence into the next. IR length and gap are bounded by the longest sequence in the pack,
+        which bounds no IR lying within one sequence. IR coordinates are mapped back to their sequence, base pairs
+        IUPACpal places on spacers are trimmed off and hits spanning two sequences are discarded.
+
+        With max_mismatches > 0 IUPACpal lets IRs spend mismatches on the spacer, so packed output differs from
+        per-sequence output and each sequence is searched on its own instead."""
+        if max_mismatches > 0:
+            return [
+                (
+                    IRfold._find_irs(
+                        seq,
+                        out_dir,
+                        seq_name=f"{seq_name}_{seq_idx}",
+                        max_mismatches=max_mismatches,
                     )
+                    if len(seq) >= 4
+                    else []
+                )
+                for seq_idx, seq in enumerate(sequences)
+            ]
 
-                ir_lines: List[str] = lines[lines.index("Palindromes:") + 1 :]
-                formatted_irs: List[List[str]] = [
-                    ir_lines[i : i + 3] for i in range(0, len(ir_lines), 3)
-                ]
+        found_irs: List[List[IR]] = [[] for _ in sequences]
 
-                for f_ir in formatted_irs:
-                    ir_idxs: List[int] = re.findall(r"-?\d+\.?\d*", "".join(f_ir))
+        # An IR needs at least two base pairs, shorter sequences cannot contain one
+        packs: List[List[int]] = [[]]
+        pack_len: int = 0
+        for seq_idx in sorted(range(len(sequences)), key=lambda i: len(sequences[i])):
+            if len(sequences[seq_idx]) < 4:
+                continue
+            if len(sequences[seq_idx]) > max_packed_seq_len:
+                found_irs[seq_idx] = IRfold._find_irs(
+                    sequences[seq_idx], out_dir, seq_name=f"{seq_name}_seq_{seq_idx}"
+                )
+                continue
+            if packs[-1] and pack_len + len(sequences[seq_idx]) > max_pack_len:
+                packs.append([])
+                pack_len = 0
+            packs[-1].append(seq_idx)
+            pack_len += len(sequences[seq_idx]) + len(IUPACPAL_SPACER)
 
-                    left_start, left_end = int(ir_idxs[0]) - 1, int(ir_idxs[1]) - 1
-                    right_start, right_end = int(ir_idxs[3]) - 1, int(ir_idxs[2]) - 1
-                    found_irs.append(((left_start, left_end), (right_start, right_end)))
+        for pack_idx, pack in enumerate(packs):
+            if not pack:
+                continue
+            max_seq_len: int = max(len(sequences[seq_idx]) for seq_idx in pack)
 
-                return found_irs
-            else:
-                raise Exception(str(out.decode("utf-8")))
+            seq_starts: List[int] = []
+            offset: int = 0
+            for seq_idx in pack:
+                seq_starts.append(offset)
+                offset += len(sequences[seq_idx]) + len(IUPACPAL_SPACER)
+
+            packed_irs, packed_mismatch_offsets = IRfold._find_irs_with_mismatches(
+                IUPACPAL_SPACER.join(sequences[seq_idx] for seq_idx in pack),
+                out_dir,
+                seq_name=f"{seq_name}_{pack_idx}",
+                max_ir_len=max_seq_len,
+                max_gap=max_seq_len - 1,
+            )
+
+            for ((left_start, left_end), (right_start, right_end)), offsets in zip(
+                packed_irs, packed_mismatch_offsets
+            ):
+                pack_pos: int = bisect.bisect_right(seq_starts, left_end) - 1
+                seq_start: int = seq_starts[pack_pos]
+                seq_end: int = seq_start + len(sequences[pack[pack_pos]]) - 1
+
+                # IUPACpal may extend an IR over spacer characters at its ends, those base pairs are trimmed off
+                n_trimmed: int = max(0, seq_start - left_start, right_end - seq_end)
+                left_start += n_trimmed
+                right_end -= n_trimmed
+                if left_end - left_start < 1 or any(o >= n_trimmed for o in offsets):
+                    continue  # Spans two sequences, or is not a perfect IR of two or more base pairs once trimmed
+                found_irs[pack[pack_pos]].append(
+                    (
+                        (left_start - seq_start, left_end - seq_start),
+                        (right_start - seq_start, right_end - seq_start),
+                    )
+                )
+
+        return found_irs
 
     @staticmethod
     def _get_ilp_model(
-        ir_list: List[IR],
+        ir_list: Union[List[IR], IRSet],
         seq_len: int,
         sequence: str,
         out_dir: str,
@@ -198,35 +901,431 @@ class IRfold:
         *,
         show_prog: bool = False,
         show_warnings: bool = False,
-    ) -> Tuple[CpModel, List[IntVar]]:
-        ilp_model: CpModel = CpModel()
+        n_workers: int = 1,
+        approx_energies: bool = False,
+        energy_model: EnergyModel = None,
+        executor: Executor = None,
+        energy_cache: LocalEnergyCache = None,
+        paired_positions: List[int] = None,
+        pair_corrections: bool = False,
+    ) -> Tuple[cp_model.CpModel, List[cp_model.IntVar]]:
+        ilp_model: cp_model.CpModel = cp_model.CpModel()
 
         if not ilp_model:
             raise Exception("Failed to create MIP solver")
 
-        n_irs: int = len(ir_list)
+        ir_set: IRSet = IRSet.from_irs(ir_list)
+        n_irs: int = len(ir_set)
 
         # Create binary indicator variables for IRs
+        valid_gap_sz_mask = ir_set.valid_gap_size_mask()
         invalid_gap_sz_ir_idxs: List[int] = [
-            i for i in range(n_irs) if not ir_has_valid_gap_size(ir_list[i])
-        ]
-        ir_indicator_variables = [
-            ilp_model.NewBoolVar(f"ir_{i}")
-            for i in range(n_irs)
-            if i not in invalid_gap_sz_ir_idxs
+            int(i) for i in (~valid_gap_sz_mask).nonzero()[0]
         ]
+        ir_idx_to_variable: Dict[int, cp_model.IntVar] = {
+            int(i): ilp_model.NewBoolVar(f"ir_{i}")
+            for i in valid_gap_sz_mask.nonzero()[0]
+        }
+        ir_indicator_variables: List[cp_model.IntVar] = list(
+            ir_idx_to_variable.values()
+        )
 
-        # If 1 or fewer variables, trivial or impossible optimisation problem, will be trivially handled by solver
-        if len(ir_indicator_variables) <= 1:
+        # Positions constrained to be paired must be paired by one of the IRs present
+        for position in paired_positions or []:
+            pairing_ir_idxs: np.ndarray = (
+                irs_pairing_positions_mask(ir_set, [position]) & valid_gap_sz_mask
+            ).nonzero()[0]
+            if len(pairing_ir_idxs) == 0:
+                raise ValueError(
+                    f"Position {position} is constrained to be paired but no IR pairs it"
+                )
+            ilp_model.AddBoolOr(
+                [ir_idx_to_variable[int(ir_idx)] for ir_idx in pairing_ir_idxs]
+            )
+
+        # If 1 or fewer variables, trivial or impossible optimisation problem, will be trivially handled by solver
+        if len(ir_indicator_variables) <= 1:
             return ilp_model, ir_indicator_variables
 
         # Add XOR between IRs that are incompatible
+        incompatible_ir_pair_idxs: List[Tuple[int, int]] = (
+            IRfold._get_incompatible_ir_pair_idxs(
+                ir_set, invalid_gap_sz_ir_idxs, show_prog=show_prog
+            )
+        )
+        IRfold._add_incompatibility_constraints(
+            ilp_model,
+            ir_idx_to_variable,
+            incompatible_ir_pair_idxs,
+            show_prog=show_prog,
+        )
+
+        # All constraints and the objective must have integer coefficients for CP-SAT solver
+        # Obtain free energies of the IRs that are valid, they comprise the coefficients for ir vars
+        variable_coefficients: List[int] = IRfold._get_ir_coefficients(
+            ir_set[valid_gap_sz_mask],
+            seq_len,
+            sequence,
+            out_dir,
+            seq_name,
+            show_warnings=show_warnings,
+            n_workers=n_workers,
+            approx_energies=approx_energies,
+            energy_model=energy_model,
+            executor=executor,
+            energy_cache=energy_cache,
+        )
+
+        # Single IR free energies are not additive for nested IRs closing the same loop, pairs of them are corrected
+        correction_variables: List[cp_model.IntVar] = []
+        correction_coefficients: List[int] = []
+        if pair_corrections:
+            correction_variables, correction_coefficients = (
+                IRfold._add_pair_corrections(
+                    ilp_model,
+                    ir_set[valid_gap_sz_mask],
+                    ir_indicator_variables,
+                    sequence,
+                    energy_model=energy_model,
+                    energy_cache=energy_cache,
+                )
+            )
+
+        # Define objective function
+        obj_fn_expr = cp_model.LinearExpr.WeightedSum(
+            ir_indicator_variables + correction_variables,
+            list(variable_coefficients) + correction_coefficients,
+        )
+        ilp_model.Minimize(obj_fn_expr)
+
+        return ilp_model, ir_indicator_variables
+
+    @staticmethod
+    def _add_pair_corrections(
+        ilp_model: cp_model.CpModel,
+        valid_irs: IRSet,
+        ir_indicator_variables: List[cp_model.IntVar],
+        sequence: str,
+        *,
+        energy_model: EnergyModel = None,
+        energy_cache: LocalEnergyCache = None,
+    ) -> Tuple[List[cp_model.IntVar], List[int]]:
+        """Adds a variable for each pair of nested IRs that may close the same loop (see find_adjacent_ir_pairs) and
+        whose free energy together differs from the sum of their single IR free energies. The variable stands for
+        the product of the two IRs' variables and the negation of every variable of an IR pairing a base of the loop
+        between them, i.e. the pair closing the loop. As the objective is minimised, only the side of the product
+        the correction's sign pushes against is constrained: a penalty must be paid if the pair closes the loop and
+        a bonus may only be taken if it does. Returns the variables and their objective coefficients, the
+        corrections (see calc_ir_pair_corrections)."""
+        adjacent_pairs: np.ndarray = find_adjacent_ir_pairs(valid_irs)
+        corrections: np.ndarray = calc_ir_pair_corrections(
+            valid_irs,
+            adjacent_pairs,
+            sequence,
+            energy_model=energy_model,
+            energy_cache=energy_cache,
+        )
+        adjacent_pairs, corrections = (
+            adjacent_pairs[corrections != 0],
+            corrections[corrections != 0],
+        )
+        irs_by_position: List[np.ndarray] = irs_by_paired_position(
+            valid_irs, len(sequence)
+        )
+
+        correction_variables: List[cp_model.IntVar] = []
+        for (outer_idx, inner_idx), correction in zip(
+            adjacent_pairs.tolist(), corrections.tolist()
+        ):
+            (_, outer_left_end), (outer_right_start, _) = valid_irs[outer_idx]
+            (inner_left_start, _), (_, inner_right_end) = valid_irs[inner_idx]
+            loop_positions: List[int] = list(
+                range(outer_left_end + 1, inner_left_start)
+            ) + list(range(inner_right_end + 1, outer_right_start))
+            loop_ir_idxs: List[int] = (
+                np.unique(
+                    np.concatenate([irs_by_position[pos] for pos in loop_positions])
+                ).tolist()
+                if loop_positions
+                else []
+            )
+
+            outer_var: cp_model.IntVar = ir_indicator_variables[outer_idx]
+            inner_var: cp_model.IntVar = ir_indicator_variables[inner_idx]
+            closes_loop: cp_model.IntVar = ilp_model.NewBoolVar(
+                f"loop_{outer_idx}_{inner_idx}"
+            )
+            loop_ir_vars: List[cp_model.IntVar] = [
+                ir_indicator_variables[ir_idx] for ir_idx in loop_ir_idxs
+            ]
+            if correction > 0:
+                ilp_model.AddBoolOr(
+                    [outer_var.Not(), inner_var.Not(), closes_loop] + loop_ir_vars
+                )
+            else:
+                ilp_model.AddBoolAnd(
+                    [outer_var, inner_var] + [var.Not() for var in loop_ir_vars]
+                ).OnlyEnforceIf(closes_loop)
+            correction_variables.append(closes_loop)
+
+        return correction_variables, corrections.tolist()
+
+    @staticmethod
+    def _get_helix_model(
+        ir_list: Union[List[IR], IRSet],
+        seq_len: int,
+        sequence: str,
+        out_dir: str,
+        seq_name: str,
+        *,
+        show_prog: bool = False,
+        show_warnings: bool = False,
+        n_workers: int = 1,
+        approx_energies: bool = False,
+        energy_model: EnergyModel = None,
+        executor: Executor = None,
+        energy_cache: LocalEnergyCache = None,
+    ) -> Tuple[cp_model.CpModel, List[HelixSlot]]:
+        """Builds a model with the same optimum as _get_ilp_model's but variables per helix rather than per IR.
+
+        IRs are grouped into maximal helices (see group_helices). Only IRs with negative coefficients are candidates
+        as no others can lower the objective. A helix gets one slot per candidate IR that could be present together
+        with the others, usually one, each slot an integer choosing a candidate, i.e. how far the helix is trimmed at
+        either end, with the candidate's start, end and precomputed coefficient looked up by element constraints.
+        Slots of a helix are ordered outermost first. Slots of different helices that may conflict must be in one of
+        the compatible relative positions (see HELIX_RELATIVE_POSITIONS), stated as linear constraints on their
+        starts and ends, so IR pairs are never enumerated. Returns the model and its slots, see
+        _get_active_helix_ir_idxs."""
+        ilp_model: cp_model.CpModel = cp_model.CpModel()
+
+        ir_set: IRSet = IRSet.from_irs(ir_list)
+        valid_ir_idxs: np.ndarray = ir_set.valid_gap_size_mask().nonzero()[0]
+        variable_coefficients: np.ndarray = np.array(
+            IRfold._get_ir_coefficients(
+                ir_set[valid_ir_idxs],
+                seq_len,
+                sequence,
+                out_dir,
+                seq_name,
+                show_warnings=show_warnings,
+                n_workers=n_workers,
+                approx_energies=approx_energies,
+                energy_model=energy_model,
+                executor=executor,
+                energy_cache=energy_cache,
+            ),
+            dtype=np.int64,
+        ).reshape(-1)
+        candidate_ir_idxs: np.ndarray = valid_ir_idxs[variable_coefficients < 0]
+        candidate_coefficients: Dict[int, int] = dict(
+            zip(
+                valid_ir_idxs.tolist(),
+                variable_coefficients.tolist(),
+            )
+        )
+        candidate_irs: IRSet = ir_set[candidate_ir_idxs]
+
+        # Per helix, its IRs and the start, end, coefficient and presence of each of its slots
+        helices: List[IRSet] = []
+        helix_slots: List[HelixSlot] = []
+        helix_slot_vars: List[List[tuple]] = []
+        coefficient_vars: List[cp_model.IntVar] = []
+        for helix_idxs in tqdm.tqdm(
+            group_helices(candidate_irs),
+            desc="Adding helix slots",
+            disable=not show_prog,
+        ):
+            helix: IRSet = candidate_irs[helix_idxs]
+            helix_ir_idxs: np.ndarray = candidate_ir_idxs[helix_idxs]
+            axis: int = int(helix.left_start[0]) + int(helix.right_end[0])
+            left_starts: List[int] = helix.left_start.tolist()
+            left_ends: List[int] = helix.left_end.tolist()
+            coefficients: List[int] = [
+                candidate_coefficients[ir_idx] for ir_idx in helix_ir_idxs.tolist()
+            ]
+
+            slot_vars: List[tuple] = []
+            for slot_idx in range(max_disjoint_irs(helix)):
+                choice = ilp_model.NewIntVar(
+                    0, len(helix), f"helix_{len(helices)}_slot_{slot_idx}"
+                )
+                present = ilp_model.NewBoolVar("")
+                ilp_model.Add(choice >= 1).OnlyEnforceIf(present)
+                ilp_model.Add(choice == 0).OnlyEnforceIf(present.Not())
+
+                # An absent slot takes its helix's first candidate's position, which its constraints ignore
+                left_start = ilp_model.NewIntVar(min(left_starts), max(left_starts), "")
+                left_end = ilp_model.NewIntVar(min(left_ends), max(left_ends), "")
+                coefficient = ilp_model.NewIntVar(min(min(coefficients), 0), 0, "")
+                ilp_model.AddElement(choice, left_starts[:1] + left_starts, left_start)
+                ilp_model.AddElement(choice, left_ends[:1] + left_ends, left_end)
+                ilp_model.AddElement(choice, [0] + coefficients, coefficient)
+
+                # Sub-stems of a helix are compatible if disjoint, which on one axis means nested
+                if slot_vars:
+                    outer_left_end, outer_present = slot_vars[-1][1], slot_vars[-1][4]
+                    ilp_model.AddImplication(present, outer_present)
+                    ilp_model.Add(left_start >= outer_left_end + 1).OnlyEnforceIf(
+                        present
+                    )
+                slot_vars.append(
+                    (left_start, left_end, axis - left_end, axis - left_start, present)
+                )
+                helix_slots.append((choice, helix_ir_idxs))
+                coefficient_vars.append(coefficient)
+
+            helices.append(helix)
+            helix_slot_vars.append(slot_vars)
+
+        # Slots of helices that may conflict must be in a compatible relative position
+        for helix_a_idx in tqdm.tqdm(
+            range(len(helices)), desc="Adding helix constraints", disable=not show_prog
+        ):
+            for helix_b_idx in range(helix_a_idx + 1, len(helices)):
+                always_compatible, relative_positions = helix_pair_relative_positions(
+                    helices[helix_a_idx], helices[helix_b_idx]
+                )
+                if always_compatible:
+                    continue
+                for slot_a in helix_slot_vars[helix_a_idx]:
+                    for slot_b in helix_slot_vars[helix_b_idx]:
+                        IRfold._add_helix_slot_pair_constraint(
+                            ilp_model, slot_a, slot_b, relative_positions
+                        )
+
+        ilp_model.Minimize(sum(coefficient_vars))
+        return ilp_model, helix_slots
+
+    @staticmethod
+    def _add_helix_slot_pair_constraint(
+        ilp_model: cp_model.CpModel,
+        slot_a: tuple,
+        slot_b: tuple,
+        relative_positions: List[str],
+    ) -> None:
+        """Constrains two slots of different helices, each given as (left start, left end, right start, right end,
+        present), to be in one of relative_positions if both are present."""
+        a_left_start, a_left_end, a_right_start, a_right_end, a_present = slot_a
+        b_left_start, b_left_end, b_right_start, b_right_end, b_present = slot_b
+        position_constraints = {
+            "before": [a_right_end + 1 <= b_left_start],
+            "after": [b_right_end + 1 <= a_left_start],
+            "inside": [
+                a_left_end + 1 <= b_left_start,
+                b_right_end + 1 <= a_right_start,
+            ],
+            "outside": [
+                b_left_end + 1 <= a_left_start,
+                a_right_end + 1 <= b_right_start,
+            ],
+        }
+
+        in_relative_positions: List[cp_model.IntVar] = []
+        for relative_pos in relative_positions:
+            in_relative_pos = ilp_model.NewBoolVar("")
+            for constraint in position_constraints[relative_pos]:
+                ilp_model.Add(constraint).OnlyEnforceIf(in_relative_pos)
+            in_relative_positions.append(in_relative_pos)
+        ilp_model.AddBoolOr([a_present.Not(), b_present.Not()] + in_relative_positions)
+
+    @staticmethod
+    def _get_active_helix_ir_idxs(
+        solver: cp_model.CpSolver, helix_slots: List[HelixSlot]
+    ) -> List[int]:
+        return [
+            int(helix_ir_idxs[solver.Value(choice) - 1])
+            for choice, helix_ir_idxs in helix_slots
+            if solver.Value(choice) > 0
+        ]
+
+    @staticmethod
+    def _build_ilp_model(
+        ir_idxs: List[int],
+        incompatible_ir_pair_idxs: List[Tuple[int, int]],
+        variable_coefficients: List[int],
+    ) -> Tuple[cp_model.CpModel, List[cp_model.IntVar]]:
+        """Builds the model from precomputed IR pair incompatibilities and coefficients, one variable per IR index."""
+        ilp_model: cp_model.CpModel = cp_model.CpModel()
+        ir_idx_to_variable: Dict[int, cp_model.IntVar] = {
+            ir_idx: ilp_model.NewBoolVar(f"ir_{ir_idx}") for ir_idx in ir_idxs
+        }
+        ir_indicator_variables: List[cp_model.IntVar] = list(
+            ir_idx_to_variable.values()
+        )
+
+        # Mirrors _get_ilp_model, 1 or fewer variables is handled trivially by the solver
+        if len(ir_indicator_variables) <= 1:
+            return ilp_model, ir_indicator_variables
+
+        IRfold._add_incompatibility_constraints(
+            ilp_model, ir_idx_to_variable, incompatible_ir_pair_idxs
+        )
+        ilp_model.Minimize(
+            cp_model.LinearExpr.WeightedSum(
+                ir_indicator_variables, variable_coefficients
+            )
+        )
+
+        return ilp_model, ir_indicator_variables
+
+    @staticmethod
+    def _new_solver(
+        solver_params: Dict[str, Union[int, float, bool, str]] = None,
+    ) -> cp_model.CpSolver:
+        """Returns a solver with the CP-SAT parameters set, enum valued parameters may be given by name, e.g.
+        {"search_branching": "FIXED_SEARCH"}."""
+        solver: cp_model.CpSolver = cp_model.CpSolver()
+        for param_name, param_value in (solver_params or {}).items():
+            if not hasattr(solver.parameters, param_name):
+                raise ValueError(f"Unknown CP-SAT parameter {param_name}")
+            current_value = getattr(solver.parameters, param_name)
+            if isinstance(param_value, str) and not isinstance(current_value, str):
+                param_value = IRfold._solver_enum_value(
+                    solver.parameters, param_name, param_value
+                )
+            setattr(solver.parameters, param_name, param_value)
+        return solver
+
+    @staticmethod
+    def _solver_enum_value(solver_parameters, param_name: str, value_name: str):
+        # Newer OR-Tools expose parameters as native enums, older ones as protobuf enum numbers
+        enum_members = getattr(
+            type(getattr(solver_parameters, param_name)), "__members__", None
+        )
+        try:
+            if enum_members is not None:
+                return enum_members[value_name]
+            return (
+                solver_parameters.DESCRIPTOR.fields_by_name[param_name]
+                .enum_type.values_by_name[value_name]
+                .number
+            )
+        except (AttributeError, KeyError):
+            raise ValueError(
+                f"Unknown value {value_name} of CP-SAT parameter {param_name}"
+            ) from None
+
+    @staticmethod
+    def _get_active_ir_idxs(
+        solver: cp_model.CpSolver, variables: List[cp_model.IntVar]
+    ) -> List[int]:
+        return [
+            int(re.findall(r"-?\d+\.?\d*", v.Name())[0])
+            for v in variables
+            if solver.Value(v) == 1
+        ]
+
+    @staticmethod
+    def _get_incompatible_ir_pair_idxs(
+        ir_set: IRSet, invalid_gap_sz_ir_idxs: List[int], *, show_prog: bool = False
+    ) -> List[Tuple[int, int]]:
+        """Returns the index pairs of IRs with valid gap sizes that cannot both be present in a structure."""
         valid_ir_pairs, valid_idx_pairs = get_valid_gap_sz_ir_n_tuples(
-            2, n_irs, ir_list, invalid_gap_sz_ir_idxs
+            2, len(ir_set), ir_set.to_irs(), invalid_gap_sz_ir_idxs
         )
-        incompatible_ir_pair_idxs: List[Tuple[int, int]] = [
+        return [
             idx_pair
-            for ir_pair, idx_pair in tqdm(
+            for ir_pair, idx_pair in tqdm.tqdm(
                 zip(valid_ir_pairs, valid_idx_pairs),
                 desc="Comparing IR pairs",
                 total=len(valid_ir_pairs),
@@ -235,24 +1334,21 @@ class IRfold:
             if ir_pair_invalid_relative_pos(ir_pair[0], ir_pair[1])
         ]
 
+    @staticmethod
+    def _add_incompatibility_constraints(
+        ilp_model: cp_model.CpModel,
+        ir_idx_to_variable: Dict[int, cp_model.IntVar],
+        incompatible_ir_pair_idxs: List[Tuple[int, int]],
+        *,
+        show_prog: bool = False,
+    ) -> None:
         # List comprehension for speed over for-loop.
-        # Search for variables required as discarding invalid gap sized IRs changes IR variable ordering in list
+        # Variables are looked up by IR index as discarding invalid gap sized IRs changes IR variable ordering in list
         [
             ilp_model.AddAtMostOne(
-                [
-                    [
-                        var
-                        for var in ir_indicator_variables
-                        if str(ir_a_idx) in var.Name()
-                    ][0],
-                    [
-                        var
-                        for var in ir_indicator_variables
-                        if str(ir_b_idx) in var.Name()
-                    ][0],
-                ]
-            )
-            for ir_a_idx, ir_b_idx in tqdm(
+                [ir_idx_to_variable[ir_a_idx], ir_idx_to_variable[ir_b_idx]]
+            )
+            for ir_a_idx, ir_b_idx in tqdm.tqdm(
                 incompatible_ir_pair_idxs,
                 desc="Adding XOR constraints",
                 total=len(incompatible_ir_pair_idxs),
@@ -260,20 +1356,1419 @@ class IRfold:
             )
         ]
 
-        # All constraints and the objective must have integer coefficients for CP-SAT solver
-        # Obtain free energies of the IRs that are valid, they comprise the coefficients for ir vars
+    @staticmethod
+    def _get_ir_coefficients(
+        ir_set: IRSet,
+        seq_len: int,
+        sequence: str,
+        out_dir: str,
+        seq_name: str,
+        *,
+        show_warnings: bool = False,
+        n_workers: int = 1,
+        approx_energies: bool = False,
+        energy_model: EnergyModel = None,
+        executor: Executor = None,
+        energy_cache: LocalEnergyCache = None,
+    ) -> List[int]:
+        """Returns the rounded free energy of each IR in ir_set, evaluated in a process pool if n_workers > 1 or by
+        executor if one is given, under energy_model if it is not None. If approx_energies, free energies are
+        approximated from nearest neighbour parameters instead of evaluated by ViennaRNA, see
+        calc_ir_free_energies_nn. With an energy_cache, only IRs whose local context it does not hold are
+        evaluated, see calc_ir_free_energies_cached."""
+        if approx_energies:
+            return [
+                round(ir_free_energy)
+                for ir_free_energy in calc_ir_free_energies_nn(ir_set, sequence)
+            ]
+        if energy_cache is not None:
+            return [
+                round(ir_free_energy)
+                for ir_free_energy in calc_ir_free_energies_cached(
+                    ir_set,
+                    sequence,
+                    energy_cache,
+                    n_workers=n_workers,
+                    energy_model=energy_model,
+                    executor=executor,
+                )
+            ]
+        if n_workers > 1 or energy_model is not None or executor is not None:
+            return [
+                round(ir_free_energy)
+                for ir_free_energy in calc_ir_free_energies(
+                    ir_set,
+                    sequence,
+                    n_workers=n_workers,
+                    energy_model=energy_model,
+                    executor=executor,
+                )
+            ]
+
+        # Single IR dot bracket reprs are rendered in chunks into a reused buffer rather than one string per IR
         variable_coefficients: List[int] = []
-        for var in ir_indicator_variables:
-            ir_idx: int = int(re.findall(r"-?\d+\.?\d*", var.Name())[0])
-            ir_db_repr: str = irs_to_dot_bracket([ir_list[ir_idx]], seq_len)
-            ir_free_energy: float = calc_free_energy(
-                ir_db_repr, sequence, out_dir, seq_name, show_warnings=show_warnings
+        db_batch_buffer: np.ndarray = np.empty(
+            (min(DOT_BRACKET_BATCH_SIZE, len(ir_set)), seq_len), dtype=np.uint8
+        )
+        for chunk_start in range(0, len(ir_set), DOT_BRACKET_BATCH_SIZE):
+            ir_chunk: IRSet = ir_set[chunk_start : chunk_start + DOT_BRACKET_BATCH_SIZE]
+            db_batch: np.ndarray = irs_to_dot_bracket_batch(
+                ir_chunk, seq_len, out=db_batch_buffer[: len(ir_chunk)]
             )
-            variable_coefficients.append(round(ir_free_energy))
-        # Define objective function
-        obj_fn_expr = LinearExpr.WeightedSum(
-            ir_indicator_variables, variable_coefficients
+            for ir_db_repr in dot_bracket_batch_as_bytes(db_batch):
+                ir_free_energy: float = calc_free_energy(
+                    ir_db_repr.decode("ascii"),
+                    sequence,
+                    out_dir,
+                    seq_name,
+                    show_warnings=show_warnings,
+                )
+                variable_coefficients.append(round(ir_free_energy))
+
+        return variable_coefficients
+
+
+class IRfoldEngine:
+    """Folding session constructed once with its configuration and reused for many fold calls, keeping warm state
+    between them: found IRs are cached per sequence in an LRU cache, out_dir and the IUPACpal executable are resolved
+    once, CP-SAT parameters are validated once and, with n_workers > 1, one process pool is kept for IR free energy
+    evaluation until close is called. Engines are context managers that close on exit.
+
+    fold_async folds from within an event loop, running model building and solving in async_executor (the loop's
+    default executor if None) with at most max_concurrency folds in progress at once.
+
+    fold_batch folds many sequences at once, scheduling the most expensive first by the engine's cost_model.
+
+    With model_formulation "helix" the engine solves IRfold._get_helix_model's model, which has the same optimum as
+    the default per-IR model with far fewer variables and constraints. With solve_backend "mwis" IRs are selected
+    heuristically instead of by CP-SAT, for IR sets too large to solve within a latency budget.
+
+    CP-SAT parameters are taken from the named solver_profile (see load_solver_profile), overridden by any given in
+    solver_params.
+
+    With min_pair_probability, IRs whose mean base pair probability in the sequence's thermodynamic ensemble is
+    below it are discarded right after IR search (see prune_irs_by_pair_probability), trading the optimality of the
+    fold for fewer variables, energy evaluations and IR pair checks.
+
+    With an energy_cache, IR free energies are looked up by the IR's local context (see LocalEnergyCache), so motifs
+    recurring across the sequences an engine folds, or across engines sharing the cache, are evaluated once.
+
+    With pair_corrections, the per-IR model also corrects the objective for pairs of nested IRs closing the same
+    interior loop, bulge or stack, whose free energy is not the sum of their single IR free energies, see
+    IRfold._add_pair_corrections. Only such pairs are evaluated, not every compatible IR pair.
+
+    IRfold.fold delegates to a shared default engine, see default."""
+
+    _default_engine: "IRfoldEngine" = None
+    _default_engine_lock = threading.Lock()
+
+    def __init__(
+        self,
+        out_dir: str = ".",
+        *,
+        ir_search_backend: str = "iupacpal",
+        max_mismatches: int = 0,
+        energy_model: EnergyModel = None,
+        approx_energies: bool = False,
+        n_workers: int = 1,
+        solver_params: Dict[str, Union[int, float, bool, str]] = None,
+        ir_cache_size: int = IR_CACHE_SIZE,
+        show_prog: bool = False,
+        show_warnings: bool = False,
+        async_executor: Executor = None,
+        max_concurrency: int = None,
+        result_cache: FoldResultCache = None,
+        budget: FoldBudget = None,
+        fallbacks: Tuple[str, ...] = ("prune",),
+        model_formulation: str = "ir",
+        solve_backend: str = "cp_sat",
+        solver_profile: str = None,
+        min_pair_probability: float = None,
+        energy_cache: LocalEnergyCache = None,
+        pair_corrections: bool = False,
+    ):
+        if ir_search_backend not in IR_SEARCH_BACKENDS:
+            raise ValueError(
+                f"Unknown IR search backend {ir_search_backend}, expected one of {IR_SEARCH_BACKENDS}"
+            )
+        if any(fallback not in FOLD_FALLBACKS for fallback in fallbacks):
+            raise ValueError(
+                f"Unknown fallback in {fallbacks}, expected any of {FOLD_FALLBACKS}"
+            )
+        if model_formulation not in MODEL_FORMULATIONS:
+            raise ValueError(
+                f"Unknown model formulation {model_formulation}, expected one of {MODEL_FORMULATIONS}"
+            )
+        if solve_backend not in SOLVE_BACKENDS:
+            raise ValueError(
+                f"Unknown solve backend {solve_backend}, expected one of {SOLVE_BACKENDS}"
+            )
+        if min_pair_probability is not None and not 0 <= min_pair_probability <= 1:
+            raise ValueError(
+                f"min_pair_probability must be within [0, 1], got {min_pair_probability}"
+            )
+        if pair_corrections and (
+            model_formulation != "ir" or solve_backend != "cp_sat" or approx_energies
+        ):
+            raise ValueError(
+                'Pair corrections require the "ir" model formulation, "cp_sat" solve backend and ViennaRNA energies'
+            )
+        if ir_search_backend == "watson_crick" and max_mismatches != 0:
+            raise ValueError(
+                "The watson_crick IR search backend requires max_mismatches=0"
+            )
+        if (
+            ir_search_backend == "iupacpal"
+            and not (Path(__file__).parent / "IUPACpal").exists()
+        ):
+            raise FileNotFoundError("Could not find IUPACpal executable.")
+
+        out_dir_path: Path = Path(out_dir).resolve()
+        self.out_dir: str = str(
+            out_dir_path if out_dir_path.exists() else Path.cwd().resolve()
         )
-        ilp_model.Minimize(obj_fn_expr)
+        self.ir_search_backend: str = ir_search_backend
+        self.max_mismatches: int = max_mismatches
+        self.energy_model: EnergyModel = energy_model
+        self.approx_energies: bool = approx_energies
+        self.n_workers: int = n_workers
+        # Parameters given explicitly override those of the profile
+        self.solver_params: Dict[str, Union[int, float, bool, str]] = {
+            **(load_solver_profile(solver_profile) if solver_profile else {}),
+            **(solver_params or {}),
+        }
+        self.ir_cache_size: int = ir_cache_size
+        self.show_prog: bool = show_prog
+        self.show_warnings: bool = show_warnings
+        self.async_executor: Executor = async_executor
+        self.max_concurrency: int = max_concurrency
+        self.result_cache: FoldResultCache = result_cache
+        self.budget: FoldBudget = budget
+        self.fallbacks: Tuple[str, ...] = tuple(fallbacks)
+        self.model_formulation: str = model_formulation
+        self.solve_backend: str = solve_backend
+        self.min_pair_probability: float = min_pair_probability
+        self.energy_cache: LocalEnergyCache = energy_cache
+        self.pair_corrections: bool = pair_corrections
 
-        return ilp_model, ir_indicator_variables
+        # Hashed once so result cache keys change if the parameter file's contents do
+        self._param_file_digest: str = None
+        if energy_model is not None and energy_model.param_file is not None:
+            with open(energy_model.param_file, "rb") as f_in:
+                self._param_file_digest = hashlib.sha256(f_in.read()).hexdigest()
+
+        # Unknown parameter names raise here rather than on the first fold
+        self._new_solver()
+
+        self._ir_cache: "OrderedDict[Tuple[str, int], IRSet]" = OrderedDict()
+        self._ir_cache_lock = threading.Lock()
+        self._executor: ProcessPoolExecutor = None
+        self._executor_lock = threading.Lock()
+        self._async_semaphore: asyncio.Semaphore = None
+        self._async_semaphore_loop: asyncio.AbstractEventLoop = None
+
+        # Refined by every batch fold the engine runs
+        self.cost_model: FoldCostModel = FoldCostModel()
+
+    @classmethod
+    def default(cls) -> "IRfoldEngine":
+        """Returns the engine shared by IRfold's classmethod API, created with the default configuration on first
+        use."""
+        with cls._default_engine_lock:
+            if cls._default_engine is None:
+                cls._default_engine = cls()
+            return cls._default_engine
+
+    def fold(
+        self,
+        sequence: str,
+        out_dir: str = None,
+        *,
+        seq_name: str = "seq",
+        save_performance: bool = False,
+        show_prog: bool = None,
+        max_mismatches: int = None,
+        show_warnings: bool = None,
+        n_workers: int = None,
+        approx_energies: bool = None,
+        result_cache: FoldResultCache = None,
+        budget: FoldBudget = None,
+        solve_backend: str = None,
+        on_incumbent: Callable[[IncumbentSolution], None] = None,
+        solver_profile: str = None,
+        constraints: StructureConstraints = None,
+        min_pair_probability: float = None,
+    ) -> Tuple[str, float]:
+        """Folds the sequence, returning its dot bracket repr and objective function value. Keyword arguments left
+        as None take the engine's configuration. If the engine or call has a result cache, results are looked up in
+        and added to it. See fold_with_report for how folds are degraded to fit a budget.
+        """
+        db_repr, obj_fn_value, _ = self.fold_with_report(
+            sequence,
+            out_dir,
+            seq_name=seq_name,
+            save_performance=save_performance,
+            show_prog=show_prog,
+            max_mismatches=max_mismatches,
+            show_warnings=show_warnings,
+            n_workers=n_workers,
+            approx_energies=approx_energies,
+            result_cache=result_cache,
+            budget=budget,
+            solve_backend=solve_backend,
+            on_incumbent=on_incumbent,
+            solver_profile=solver_profile,
+            constraints=constraints,
+            min_pair_probability=min_pair_probability,
+        )
+        return db_repr, obj_fn_value
+
+    def fold_with_report(
+        self,
+        sequence: str,
+        out_dir: str = None,
+        *,
+        seq_name: str = "seq",
+        save_performance: bool = False,
+        show_prog: bool = None,
+        max_mismatches: int = None,
+        show_warnings: bool = None,
+        n_workers: int = None,
+        approx_energies: bool = None,
+        result_cache: FoldResultCache = None,
+        budget: FoldBudget = None,
+        solve_backend: str = None,
+        on_incumbent: Callable[[IncumbentSolution], None] = None,
+        solver_profile: str = None,
+        constraints: StructureConstraints = None,
+        min_pair_probability: float = None,
+    ) -> Tuple[str, float, FoldReport]:
+        """As fold, also returning a FoldReport of the path the fold took.
+
+        With a budget, the model size is estimated right after IR search (see estimate_model_size). If it does not
+        fit, the engine's fallbacks are tried in order (see FOLD_FALLBACKS) and FoldBudgetExceededError is raised
+        if none applies. Results served from the result cache are reported with path "cached".
+
+        If on_incumbent is given it is called, from the solver's thread, with each improving solution as an
+        IncumbentSolution while CP-SAT searches. With save_performance, the incumbents are also appended to the
+        anytime curves file next to the performance file, see write_anytime_curve_to_file. Folds observed either way
+        bypass the result cache and folds not solved by CP-SAT have no incumbents.
+
+        If solver_profile is given, CP-SAT runs with the profile's parameters (see load_solver_profile) in place of
+        the engine's solver_params.
+
+        With constraints, IRs pairing a position constrained to be unpaired are filtered out right after IR search, so
+        they are never validated, evaluated or modelled, and each position constrained to be paired must be paired by
+        one of the IRs in the structure. Paired positions are model constraints and so are only supported with the
+        "ir" model formulation and "cp_sat" solve backend. ValueError is raised if a paired position cannot be
+        paired.
+        """
+        out_dir = self.out_dir if out_dir is None else out_dir
+        show_prog = self.show_prog if show_prog is None else show_prog
+        max_mismatches = (
+            self.max_mismatches if max_mismatches is None else max_mismatches
+        )
+        show_warnings = self.show_warnings if show_warnings is None else show_warnings
+        n_workers = self.n_workers if n_workers is None else n_workers
+        approx_energies = (
+            self.approx_energies if approx_energies is None else approx_energies
+        )
+        result_cache = self.result_cache if result_cache is None else result_cache
+        budget = self.budget if budget is None else budget
+        solve_backend = self.solve_backend if solve_backend is None else solve_backend
+        if solve_backend not in SOLVE_BACKENDS:
+            raise ValueError(
+                f"Unknown solve backend {solve_backend}, expected one of {SOLVE_BACKENDS}"
+            )
+        if self.pair_corrections and (solve_backend != "cp_sat" or approx_energies):
+            raise ValueError(
+                'Pair corrections require the "cp_sat" solve backend and ViennaRNA energies'
+            )
+        min_pair_probability = (
+            self.min_pair_probability
+            if min_pair_probability is None
+            else min_pair_probability
+        )
+        if min_pair_probability is not None and not 0 <= min_pair_probability <= 1:
+            raise ValueError(
+                f"min_pair_probability must be within [0, 1], got {min_pair_probability}"
+            )
+        solver_params: Dict[str, Union[int, float, bool, str]] = (
+            self.solver_params
+            if solver_profile is None
+            else load_solver_profile(solver_profile)
+        )
+        if solver_profile is not None:
+            IRfold._new_solver(
+                solver_params
+            )  # Unknown parameters raise before any IR search
+        if constraints is not None:
+            constraints.validate(len(sequence))
+            if constraints.paired and (
+                self.model_formulation != "ir" or solve_backend != "cp_sat"
+            ):
+                raise ValueError(
+                    'Positions constrained to be paired require the "ir" model formulation and "cp_sat" solve backend'
+                )
+
+        fold_kwargs = dict(
+            seq_name=seq_name,
+            save_performance=save_performance,
+            show_prog=show_prog,
+            max_mismatches=max_mismatches,
+            show_warnings=show_warnings,
+            n_workers=n_workers,
+            approx_energies=approx_energies,
+            budget=budget,
+            solve_backend=solve_backend,
+            on_incumbent=on_incumbent,
+            solver_params=solver_params,
+            constraints=constraints,
+            min_pair_probability=min_pair_probability,
+        )
+
+        # Performance and incumbents are only recorded for a fold that runs the solver, so such folds bypass the cache
+        if result_cache is None or save_performance or on_incumbent is not None:
+            return self._fold(sequence, out_dir, **fold_kwargs)
+
+        cache_key: str = self.fold_cache_key(
+            sequence,
+            max_mismatches=max_mismatches,
+            approx_energies=approx_energies,
+            budget=budget,
+            solve_backend=solve_backend,
+            solver_params=solver_params,
+            constraints=constraints,
+            min_pair_probability=min_pair_probability,
+        )
+        cached_result: Tuple[str, float] = result_cache.get(cache_key)
+        if cached_result is not None:
+            return cached_result[0], cached_result[1], FoldReport("cached")
+
+        db_repr, obj_fn_value, fold_report = self._fold(
+            sequence, out_dir, **fold_kwargs
+        )
+        result_cache.put(cache_key, (db_repr, obj_fn_value))
+        return db_repr, obj_fn_value, fold_report
+
+    def fold_cache_key(
+        self,
+        sequence: str,
+        *,
+        max_mismatches: int = None,
+        approx_energies: bool = None,
+        budget: FoldBudget = None,
+        solve_backend: str = None,
+        solver_params: Dict[str, Union[int, float, bool, str]] = None,
+        constraints: StructureConstraints = None,
+        min_pair_probability: float = None,
+    ) -> str:
+        """Returns the result cache key of folding the sequence with this engine, see fold_cache_key. The key covers
+        the IR search backend and mismatch budget, energy model (including the contents of its parameter file),
+        approximate energies, model formulation, solve backend, solver parameters, the fold budget and fallbacks, any
+        structure constraints, the minimum IR pair probability and pair corrections.
+        """
+        budget = self.budget if budget is None else budget
+        return fold_cache_key(
+            sequence,
+            ir_search_backend=self.ir_search_backend,
+            max_mismatches=(
+                self.max_mismatches if max_mismatches is None else max_mismatches
+            ),
+            approx_energies=(
+                self.approx_energies if approx_energies is None else approx_energies
+            ),
+            temperature=(
+                None if self.energy_model is None else self.energy_model.temperature
+            ),
+            param_file_digest=self._param_file_digest,
+            solver_params=(
+                self.solver_params if solver_params is None else solver_params
+            ),
+            budget=None if budget is None else list(budget),
+            fallbacks=list(self.fallbacks),
+            model_formulation=self.model_formulation,
+            solve_backend=(
+                self.solve_backend if solve_backend is None else solve_backend
+            ),
+            constraints=(
+                None
+                if constraints is None
+                else [sorted(constraints.unpaired), sorted(constraints.paired)]
+            ),
+            min_pair_probability=(
+                self.min_pair_probability
+                if min_pair_probability is None
+                else min_pair_probability
+            ),
+            pair_corrections=self.pair_corrections,
+        )
+
+    def _fold(
+        self,
+        sequence: str,
+        out_dir: str,
+        *,
+        seq_name: str,
+        save_performance: bool = False,
+        show_prog: bool,
+        max_mismatches: int,
+        show_warnings: bool,
+        n_workers: int,
+        approx_energies: bool,
+        budget: FoldBudget,
+        solve_backend: str = "cp_sat",
+        on_incumbent: Callable[[IncumbentSolution], None] = None,
+        solver_params: Dict[str, Union[int, float, bool, str]] = None,
+        constraints: StructureConstraints = None,
+        min_pair_probability: float = None,
+        found_irs: IRSet = None,
+    ) -> Tuple[str, float, FoldReport]:
+        # Find IRs in sequence, unless they were found ahead of the fold
+        if found_irs is None:
+            found_irs = self.find_irs(
+                sequence, out_dir, seq_name=seq_name, max_mismatches=max_mismatches
+            )
+        paired_positions: List[int] = []
+        if constraints is not None:
+            found_irs = filter_irs_by_constraints(found_irs, constraints)
+            paired_positions = list(constraints.paired)
+        if min_pair_probability is not None:
+            found_irs = prune_irs_by_pair_probability(
+                found_irs, sequence, min_pair_probability, self.energy_model
+            )
+
+        n_irs_found: int = len(found_irs)
+        seq_len: int = len(sequence)
+        if n_irs_found == 0 and paired_positions:
+            raise ValueError(
+                f"Positions {paired_positions} are constrained to be paired but no IRs were found"
+            )
+        if n_irs_found == 0:  # Return sequence if no IRs found
+            db_repr, obj_fn_value = "".join(["." for _ in range(seq_len)]), 0
+            if save_performance:
+                write_solver_performance_to_file(
+                    db_repr, obj_fn_value, 0.0, seq_len, out_dir, IRfold.__name__
+                )
+            return db_repr, obj_fn_value, FoldReport("full", n_irs_used=0)
+
+        # Degrade the fold if its model would not fit the budget
+        fold_report, found_irs = self._admit(found_irs, sequence, budget)
+
+        if fold_report.path == "heuristic" and paired_positions:
+            raise FoldBudgetExceededError(
+                f"Model of {fold_report.estimate.n_irs} IRs exceeds {budget}, positions constrained to be paired "
+                f"cannot be enforced heuristically"
+            )
+        if fold_report.path == "heuristic":
+            db_repr, obj_fn_value = self._fold_heuristic(
+                found_irs,
+                sequence,
+                out_dir,
+                seq_name,
+                show_warnings=show_warnings,
+                approx_energies=approx_energies,
+            )
+            if save_performance:
+                write_solver_performance_to_file(
+                    db_repr,
+                    obj_fn_value,
+                    calc_free_energy(
+                        db_repr,
+                        sequence,
+                        out_dir,
+                        seq_name,
+                        show_warnings=show_warnings,
+                    ),
+                    seq_len,
+                    out_dir,
+                    IRfold.__name__,
+                    n_irs_found,
+                )
+            return db_repr, obj_fn_value, fold_report
+
+        # The engine's pool is only used at its own size
+        executor: ProcessPoolExecutor = (
+            self._get_executor()
+            if n_workers == self.n_workers and n_workers > 1
+            else None
+        )
+
+        if solve_backend == "mwis":
+            start: float = time.perf_counter()
+            db_repr, obj_fn_value = self._fold_mwis(
+                found_irs,
+                sequence,
+                out_dir,
+                seq_name,
+                show_warnings=show_warnings,
+                n_workers=n_workers,
+                approx_energies=approx_energies,
+                executor=executor,
+            )
+            if save_performance:
+                write_solver_performance_to_file(
+                    db_repr,
+                    obj_fn_value,
+                    calc_free_energy(
+                        db_repr,
+                        sequence,
+                        out_dir,
+                        seq_name,
+                        show_warnings=show_warnings,
+                    ),
+                    seq_len,
+                    out_dir,
+                    IRfold.__name__,
+                    n_irs_found,
+                    0,
+                    time.perf_counter() - start,
+                )
+            return db_repr, obj_fn_value, fold_report
+
+        # Define constraint programming problem and solve
+        ilp_model, variables = self._get_model(
+            found_irs,
+            seq_len,
+            sequence,
+            out_dir,
+            seq_name,
+            show_prog=show_prog,
+            show_warnings=show_warnings,
+            n_workers=n_workers,
+            approx_energies=approx_energies,
+            energy_model=self.energy_model,
+            executor=executor,
+            energy_cache=self.energy_cache,
+            **({"paired_positions": paired_positions} if paired_positions else {}),
+            **({"pair_corrections": True} if self.pair_corrections else {}),
+        )
+
+        solver: cp_model.CpSolver = self._new_solver(solver_params)
+
+        # Incumbents are only observed if asked for, decoding each one costs time proportional to the model size
+        incumbents: List[IncumbentSolution] = []
+        incumbent_callback: cp_model.CpSolverSolutionCallback = None
+        if save_performance or on_incumbent is not None:
+
+            def record_incumbent(incumbent: IncumbentSolution) -> None:
+                incumbents.append(incumbent)
+                if on_incumbent is not None:
+                    on_incumbent(incumbent)
+
+            incumbent_callback = _incumbent_callback_type()(
+                record_incumbent,
+                found_irs,
+                seq_len,
+                variables,
+                self._get_active_ir_idxs,
+            )
+
+        with tqdm.tqdm(
+            desc=f"Running solver ({len(ilp_model.Proto().variables)} variables)",
+            disable=not show_prog,
+        ) as _:
+            status = solver.Solve(ilp_model, incumbent_callback)
+
+        if save_performance:
+            write_anytime_curve_to_file(
+                incumbents, seq_name, seq_len, out_dir, IRfold.__name__
+            )
+
+        if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
+            # Return dot bracket repr and objective function's final value
+            active_ir_idxs: List[int] = self._get_active_ir_idxs(solver, variables)
+            db_repr: str = irs_to_dot_bracket(found_irs[active_ir_idxs], seq_len)
+            obj_fn_value: float = solver.ObjectiveValue()
+
+            if save_performance:
+                dot_bracket_repr_mfe: float = calc_free_energy(
+                    db_repr, sequence, out_dir, seq_name, show_warnings=show_warnings
+                )
+                write_solver_performance_to_file(
+                    db_repr,
+                    obj_fn_value,
+                    dot_bracket_repr_mfe,
+                    seq_len,
+                    out_dir,
+                    IRfold.__name__,
+                    n_irs_found,
+                    len(ilp_model.Proto().variables),
+                    solver.WallTime(),
+                    solver.NumBranches(),
+                    solver.NumConflicts(),
+                )
+            return db_repr, obj_fn_value, fold_report
+        else:
+            # The optimisation problem does not have a solution
+            db_repr, obj_fn_value = "".join(["." for _ in range(seq_len)]), 0
+            if save_performance:
+                write_solver_performance_to_file(
+                    db_repr, obj_fn_value, 0.0, seq_len, out_dir, IRfold.__name__
+                )
+            return db_repr, obj_fn_value, fold_report
+
+    def _fold_heuristic(
+        self,
+        ir_set: IRSet,
+        sequence: str,
+        out_dir: str,
+        seq_name: str,
+        *,
+        show_warnings: bool = False,
+        approx_energies: bool = False,
+        energy_model: EnergyModel = None,
+    ) -> Tuple[str, float]:
+        """Folds with the IRs selected by greedy_ir_selection instead of solving, the objective function value is
+        that of the selected IRs."""
+        selected_irs: IRSet = ir_set[
+            greedy_ir_selection(ir_set, calc_ir_free_energies_nn(ir_set, sequence))
+        ]
+        return irs_to_dot_bracket(selected_irs, len(sequence)), sum(
+            IRfold._get_ir_coefficients(
+                selected_irs,
+                len(sequence),
+                sequence,
+                out_dir,
+                seq_name,
+                show_warnings=show_warnings,
+                approx_energies=approx_energies,
+                energy_model=(
+                    self.energy_model if energy_model is None else energy_model
+                ),
+            )
+        )
+
+    def _fold_mwis(
+        self,
+        ir_set: IRSet,
+        sequence: str,
+        out_dir: str,
+        seq_name: str,
+        *,
+        show_warnings: bool = False,
+        n_workers: int = 1,
+        approx_energies: bool = False,
+        energy_model: EnergyModel = None,
+        executor: Executor = None,
+    ) -> Tuple[str, float]:
+        """Folds with the IRs selected by mwis_ir_selection, weighing IRs by their negated model coefficients, in
+        place of solving the model. Only IRs with negative coefficients can lower the objective, the conflict graph
+        is built over those alone."""
+        valid_irs: IRSet = ir_set.filter_valid_gap_size()
+        variable_coefficients: np.ndarray = np.array(
+            IRfold._get_ir_coefficients(
+                valid_irs,
+                len(sequence),
+                sequence,
+                out_dir,
+                seq_name,
+                show_warnings=show_warnings,
+                n_workers=n_workers,
+                approx_energies=approx_energies,
+                energy_model=(
+                    self.energy_model if energy_model is None else energy_model
+                ),
+                executor=executor,
+                energy_cache=self.energy_cache,
+            ),
+            dtype=np.int64,
+        ).reshape(-1)
+        candidate_mask: np.ndarray = variable_coefficients < 0
+        candidate_irs: IRSet = valid_irs[candidate_mask]
+        candidate_coefficients: np.ndarray = variable_coefficients[candidate_mask]
+
+        selected_idxs: List[int] = mwis_ir_selection(
+            build_conflict_graph(candidate_irs), -candidate_coefficients
+        )
+        return irs_to_dot_bracket(candidate_irs[selected_idxs], len(sequence)), float(
+            candidate_coefficients[selected_idxs].sum()
+        )
+
+    def _admit(
+        self, found_irs: IRSet, sequence: str, budget: FoldBudget
+    ) -> Tuple[FoldReport, IRSet]:
+        """Returns the path a fold of found_irs takes under the budget and the IRs it folds with."""
+        valid_irs: IRSet = found_irs.filter_valid_gap_size()
+        if budget is None:
+            return FoldReport("full", n_irs_used=len(valid_irs)), found_irs
+
+        estimate: ModelSizeEstimate = estimate_model_size(valid_irs)
+        if budget.admits(estimate):
+            return FoldReport("full", estimate, len(valid_irs)), found_irs
+
+        max_irs: int = budget.max_irs()
+        for fallback in self.fallbacks:
+            if fallback == "prune" and max_irs > 0:
+                # IRs are ranked by their approximate free energy, which costs far less than evaluating them
+                kept_idxs: np.ndarray = np.sort(
+                    np.argsort(
+                        calc_ir_free_energies_nn(valid_irs, sequence), kind="stable"
+                    )[:max_irs]
+                )
+                return (
+                    FoldReport("prune", estimate, len(kept_idxs)),
+                    valid_irs[kept_idxs],
+                )
+            elif fallback == "windowed" and max_irs > 0:
+                ir_spans: np.ndarray = valid_irs.right_end - valid_irs.left_start + 1
+                sorted_spans: np.ndarray = np.sort(ir_spans)
+                # Largest window such that the IRs spanning no more than it fit the budget
+                window: int = (
+                    sorted_spans[-1]
+                    if max_irs >= len(sorted_spans)
+                    else sorted_spans[max_irs] - 1
+                )
+                window_mask: np.ndarray = ir_spans <= window
+                if window_mask.any():
+                    return (
+                        FoldReport("windowed", estimate, int(window_mask.sum())),
+                        valid_irs[window_mask],
+                    )
+            elif fallback == "heuristic":
+                return FoldReport("heuristic", estimate, len(valid_irs)), valid_irs
+            elif fallback == "fail":
+                break
+
+        raise FoldBudgetExceededError(
+            f"Model of {estimate.n_irs} IRs ({estimate.n_candidate_pairs} candidate pairs, ~{estimate.n_bytes} "
+            f"bytes, ~{estimate.n_seconds:.1f} s to build) exceeds {budget} and none of the fallbacks "
+            f"{self.fallbacks} apply"
+        )
+
+    def fold_k_best(
+        self,
+        sequence: str,
+        k: int,
+        out_dir: str = None,
+        *,
+        seq_name: str = "seq",
+        max_mismatches: int = None,
+    ) -> List[Tuple[str, float]]:
+        """Returns up to k distinct structures of the sequence as (dot bracket repr, objective function value) in
+        order of increasing objective function value, the first being fold's.
+
+        IR search, energy evaluation and IR pair checks are done once and the per-IR model is built once. After each
+        solve a no-good cut excluding the IR selection found is added to the model and it is solved again, until k
+        structures are found or none remain. IR selections rendering a structure already found are skipped. If the
+        solver stops early (see solver_params) structures may be out of order. Folds are degraded to fit the
+        engine's budget as in fold_with_report, except that a model is always needed, so the heuristic fallback
+        raises FoldBudgetExceededError."""
+        out_dir = self.out_dir if out_dir is None else out_dir
+        seq_len: int = len(sequence)
+        found_irs: IRSet = self.find_irs(
+            sequence, out_dir, seq_name=seq_name, max_mismatches=max_mismatches
+        )
+        if self.min_pair_probability is not None:
+            found_irs = prune_irs_by_pair_probability(
+                found_irs, sequence, self.min_pair_probability, self.energy_model
+            )
+        if len(found_irs) == 0:  # The unfolded sequence is the only structure
+            return [("".join(["." for _ in range(seq_len)]), 0)]
+
+        fold_report, found_irs = self._admit(found_irs, sequence, self.budget)
+        if fold_report.path == "heuristic":
+            raise FoldBudgetExceededError(
+                f"Model of {fold_report.estimate.n_irs} IRs exceeds {self.budget}, k best structures cannot be "
+                f"enumerated heuristically"
+            )
+
+        ilp_model, variables = IRfold._get_ilp_model(
+            found_irs,
+            seq_len,
+            sequence,
+            out_dir,
+            seq_name,
+            show_warnings=self.show_warnings,
+            n_workers=self.n_workers,
+            approx_energies=self.approx_energies,
+            energy_model=self.energy_model,
+            executor=self._get_executor() if self.n_workers > 1 else None,
+            energy_cache=self.energy_cache,
+            pair_corrections=self.pair_corrections,
+        )
+
+        structures: List[Tuple[str, float]] = []
+        found_db_reprs = set()
+        solver: cp_model.CpSolver = self._new_solver()
+        while len(structures) < k:
+            status = solver.Solve(ilp_model)
+            if status != cp_model.OPTIMAL and status != cp_model.FEASIBLE:
+                break  # Every IR selection has been excluded
+
+            db_repr: str = irs_to_dot_bracket(
+                found_irs[IRfold._get_active_ir_idxs(solver, variables)], seq_len
+            )
+            if db_repr not in found_db_reprs:
+                found_db_reprs.add(db_repr)
+                structures.append((db_repr, solver.ObjectiveValue()))
+
+            # Any other IR selection flips at least one variable
+            ilp_model.AddBoolOr(
+                [var.Not() if solver.Value(var) else var for var in variables]
+            )
+
+        return structures
+
+    def fold_coarse_to_fine(
+        self,
+        sequence: str,
+        out_dir: str = None,
+        *,
+        seq_name: str = "seq",
+        max_mismatches: int = None,
+        min_stem_len: int = COARSE_MIN_STEM_LEN,
+        n_refine_workers: int = None,
+    ) -> Tuple[str, float]:
+        """Folds the sequence in two levels, for sequences too long to solve over all of their IRs at once, returning
+        its dot bracket repr and objective function value.
+
+        The coarse level solves over only the IRs with strands at least min_stem_len long, fixing the structure's
+        architecture. Each loop of the coarse structure is then refined independently by solving over the remaining
+        IRs lying in it (see refinement_regions), the refinements running in a thread pool of n_refine_workers (the
+        number of CPUs if None), and all selected IRs are merged into one structure. As the objective is a sum over
+        IRs and IRs in different loops are always compatible, the result is optimal among the structures containing
+        the coarse structure, unless a level's model is degraded to fit the engine's budget as in fold_with_report.
+        A model is always needed, so the heuristic fallback raises FoldBudgetExceededError. Engines with
+        pair_corrections raise ValueError, as the correction between a coarse IR and a fine IR stacked on or
+        closing a loop inside it would be in neither level's model."""
+        if self.pair_corrections:
+            raise ValueError(
+                "Coarse to fine folds cannot apply pair corrections across the coarse and fine levels"
+            )
+        out_dir = self.out_dir if out_dir is None else out_dir
+        n_refine_workers = (
+            os.cpu_count() if n_refine_workers is None else n_refine_workers
+        )
+        found_irs: IRSet = self.find_irs(
+            sequence, out_dir, seq_name=seq_name, max_mismatches=max_mismatches
+        )
+        if self.min_pair_probability is not None:
+            found_irs = prune_irs_by_pair_probability(
+                found_irs, sequence, self.min_pair_probability, self.energy_model
+            )
+        found_irs = found_irs.filter_valid_gap_size()
+
+        coarse_mask: np.ndarray = coarse_ir_mask(found_irs, min_stem_len)
+        coarse_irs, coarse_obj_fn_value = self._solve_irs(
+            found_irs[coarse_mask], sequence, out_dir, seq_name
+        )
+
+        fine_irs: IRSet = found_irs[~coarse_mask]
+        regions: np.ndarray = refinement_regions(fine_irs, coarse_irs)
+        with ThreadPoolExecutor(n_refine_workers) as refine_pool:
+            refinements: List[Tuple[IRSet, float]] = list(
+                refine_pool.map(
+                    lambda region: self._solve_irs(
+                        fine_irs[regions == region], sequence, out_dir, seq_name
+                    ),
+                    np.unique(regions[regions != NO_REGION]).tolist(),
+                )
+            )
+
+        selected_irs: IRSet = IRSet.concatenate(
+            [coarse_irs] + [region_irs for region_irs, _ in refinements]
+        )
+        return irs_to_dot_bracket(
+            selected_irs, len(sequence)
+        ), coarse_obj_fn_value + sum(obj_fn_value for _, obj_fn_value in refinements)
+
+    def _solve_irs(
+        self, ir_set: IRSet, sequence: str, out_dir: str, seq_name: str
+    ) -> Tuple[IRSet, float]:
+        """Solves the engine's model over the IRs of ir_set, returning the IRs selected and the objective function
+        value."""
+        if len(ir_set) == 0:
+            return ir_set, 0
+
+        fold_report, ir_set = self._admit(ir_set, sequence, self.budget)
+        if fold_report.path == "heuristic":
+            raise FoldBudgetExceededError(
+                f"Model of {fold_report.estimate.n_irs} IRs exceeds {self.budget}, coarse to fine folds cannot be "
+                f"solved heuristically"
+            )
+
+        ilp_model, variables = self._get_model(
+            ir_set,
+            len(sequence),
+            sequence,
+            out_dir,
+            seq_name,
+            show_warnings=self.show_warnings,
+            n_workers=self.n_workers,
+            approx_energies=self.approx_energies,
+            energy_model=self.energy_model,
+            executor=self._get_executor() if self.n_workers > 1 else None,
+            energy_cache=self.energy_cache,
+        )
+        solver: cp_model.CpSolver = self._new_solver()
+        status = solver.Solve(ilp_model)
+        if status != cp_model.OPTIMAL and status != cp_model.FEASIBLE:
+            return ir_set[:0], 0
+        return (
+            ir_set[self._get_active_ir_idxs(solver, variables)],
+            solver.ObjectiveValue(),
+        )
+
+    def fold_batch(
+        self,
+        sequences: List[str],
+        *,
+        seq_name: str = "seq",
+        n_search_workers: int = 1,
+        n_solve_workers: int = None,
+        cost_model: FoldCostModel = None,
+    ) -> List[Tuple[str, float]]:
+        """Folds each of the sequences under the engine's configuration, returning their dot bracket reprs and
+        objective function values in order. See fold_batch_with_report for how folds are scheduled.
+        """
+        results, _ = self.fold_batch_with_report(
+            sequences,
+            seq_name=seq_name,
+            n_search_workers=n_search_workers,
+            n_solve_workers=n_solve_workers,
+            cost_model=cost_model,
+        )
+        return results
+
+    def fold_batch_with_report(
+        self,
+        sequences: List[str],
+        *,
+        seq_name: str = "seq",
+        n_search_workers: int = 1,
+        n_solve_workers: int = None,
+        cost_model: FoldCostModel = None,
+    ) -> Tuple[List[Tuple[str, float]], List[ScheduledFold]]:
+        """As fold_batch, also returning each sequence's ScheduledFold.
+
+        IR search and model building and solving run in separate thread pools of n_search_workers and
+        n_solve_workers (the number of CPUs if None) so searches never wait behind solves. Sequences are searched
+        longest first, as search time and the number of IRs found grow with sequence length. Once its IRs are found
+        a sequence's solve time is predicted by cost_model (the engine's own if None) from its length and IR count,
+        and idle solve workers take the sequence with the longest predicted time, so expensive folds start early
+        rather than last. Each actual time is recorded in cost_model, refining later predictions. Sequences are
+        named seq_name followed by their index, any exception raised by a fold is raised once all others finish.
+
+        IUPACpal searches run concurrently as each sequence's files are named after it. Unless the engine's
+        solver_params set num_workers, the CPUs are divided between the concurrent CP-SAT solves rather than each
+        solve using them all.
+        """
+        cost_model = self.cost_model if cost_model is None else cost_model
+        n_solve_workers = os.cpu_count() if n_solve_workers is None else n_solve_workers
+        solver_params: Dict[str, Union[int, float, bool, str]] = {
+            "num_workers": max(1, os.cpu_count() // n_solve_workers),
+            **self.solver_params,
+        }
+
+        results: List[Tuple[str, float]] = [None] * len(sequences)
+        schedule: List[ScheduledFold] = [None] * len(sequences)
+
+        # Sequences whose IRs are found, ordered by longest predicted solve time first
+        ready_folds: List[Tuple[float, int, IRSet, float]] = []
+        ready_condition = threading.Condition()
+        searches_done: bool = False
+
+        def search(seq_idx: int) -> None:
+            sequence: str = sequences[seq_idx]
+            if self.result_cache is not None:
+                cached_result: Tuple[str, float] = self.result_cache.get(
+                    self.fold_cache_key(sequence)
+                )
+                if cached_result is not None:
+                    results[seq_idx] = cached_result
+                    schedule[seq_idx] = ScheduledFold(
+                        seq_idx,
+                        len(sequence),
+                        None,
+                        0.0,
+                        0.0,
+                        0.0,
+                        FoldReport("cached"),
+                    )
+                    return
+
+            start: float = time.perf_counter()
+            found_irs: IRSet = self.find_irs(sequence, seq_name=f"{seq_name}_{seq_idx}")
+            search_seconds: float = time.perf_counter() - start
+
+            predicted_seconds: float = cost_model.predict(len(sequence), len(found_irs))
+            with ready_condition:
+                heapq.heappush(
+                    ready_folds,
+                    (-predicted_seconds, seq_idx, found_irs, search_seconds),
+                )
+                ready_condition.notify()
+
+        def solve_ready_folds() -> None:
+            while True:
+                with ready_condition:
+                    while not ready_folds and not searches_done:
+                        ready_condition.wait()
+                    if not ready_folds:
+                        return
+                    neg_predicted_seconds, seq_idx, found_irs, search_seconds = (
+                        heapq.heappop(ready_folds)
+                    )
+
+                sequence: str = sequences[seq_idx]
+                start: float = time.perf_counter()
+                db_repr, obj_fn_value, fold_report = self._fold(
+                    sequence,
+                    self.out_dir,
+                    seq_name=f"{seq_name}_{seq_idx}",
+                    show_prog=False,
+                    max_mismatches=self.max_mismatches,
+                    show_warnings=self.show_warnings,
+                    n_workers=self.n_workers,
+                    approx_energies=self.approx_energies,
+                    budget=self.budget,
+                    solve_backend=self.solve_backend,
+                    solver_params=solver_params,
+                    min_pair_probability=self.min_pair_probability,
+                    found_irs=found_irs,
+                )
+                actual_seconds: float = time.perf_counter() - start
+
+                cost_model.record(len(sequence), len(found_irs), actual_seconds)
+                if self.result_cache is not None:
+                    self.result_cache.put(
+                        self.fold_cache_key(sequence), (db_repr, obj_fn_value)
+                    )
+                results[seq_idx] = (db_repr, obj_fn_value)
+                schedule[seq_idx] = ScheduledFold(
+                    seq_idx,
+                    len(sequence),
+                    len(found_irs),
+                    search_seconds,
+                    -neg_predicted_seconds,
+                    actual_seconds,
+                    fold_report,
+                )
+
+        with ThreadPoolExecutor(n_search_workers) as search_pool, ThreadPoolExecutor(
+            n_solve_workers
+        ) as solve_pool:
+            solve_futures = [
+                solve_pool.submit(solve_ready_folds) for _ in range(n_solve_workers)
+            ]
+            search_futures = [
+                search_pool.submit(search, seq_idx)
+                for seq_idx in sorted(
+                    range(len(sequences)), key=lambda i: -len(sequences[i])
+                )
+            ]
+            for search_future in search_futures:
+                search_future.exception()
+            with ready_condition:
+                searches_done = True
+                ready_condition.notify_all()
+
+        for future in search_futures + solve_futures:
+            future.result()
+        return results, schedule
+
+    async def fold_async(
+        self,
+        sequence: str,
+        out_dir: str = None,
+        *,
+        seq_name: str = "seq",
+        max_mismatches: int = None,
+        timeout: float = None,
+    ) -> Tuple[str, float]:
+        """Folds the sequence without blocking the event loop, returning its dot bracket repr and objective function
+        value as fold does under the engine's configuration. out_dir and max_mismatches left as None take the
+        engine's configuration.
+
+        IUPACpal runs as an asyncio subprocess reading the sequence from and writing IRs to pipes, model building and
+        solving run in the engine's async_executor, which must be thread based so the search can be stopped. Once
+        max_concurrency folds are in progress further calls wait for one to finish. If the call is cancelled, or
+        timeout seconds pass including any wait, the CP-SAT search is stopped and CancelledError or TimeoutError is
+        raised. Results are looked up in and added to the engine's result cache, if it has one.
+        """
+        out_dir = self.out_dir if out_dir is None else out_dir
+        max_mismatches = (
+            self.max_mismatches if max_mismatches is None else max_mismatches
+        )
+        if self.result_cache is None:
+            return await asyncio.wait_for(
+                self._fold_async_when_admitted(
+                    sequence, out_dir, seq_name, max_mismatches
+                ),
+                timeout,
+            )
+
+        cache_key: str = self.fold_cache_key(sequence, max_mismatches=max_mismatches)
+        cached_result: Tuple[str, float] = self.result_cache.get(cache_key)
+        if cached_result is not None:
+            return cached_result
+        result: Tuple[str, float] = await asyncio.wait_for(
+            self._fold_async_when_admitted(sequence, out_dir, seq_name, max_mismatches),
+            timeout,
+        )
+        self.result_cache.put(cache_key, result)
+        return result
+
+    async def _fold_async_when_admitted(
+        self, sequence: str, out_dir: str, seq_name: str, max_mismatches: int
+    ) -> Tuple[str, float]:
+        semaphore: asyncio.Semaphore = self._get_async_semaphore()
+        if semaphore is None:
+            return await self._fold_async(sequence, out_dir, seq_name, max_mismatches)
+        async with semaphore:
+            return await self._fold_async(sequence, out_dir, seq_name, max_mismatches)
+
+    async def _fold_async(
+        self, sequence: str, out_dir: str, seq_name: str, max_mismatches: int
+    ) -> Tuple[str, float]:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        seq_len: int = len(sequence)
+
+        cache_key: Tuple[str, int] = (sequence, max_mismatches)
+        with self._ir_cache_lock:
+            found_irs: IRSet = self._ir_cache.get(cache_key)
+        if found_irs is None:
+            if self.ir_search_backend == "watson_crick" and max_mismatches == 0:
+                found_irs = await loop.run_in_executor(
+                    self.async_executor, find_watson_crick_irs, sequence
+                )
+            else:
+                found_irs = IRSet.from_irs(
+                    await self._find_irs_async(sequence, seq_name, max_mismatches)
+                )
+            self._cache_irs(cache_key, found_irs)
+        if self.min_pair_probability is not None:
+            found_irs = await loop.run_in_executor(
+                self.async_executor,
+                prune_irs_by_pair_probability,
+                found_irs,
+                sequence,
+                self.min_pair_probability,
+                self.energy_model,
+            )
+
+        if len(found_irs) == 0:  # Return sequence if no IRs found
+            return "".join(["." for _ in range(seq_len)]), 0
+
+        # Energies are evaluated through a fold compound rather than calc_free_energy so no files are written. An
+        # energy cache always evaluates through one, so the engine's energy model is then passed unchanged, keying its
+        # energies as _fold does
+        energy_model: EnergyModel = (
+            self.energy_model
+            if self.energy_cache is not None
+            else self.energy_model or EnergyModel()
+        )
+        fold_report, found_irs = await loop.run_in_executor(
+            self.async_executor, self._admit, found_irs, sequence, self.budget
+        )
+        if fold_report.path == "heuristic":
+            return await loop.run_in_executor(
+                self.async_executor,
+                partial(
+                    self._fold_heuristic,
+                    found_irs,
+                    sequence,
+                    out_dir,
+                    seq_name,
+                    approx_energies=self.approx_energies,
+                    energy_model=self.energy_model or EnergyModel(),
+                ),
+            )
+
+        if self.solve_backend == "mwis":
+            return await loop.run_in_executor(
+                self.async_executor,
+                partial(
+                    self._fold_mwis,
+                    found_irs,
+                    sequence,
+                    out_dir,
+                    seq_name,
+                    n_workers=self.n_workers,
+                    approx_energies=self.approx_energies,
+                    energy_model=energy_model,
+                    executor=self._get_executor() if self.n_workers > 1 else None,
+                ),
+            )
+
+        ilp_model, variables = await loop.run_in_executor(
+            self.async_executor,
+            partial(
+                self._get_model,
+                found_irs,
+                seq_len,
+                sequence,
+                out_dir,
+                seq_name,
+                n_workers=self.n_workers,
+                approx_energies=self.approx_energies,
+                energy_model=energy_model,
+                executor=self._get_executor() if self.n_workers > 1 else None,
+                energy_cache=self.energy_cache,
+                **({"pair_corrections": True} if self.pair_corrections else {}),
+            ),
+        )
+
+        solver: cp_model.CpSolver = self._new_solver()
+        try:
+            status = await loop.run_in_executor(
+                self.async_executor, solver.Solve, ilp_model
+            )
+        except asyncio.CancelledError:
+            # The solve keeps running in its thread until told to stop
+            solver.StopSearch()
+            raise
+
+        if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
+            active_ir_idxs: List[int] = self._get_active_ir_idxs(solver, variables)
+            return (
+                irs_to_dot_bracket(found_irs[active_ir_idxs], seq_len),
+                solver.ObjectiveValue(),
+            )
+        return "".join(["." for _ in range(seq_len)]), 0
+
+    def _get_model(self, *model_args, **model_kwargs) -> Tuple[cp_model.CpModel, list]:
+        """Builds the model in the engine's model formulation, taking _get_ilp_model's arguments. Returns the model
+        and its variables, see _get_active_ir_idxs."""
+        if self.model_formulation == "helix":
+            return IRfold._get_helix_model(*model_args, **model_kwargs)
+        return IRfold._get_ilp_model(*model_args, **model_kwargs)
+
+    def _get_active_ir_idxs(
+        self, solver: cp_model.CpSolver, variables: list
+    ) -> List[int]:
+        if self.model_formulation == "helix":
+            return IRfold._get_active_helix_ir_idxs(solver, variables)
+        return IRfold._get_active_ir_idxs(solver, variables)
+
+    @staticmethod
+    async def _find_irs_async(
+        sequence: str, seq_name: str, max_mismatches: int
+    ) -> List[IR]:
+        """Equivalent of IRfold._find_irs run as an asyncio subprocess, IUPACpal reads the sequence from stdin and
+        writes the IRs it finds to stderr as its stdout carries debug output."""
+        iupacpal_cmd: List[str] = [
+            str(Path(__file__).parent / "IUPACpal"),
+            "-f",
+            "/dev/stdin",
+            "-s",
+            seq_name,
+            "-m",
+            str(2),
+            "-M",
+            str(len(sequence)),
+            "-g",
+            str(len(sequence) - 1),
+            "-x",
+            str(max_mismatches),
+            "-o",
+            "/dev/stderr",
+        ]
+        proc = await asyncio.create_subprocess_exec(
+            *iupacpal_cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            _, irs_output = await proc.communicate(
+                f">{seq_name}\n{sequence}".encode("ascii")
+            )
+        except asyncio.CancelledError:
+            proc.kill()
+            raise
+
+        if proc.returncode != 0:
+            # IUPACpal reports errors on stdout, re-run capturing it for the error message
+            proc = await asyncio.create_subprocess_exec(
+                *iupacpal_cmd,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            out, _ = await proc.communicate(f">{seq_name}\n{sequence}".encode("ascii"))
+            raise Exception(str(out.decode("utf-8")))
+        return IRfold._parse_iupacpal_output(irs_output.decode("ascii").splitlines())[0]
+
+    def find_irs(
+        self,
+        sequence: str,
+        out_dir: str = None,
+        *,
+        seq_name: str = "seq",
+        max_mismatches: int = None,
+    ) -> IRSet:
+        """Returns the IRs found in the sequence by the engine's IR search backend, from the cache if the sequence
+        was searched before with the same max_mismatches."""
+        max_mismatches = (
+            self.max_mismatches if max_mismatches is None else max_mismatches
+        )
+        cache_key: Tuple[str, int] = (sequence, max_mismatches)
+        with self._ir_cache_lock:
+            if cache_key in self._ir_cache:
+                self._ir_cache.move_to_end(cache_key)
+                return self._ir_cache[cache_key]
+
+        if self.ir_search_backend == "watson_crick" and max_mismatches == 0:
+            found_irs: IRSet = find_watson_crick_irs(sequence)
+        else:
+            found_irs = IRSet.from_irs(
+                IRfold._find_irs(
+                    sequence,
+                    self.out_dir if out_dir is None else out_dir,
+                    seq_name=seq_name,
+                    max_mismatches=max_mismatches,
+                )
+            )
+
+        self._cache_irs(cache_key, found_irs)
+        return found_irs
+
+    def _cache_irs(self, cache_key: Tuple[str, int], found_irs: IRSet) -> None:
+        with self._ir_cache_lock:
+            self._ir_cache[cache_key] = found_irs
+            self._ir_cache.move_to_end(cache_key)
+            while len(self._ir_cache) > self.ir_cache_size:
+                self._ir_cache.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        with self._ir_cache_lock:
+            self._ir_cache.clear()
+
+    def close(self) -> None:
+        """Shuts down the engine's process pool, a later fold starts a new one if needed."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def __enter__(self) -> "IRfoldEngine":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.n_workers)
+            return self._executor
+
+    def _get_async_semaphore(self) -> asyncio.Semaphore:
+        # Semaphores belong to the event loop they are first used in, one is created per loop the engine is used from
+        if self.max_concurrency is None:
+            return None
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        if self._async_semaphore_loop is not loop:
+            self._async_semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._async_semaphore_loop = loop
+        return self._async_semaphore
+
+    def _new_solver(
+        self, solver_params: Dict[str, Union[int, float, bool, str]] = None
+    ) -> cp_model.CpSolver:
+        # A solver is created per fold so an engine can be shared between threads
+        return IRfold._new_solver(
+            self.solver_params if solver_params is None else solver_params
+        )
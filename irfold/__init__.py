@@ -1 +1,2 @@
 from .IRfold import *
+from .solver_tuning import *
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+__all__ = [
+    "CANDIDATE_SOLVER_PARAMS",
+    "SolverTrial",
+    "TuningResult",
+    "tune_solver_params",
+]
+
+import statistics
+from typing import Dict, List, NamedTuple, Union
+
+from .IRfold import IRfold
+from .util import IRSet, lazy_import
+
+cp_model = lazy_import("ortools.sat.python.cp_model")
+tqdm = lazy_import("tqdm")
+
+SolverParams = Dict[str, Union[int, float, bool, str]]
+
+# Parameter sets compared by default, each varying one setting of the model's search from CP-SAT's defaults
+CANDIDATE_SOLVER_PARAMS: Dict[str, SolverParams] = {
+    "default": {},
+    "single_worker": {"num_workers": 1},
+    "four_workers": {"num_workers": 4},
+    "no_presolve": {"cp_model_presolve": False},
+    "linearization_0": {"linearization_level": 0},
+    "linearization_2": {"linearization_level": 2},
+    "fixed_search": {"num_workers": 1, "search_branching": "FIXED_SEARCH"},
+    "portfolio_search": {"search_branching": "PORTFOLIO_SEARCH"},
+    "no_symmetry": {"symmetry_level": 0},
+}
+
+# Seconds any one solve may take during tuning, solves reaching it count as not proven optimal
+TUNING_TIME_LIMIT: float = 10.0
+
+
+class SolverTrial(NamedTuple):
+    """One solve of one sequence's model under one candidate parameter set."""
+
+    candidate_name: str
+    seq_idx: int
+    n_variables: int
+    solve_seconds: float  # Solver wall time, model building is excluded
+    status: str
+    obj_fn_value: float
+    optimal: bool  # Proven optimal and equal to the best objective function value of any candidate
+
+
+class TuningResult(NamedTuple):
+    """Trials of every candidate and the recommended candidate: of those solving every model to optimality, the one
+    with the lowest total median solve time. recommended_params can be saved with save_solver_profile.
+    """
+
+    trials: List[SolverTrial]
+    recommended_name: str
+    recommended_params: SolverParams
+
+    def total_solve_seconds(self, candidate_name: str) -> float:
+        """Returns the sum over sequences of the candidate's median solve time."""
+        seq_solve_seconds: Dict[int, List[float]] = {}
+        for trial in self.trials:
+            if trial.candidate_name == candidate_name:
+                seq_solve_seconds.setdefault(trial.seq_idx, []).append(
+                    trial.solve_seconds
+                )
+        return sum(
+            statistics.median(solve_seconds)
+            for solve_seconds in seq_solve_seconds.values()
+        )
+
+
+def tune_solver_params(
+    sequences: List[str],
+    out_dir: str = ".",
+    *,
+    candidate_params: Dict[str, SolverParams] = None,
+    n_repeats: int = 3,
+    time_limit: float = TUNING_TIME_LIMIT,
+    max_mismatches: int = 0,
+    approx_energies: bool = False,
+    show_prog: bool = False,
+) -> TuningResult:
+    """Solves the model IRfold builds for each sequence under each candidate parameter set (CANDIDATE_SOLVER_PARAMS
+    if None) n_repeats times, recording solve time and whether the optimum was proven and found. Each model is built
+    once and solves are limited to time_limit seconds unless a candidate sets max_time_in_seconds itself.
+    """
+    candidate_params = (
+        CANDIDATE_SOLVER_PARAMS if candidate_params is None else candidate_params
+    )
+
+    trials: List[SolverTrial] = []
+    for seq_idx, sequence in enumerate(
+        tqdm.tqdm(sequences, desc="Tuning solver parameters", disable=not show_prog)
+    ):
+        found_irs: IRSet = IRSet.from_irs(
+            IRfold._find_irs(
+                sequence,
+                out_dir,
+                seq_name=f"tuning_{seq_idx}",
+                max_mismatches=max_mismatches,
+            )
+        )
+        ilp_model, variables = IRfold._get_ilp_model(
+            found_irs,
+            len(sequence),
+            sequence,
+            out_dir,
+            f"tuning_{seq_idx}",
+            approx_energies=approx_energies,
+        )
+
+        seq_trials: List[SolverTrial] = []
+        for candidate_name, solver_params in candidate_params.items():
+            for _ in range(n_repeats):
+                solver: cp_model.CpSolver = IRfold._new_solver(
+                    {"max_time_in_seconds": time_limit, **solver_params}
+                )
+                status = solver.Solve(ilp_model)
+                seq_trials.append(
+                    SolverTrial(
+                        candidate_name,
+                        seq_idx,
+                        len(variables),
+                        solver.WallTime(),
+                        solver.StatusName(status),
+                        solver.ObjectiveValue(),
+                        status == cp_model.OPTIMAL,
+                    )
+                )
+
+        # A candidate is only optimal if it agrees with the best objective function value found by any
+        best_obj_fn_value: float = min(trial.obj_fn_value for trial in seq_trials)
+        trials.extend(
+            trial._replace(
+                optimal=trial.optimal and trial.obj_fn_value == best_obj_fn_value
+            )
+            for trial in seq_trials
+        )
+
+    always_optimal: List[str] = [
+        candidate_name
+        for candidate_name in candidate_params
+        if all(
+            trial.optimal for trial in trials if trial.candidate_name == candidate_name
+        )
+    ]
+    if not always_optimal:
+        raise ValueError(
+            f"No candidate solved every model to optimality within {time_limit} s"
+        )
+
+    unranked = TuningResult(trials, None, None)
+    recommended_name: str = min(always_optimal, key=unranked.total_solve_seconds)
+    return TuningResult(
+        trials, recommended_name, dict(candidate_params[recommended_name])
+    )
@@ -1,2 +1,20 @@
+from .lazy_imports import *
 from .ir_validation import *
 from .helper_functions import *
+from .ir_set import *
+from .ir_energies import *
+from .nearest_neighbour import *
+from .ir_model import *
+from .ir_search import *
+from .result_cache import *
+from .admission import *
+from .scheduling import *
+from .helix_model import *
+from .mwis import *
+from .anytime import *
+from .solver_profiles import *
+from .structure_constraints import *
+from .pair_probabilities import *
+from .energy_cache import *
+from .pair_corrections import *
+from .coarse_to_fine import *
@@ -0,0 +1,129 @@
+__all__ = [
+    "FoldBudget",
+    "ModelSizeEstimate",
+    "FoldBudgetExceededError",
+    "FoldReport",
+    "FOLD_FALLBACKS",
+    "estimate_model_size",
+    "greedy_ir_selection",
+]
+
+import math
+from typing import List, NamedTuple
+
+import numpy as np
+
+from .ir_set import IRSet
+from .ir_validation import ir_pair_invalid_relative_pos
+
+# Measured cost of validating one candidate IR pair while building the model: peak memory of the pair lists and
+# Python time of the relative position checks. Both grow quadratically with the number of IRs.
+PAIR_CHECK_BYTES: int = 150
+PAIR_CHECK_SECONDS: float = 2e-5
+
+# Number of candidate IR pairs checked to estimate the fraction that conflict
+CONFLICT_SAMPLE_SIZE: int = 1000
+
+# Ways a fold that does not fit its budget degrades, tried in the order configured:
+#   prune     - keep only the IRs with the lowest approximate free energy that fit the budget
+#   windowed  - keep only IRs spanning at most the largest window that fits the budget, folding local structure
+#   heuristic - select IRs greedily by approximate free energy without building a model, see greedy_ir_selection
+#   fail      - raise FoldBudgetExceededError
+FOLD_FALLBACKS = ("prune", "windowed", "heuristic", "fail")
+
+
+class FoldBudgetExceededError(Exception):
+    pass
+
+
+class ModelSizeEstimate(NamedTuple):
+    """Estimated size of the optimisation problem for a set of IRs with valid gap sizes, made before any IR pairs
+    are validated."""
+
+    n_irs: int
+    n_candidate_pairs: int
+    n_conflicts: int  # Estimated from a sample of candidate pairs
+    n_bytes: int
+    n_seconds: float  # Model building only, solver time is not estimated
+
+
+class FoldBudget(NamedTuple):
+    """Memory (bytes) and time (seconds) a fold's model building may use, None for no limit."""
+
+    max_bytes: int = None
+    max_seconds: float = None
+
+    def admits(self, estimate: ModelSizeEstimate) -> bool:
+        return (self.max_bytes is None or estimate.n_bytes <= self.max_bytes) and (
+            self.max_seconds is None or estimate.n_seconds <= self.max_seconds
+        )
+
+    def max_irs(self) -> int:
+        """Returns the largest number of IRs whose candidate pairs fit the budget."""
+        max_pairs: float = math.inf
+        if self.max_bytes is not None:
+            max_pairs = min(max_pairs, self.max_bytes / PAIR_CHECK_BYTES)
+        if self.max_seconds is not None:
+            max_pairs = min(max_pairs, self.max_seconds / PAIR_CHECK_SECONDS)
+        if max_pairs == math.inf:
+            return np.iinfo(np.int64).max
+        # Largest n with n * (n - 1) / 2 <= max_pairs
+        return int((1 + math.sqrt(1 + 8 * max_pairs)) / 2)
+
+
+class FoldReport(NamedTuple):
+    """Which path a fold took ("full", "cached" or one of FOLD_FALLBACKS), the model size estimate it was admitted
+    on and the number of IRs with valid gap sizes it folded with."""
+
+    path: str
+    estimate: ModelSizeEstimate = None
+    n_irs_used: int = None
+
+
+def estimate_model_size(
+    ir_set: IRSet, *, sample_size: int = CONFLICT_SAMPLE_SIZE, seed: int = 0
+) -> ModelSizeEstimate:
+    """Estimates the model size of the IRs in ir_set, which should all have valid gap sizes, in time linear in the
+    number of IRs."""
+    n_irs: int = len(ir_set)
+    n_candidate_pairs: int = n_irs * (n_irs - 1) // 2
+
+    n_conflicts: int = 0
+    if n_candidate_pairs > 0:
+        rng = np.random.default_rng(seed)
+        sample_a: np.ndarray = rng.integers(0, n_irs, sample_size)
+        sample_b: np.ndarray = rng.integers(0, n_irs - 1, sample_size)
+        sample_b[sample_b >= sample_a] += 1  # Distinct pairs only
+        conflict_fraction: float = np.mean(
+            [
+                bool(ir_pair_invalid_relative_pos(ir_set[int(a)], ir_set[int(b)]))
+                for a, b in zip(sample_a, sample_b)
+            ]
+        )
+        n_conflicts = round(conflict_fraction * n_candidate_pairs)
+
+    return ModelSizeEstimate(
+        n_irs,
+        n_candidate_pairs,
+        n_conflicts,
+        n_candidate_pairs * PAIR_CHECK_BYTES,
+        n_candidate_pairs * PAIR_CHECK_SECONDS,
+    )
+
+
+def greedy_ir_selection(ir_set: IRSet, ir_free_energies: np.ndarray) -> List[int]:
+    """Selects IRs in order of increasing free energy, skipping any that conflicts with one already selected, and
+    returns the selected indices. Only IRs with negative free energy are considered as others cannot lower the
+    objective. Takes time proportional to the number of IRs times the number selected.
+    """
+    selected_idxs: List[int] = []
+    for ir_idx in np.argsort(ir_free_energies, kind="stable"):
+        if ir_free_energies[ir_idx] >= 0:
+            break
+        ir = ir_set[int(ir_idx)]
+        if not any(
+            ir_pair_invalid_relative_pos(ir_set[selected_idx], ir)
+            for selected_idx in selected_idxs
+        ):
+            selected_idxs.append(int(ir_idx))
+    return selected_idxs
@@ -0,0 +1,60 @@
+__all__ = ["IncumbentSolution", "write_anytime_curve_to_file"]
+
+import csv
+from pathlib import Path
+from typing import List, NamedTuple
+
+
+class IncumbentSolution(NamedTuple):
+    """Improving solution found during a solve: its dot bracket repr and objective function value, the best bound
+    on the optimum known when it was found and the seconds since the solve started."""
+
+    dot_bracket_repr: str
+    obj_fn_value: float
+    obj_fn_bound: float
+    elapsed_seconds: float
+
+
+def write_anytime_curve_to_file(
+    incumbents: List[IncumbentSolution],
+    seq_name: str,
+    seq_len: int,
+    out_dir: str,
+    ssp_model_name: str,
+) -> None:
+    """Appends a solve's incumbents, in the order found, to the anytime curves file of ssp_model_name in out_dir,
+    one row per incumbent. Incumbent indices restart at 0 for each solve, separating the curves of folds of the
+    same sequence."""
+    out_dir_path: Path = Path(out_dir).resolve()
+    if not out_dir_path.exists():
+        out_dir_path = Path.cwd().resolve()
+
+    anytime_file_path: Path = out_dir_path / f"{ssp_model_name}_anytime_curves.csv"
+    write_header: bool = not anytime_file_path.exists()
+
+    with open(str(anytime_file_path), "a") as anytime_file:
+        writer = csv.writer(anytime_file)
+        if write_header:
+            writer.writerow(
+                [
+                    "seq_name",
+                    "seq_len",
+                    "incumbent_idx",
+                    "elapsed_seconds",
+                    "obj_fn_value",
+                    "obj_fn_bound",
+                    "dot_bracket_repr",
+                ]
+            )
+        writer.writerows(
+            [
+                seq_name,
+                seq_len,
+                incumbent_idx,
+                incumbent.elapsed_seconds,
+                incumbent.obj_fn_value,
+                incumbent.obj_fn_bound,
+                incumbent.dot_bracket_repr,
+            ]
+            for incumbent_idx, incumbent in enumerate(incumbents)
+        )
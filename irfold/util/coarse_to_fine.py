@@ -0,0 +1,72 @@
+__all__ = [
+    "COARSE_MIN_STEM_LEN",
+    "EXTERIOR_LOOP",
+    "NO_REGION",
+    "coarse_ir_mask",
+    "refinement_regions",
+]
+
+import numpy as np
+
+from .ir_set import IRSet
+
+# Shortest IR strand solved over in the coarse level of IRfoldEngine.fold_coarse_to_fine
+COARSE_MIN_STEM_LEN: int = 6
+
+# Regions of refinement_regions: the exterior loop, and no region for IRs that cannot join the coarse structure
+EXTERIOR_LOOP: int = -1
+NO_REGION: int = -2
+
+# Number of fine IRs compared with the coarse structure at once, bounding the size of the comparison matrices
+REGION_CHUNK_SIZE: int = 4096
+
+
+def coarse_ir_mask(
+    ir_set: IRSet, min_stem_len: int = COARSE_MIN_STEM_LEN
+) -> np.ndarray:
+    """Returns the mask of IRs whose strands are at least min_stem_len long."""
+    return ir_set.left_end - ir_set.left_start + 1 >= min_stem_len
+
+
+def refinement_regions(fine_irs: IRSet, coarse_irs: IRSet) -> np.ndarray:
+    """Returns the loop of the structure of coarse_irs, which must be compatible, that each fine IR lies in: the
+    index of the innermost coarse IR whose gap encloses it, EXTERIOR_LOOP if none does, or NO_REGION if it is not
+    compatible with every coarse IR. An IR compatible with every coarse IR has both strands in the same loop, and
+    IRs in different loops are always compatible, so the loops can be refined independently.
+    """
+    regions: np.ndarray = np.full(len(fine_irs), NO_REGION, dtype=np.int64)
+    if len(coarse_irs) == 0:
+        regions[:] = EXTERIOR_LOOP
+        return regions
+
+    for chunk_start in range(0, len(fine_irs), REGION_CHUNK_SIZE):
+        chunk: IRSet = fine_irs[chunk_start : chunk_start + REGION_CHUNK_SIZE]
+        f_left_start: np.ndarray = chunk.left_start[:, None]
+        f_left_end: np.ndarray = chunk.left_end[:, None]
+        f_right_start: np.ndarray = chunk.right_start[:, None]
+        f_right_end: np.ndarray = chunk.right_end[:, None]
+
+        # Fine IR (rows) lies in the gap of coarse IR (columns)
+        inside: np.ndarray = (coarse_irs.left_end < f_left_start) & (
+            f_right_end < coarse_irs.right_start
+        )
+        compatible: np.ndarray = (
+            inside
+            | (f_right_end < coarse_irs.left_start)
+            | (coarse_irs.right_end < f_left_start)
+            | (
+                (f_left_end < coarse_irs.left_start)
+                & (coarse_irs.right_end < f_right_start)
+            )
+        )
+
+        # Of the enclosing coarse IRs, the innermost has the greatest left strand end
+        innermost: np.ndarray = np.where(inside, coarse_irs.left_end, -1).argmax(axis=1)
+        chunk_regions: np.ndarray = np.where(
+            inside.any(axis=1), innermost, EXTERIOR_LOOP
+        )
+        regions[chunk_start : chunk_start + len(chunk)] = np.where(
+            compatible.all(axis=1), chunk_regions, NO_REGION
+        )
+
+    return regions
@@ -0,0 +1,136 @@
+__all__ = [
+    "LocalEnergyCache",
+    "ir_local_context_key",
+    "calc_ir_free_energies_cached",
+    "LOCAL_ENERGY_CACHE_SIZE",
+]
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from .ir_energies import EnergyModel, calc_ir_free_energies
+from .ir_set import IR, IRSet
+
+# Number of IR free energies a LocalEnergyCache keeps by default
+LOCAL_ENERGY_CACHE_SIZE: int = 1 << 20
+
+
+def ir_local_context_key(sequence: str, ir: IR) -> str:
+    """Returns the local context of the IR's single IR structure: the bases from one before its left strand to one
+    after its right strand, which cover its stack, loops and the dangles on its closing pair, and the IR's position
+    within them. The free energy of the structure depends on nothing else, so IRs of different sequences with the
+    same key have the same free energy."""
+    (left_start, left_end), (right_start, right_end) = ir
+    context_start: int = max(left_start - 1, 0)
+    context_end: int = min(right_end + 2, len(sequence))
+    return (
+        f"{sequence[context_start:context_end]}:{left_start - context_start}:{left_end - context_start}:"
+        f"{right_start - context_start}:{right_end - context_start}"
+    )
+
+
+class LocalEnergyCache:
+    """Cache of single IR free energies keyed by energy model and ir_local_context_key rather than by sequence, so
+    motifs recurring across sequences (e.g. hairpins conserved across a gene family) are evaluated once. Energies
+    are kept in an in-memory LRU of max_entries, hits and misses are counted."""
+
+    def __init__(self, max_entries: int = LOCAL_ENERGY_CACHE_SIZE):
+        self.max_entries: int = max_entries
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._energies: "OrderedDict[Tuple[EnergyModel, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def hit_rate(self) -> float:
+        with self._lock:
+            n_lookups: int = self.hits + self.misses
+            return self.hits / n_lookups if n_lookups else 0.0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._energies),
+            }
+
+    def get_many(self, keys: List[Hashable]) -> List[Optional[float]]:
+        with self._lock:
+            energies: List[Optional[float]] = []
+            for key in keys:
+                energy: Optional[float] = self._energies.get(key)
+                if energy is None:
+                    self.misses += 1
+                else:
+                    self._energies.move_to_end(key)
+                    self.hits += 1
+                energies.append(energy)
+            return energies
+
+    def put_many(self, keys: List[Hashable], energies: List[float]) -> None:
+        with self._lock:
+            for key, energy in zip(keys, energies):
+                self._energies[key] = energy
+                self._energies.move_to_end(key)
+            while len(self._energies) > self.max_entries:
+                self._energies.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._energies.clear()
+            self.hits = self.misses = 0
+
+
+def calc_ir_free_energies_cached(
+    ir_set: IRSet,
+    sequence: str,
+    energy_cache: LocalEnergyCache,
+    *,
+    energy_model: EnergyModel = None,
+    **calc_kwargs,
+) -> np.ndarray:
+    """As calc_ir_free_energies, only evaluating the IRs whose local context is not in energy_cache and adding their
+    free energies to it. IRs sharing a local context within ir_set are evaluated once.
+    """
+    ir_set = IRSet.from_irs(ir_set)
+    keys: List[Tuple[EnergyModel, str]] = [
+        (energy_model, ir_local_context_key(sequence, ((ls, le), (rs, re))))
+        for ls, le, rs, re in zip(
+            ir_set.left_start.tolist(),
+            ir_set.left_end.tolist(),
+            ir_set.right_start.tolist(),
+            ir_set.right_end.tolist(),
+        )
+    ]
+    free_energies: np.ndarray = np.array(
+        [
+            np.nan if energy is None else energy
+            for energy in energy_cache.get_many(keys)
+        ],
+        dtype=np.float64,
+    )
+
+    # First IR of each uncached context
+    missed_idxs: Dict[Tuple[EnergyModel, str], int] = {}
+    for ir_idx in np.isnan(free_energies).nonzero()[0]:
+        missed_idxs.setdefault(keys[ir_idx], int(ir_idx))
+    if missed_idxs:
+        missed_energies: np.ndarray = calc_ir_free_energies(
+            ir_set[list(missed_idxs.values())],
+            sequence,
+            energy_model=energy_model,
+            **calc_kwargs,
+        )
+        energy_cache.put_many(list(missed_idxs), missed_energies.tolist())
+        context_energies: Dict[Tuple[EnergyModel, str], float] = dict(
+            zip(missed_idxs, missed_energies.tolist())
+        )
+        for ir_idx in np.isnan(free_energies).nonzero()[0]:
+            free_energies[ir_idx] = context_energies[keys[ir_idx]]
+
+    return free_energies
@@ -0,0 +1,101 @@
+__all__ = [
+    "HELIX_RELATIVE_POSITIONS",
+    "group_helices",
+    "max_disjoint_irs",
+    "helix_pair_relative_positions",
+]
+
+from typing import List, Tuple
+
+import numpy as np
+
+from .ir_set import IRSet
+
+# Relative positions in which two IRs are compatible, see ir_pair_invalid_relative_pos:
+#   before  - ir_a ends before ir_b starts
+#   after   - ir_b ends before ir_a starts
+#   inside  - ir_b lies in ir_a's gap
+#   outside - ir_a lies in ir_b's gap
+HELIX_RELATIVE_POSITIONS = ("before", "after", "inside", "outside")
+
+
+def group_helices(ir_set: IRSet) -> List[np.ndarray]:
+    """Groups the IRs of ir_set into maximal helices, returning the indices of the IRs of each helix. IRs pairing
+    bases i and j with the same i + j share a helix axis, and IRs on one axis whose left strands overlap or abut
+    pair a contiguous run of bases and so are sub-stems of one helix."""
+    if len(ir_set) == 0:
+        return []
+    axes: np.ndarray = ir_set.left_start.astype(np.int64) + ir_set.right_end
+    ir_order: np.ndarray = np.lexsort((ir_set.left_start, axes))
+
+    helices: List[np.ndarray] = []
+    helix_start: int = 0
+    helix_left_end: int = ir_set.left_end[ir_order[0]]
+    for order_idx in range(1, len(ir_order)):
+        ir_idx: int = ir_order[order_idx]
+        prev_ir_idx: int = ir_order[order_idx - 1]
+        if (
+            axes[ir_idx] != axes[prev_ir_idx]
+            or ir_set.left_start[ir_idx] > helix_left_end + 1
+        ):
+            helices.append(ir_order[helix_start:order_idx])
+            helix_start = order_idx
+            helix_left_end = ir_set.left_end[ir_idx]
+        else:
+            helix_left_end = max(helix_left_end, ir_set.left_end[ir_idx])
+    helices.append(ir_order[helix_start:])
+
+    return helices
+
+
+def max_disjoint_irs(ir_set: IRSet) -> int:
+    """Returns the largest number of IRs of one helix that can be present in a structure together, i.e. whose left
+    strands are pairwise disjoint."""
+    n_disjoint: int = 0
+    last_left_end: int = -1
+    for ir_idx in np.argsort(ir_set.left_end, kind="stable"):
+        if ir_set.left_start[ir_idx] > last_left_end:
+            n_disjoint += 1
+            last_left_end = ir_set.left_end[ir_idx]
+    return n_disjoint
+
+
+def helix_pair_relative_positions(
+    helix_a: IRSet, helix_b: IRSet
+) -> Tuple[bool, List[str]]:
+    """Bounds the relative positions of any IR of helix_a and any IR of helix_b from the extents of the helices.
+    Returns whether every such IR pair is compatible and the HELIX_RELATIVE_POSITIONS some pair may be in, which
+    are the only positions a model needs to allow."""
+    a_left_start, a_left_end = helix_a.left_start, helix_a.left_end
+    a_right_start, a_right_end = helix_a.right_start, helix_a.right_end
+    b_left_start, b_left_end = helix_b.left_start, helix_b.left_end
+    b_right_start, b_right_end = helix_b.right_start, helix_b.right_end
+
+    # For each relative position, whether all IR pairs are in it and whether any pair may be
+    bounds: List[Tuple[bool, bool]] = [
+        (
+            a_right_end.max() < b_left_start.min(),
+            a_right_end.min() < b_left_start.max(),
+        ),
+        (
+            b_right_end.max() < a_left_start.min(),
+            b_right_end.min() < a_left_start.max(),
+        ),
+        (
+            a_left_end.max() < b_left_start.min()
+            and b_right_end.max() < a_right_start.min(),
+            a_left_end.min() < b_left_start.max()
+            and b_right_end.min() < a_right_start.max(),
+        ),
+        (
+            b_left_end.max() < a_left_start.min()
+            and a_right_end.max() < b_right_start.min(),
+            b_left_end.min() < a_left_start.max()
+            and a_right_end.min() < b_right_start.max(),
+        ),
+    ]
+    return any(always for always, _ in bounds), [
+        relative_pos
+        for relative_pos, (_, possible) in zip(HELIX_RELATIVE_POSITIONS, bounds)
+        if possible
+    ]
@@ -1,34 +1,79 @@
 import csv
 import itertools
 import subprocess
-from typing import List, Tuple
+from typing import List, Set, Tuple, Union
 
 from pathlib import Path
 
-import RNA
+import numpy as np
 
-IR = Tuple[Tuple[int, int], Tuple[int, int]]
+from .ir_set import IR, IRSet
+from .lazy_imports import lazy_import
 
+RNA = lazy_import("RNA")
 
-def irs_to_dot_bracket(ir_list: List[IR], seq_len: int) -> str:
-    paired_bases: List[str] = ["." for _ in range(seq_len)]  # Initially none paired
+UNPAIRED: int = ord(".")
+OPENING_BRACKET: int = ord("(")
+CLOSING_BRACKET: int = ord(")")
 
-    for ir in ir_list:
-        n_base_pairs: int = ir[0][1] - ir[0][0] + 1
 
-        left_strand: Tuple[int, int]
-        right_strand: Tuple[int, int]
-        left_strand, right_strand = ir[0], ir[1]
+def irs_to_dot_bracket(ir_list: Union[List[IR], IRSet], seq_len: int) -> str:
+    return irs_to_dot_bracket_buffer(ir_list, seq_len).decode("ascii")
 
-        paired_bases[left_strand[0] : left_strand[1] + 1] = [
-            "(" for _ in range(n_base_pairs)
-        ]
 
-        paired_bases[right_strand[0] : right_strand[1] + 1] = [
-            ")" for _ in range(n_base_pairs)
-        ]
+def irs_to_dot_bracket_buffer(
+    ir_list: Union[List[IR], IRSet], seq_len: int, out: bytearray = None
+) -> bytearray:
+    """Renders the dot bracket repr of the IRs into a byte buffer, reusing out if provided to avoid allocating a
+    new buffer per call."""
+    if out is None:
+        out = bytearray(seq_len)
+    elif len(out) != seq_len:
+        raise ValueError(
+            f"Buffer length {len(out)} does not match sequence length {seq_len}"
+        )
+    out[:] = b"." * seq_len  # Initially none paired
+
+    for (left_start, left_end), (right_start, right_end) in ir_list:
+        n_base_pairs: int = left_end - left_start + 1
+        out[left_start : left_end + 1] = b"(" * n_base_pairs
+        out[right_start : right_end + 1] = b")" * n_base_pairs
+
+    return out
+
+
+def irs_to_dot_bracket_batch(
+    ir_list: Union[List[IR], IRSet], seq_len: int, out: np.ndarray = None
+) -> np.ndarray:
+    """Renders the single IR dot bracket repr of every IR in ir_list into row i of a (n_irs, seq_len) uint8 array.
+    Rows are ASCII, see dot_bracket_batch_as_bytes for viewing them as strings without copying.
+    """
+    ir_set: IRSet = IRSet.from_irs(ir_list)
+    n_irs: int = len(ir_set)
+
+    if out is None:
+        out = np.empty((n_irs, seq_len), dtype=np.uint8)
+    elif out.shape != (n_irs, seq_len) or out.dtype != np.uint8:
+        raise ValueError(f"Buffer must be a uint8 array of shape {(n_irs, seq_len)}")
 
-    return "".join(paired_bases)
+    base_idxs: np.ndarray = np.arange(seq_len, dtype=np.int32)
+    in_left_strand: np.ndarray = (base_idxs >= ir_set.left_start[:, None]) & (
+        base_idxs <= ir_set.left_end[:, None]
+    )
+    in_right_strand: np.ndarray = (base_idxs >= ir_set.right_start[:, None]) & (
+        base_idxs <= ir_set.right_end[:, None]
+    )
+
+    out.fill(UNPAIRED)
+    out[in_left_strand] = OPENING_BRACKET
+    out[in_right_strand] = CLOSING_BRACKET
+
+    return out
+
+
+def dot_bracket_batch_as_bytes(batch: np.ndarray) -> np.ndarray:
+    """Zero-copy view of a batch rendered by irs_to_dot_bracket_batch as a 1-D array of fixed width byte strings."""
+    return np.ascontiguousarray(batch).view(f"S{batch.shape[1]}").reshape(-1)
 
 
 def get_valid_gap_sz_ir_n_tuples(
@@ -40,10 +85,11 @@ def get_valid_gap_sz_ir_n_tuples(
     all_unique_possible_idx_n_tuples: List[Tuple[int, ...]] = list(
         itertools.combinations([i for i in range(num_irs)], n)
     )
+    invalid_gap_sz_irs_idxs_set: Set[int] = set(invalid_gap_sz_irs_idxs)
     valid_ir_idx_n_tuples: List[Tuple[int, ...]] = [
         ir_idx_n_tuple
         for ir_idx_n_tuple in all_unique_possible_idx_n_tuples
-        if all([ir_idx_n_tuple[i] not in invalid_gap_sz_irs_idxs for i in range(n)])
+        if all([ir_idx_n_tuple[i] not in invalid_gap_sz_irs_idxs_set for i in range(n)])
     ]
 
     valid_ir_n_tuples: List[Tuple[IR, ...]] = [
@@ -84,8 +130,12 @@ def create_seq_file(seq: str, seq_name: str, file_name: str) -> None:
         file.write(seq)
 
 
-def run_cmd(cmd):
-    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+def run_cmd(cmd, *, capture_stdout: bool = True):
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE if capture_stdout else subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
     stdout, stderr = proc.communicate()
     return proc.returncode, stdout, stderr
 
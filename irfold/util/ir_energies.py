@@ -0,0 +1,178 @@
+__all__ = [
+    "calc_ir_free_energies",
+    "get_fold_compound",
+    "EnergyModel",
+    "IR_ENERGY_CHUNK_SIZE",
+]
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing import shared_memory
+from typing import List, NamedTuple, Tuple, Union
+
+import numpy as np
+
+from .helper_functions import irs_to_dot_bracket_batch, dot_bracket_batch_as_bytes
+from .ir_set import IR, IRSet, IR_DTYPE
+from .lazy_imports import lazy_import
+
+RNA = lazy_import("RNA")
+
+# Number of IRs evaluated per task submitted to the worker pool
+IR_ENERGY_CHUNK_SIZE: int = 512
+
+
+class EnergyModel(NamedTuple):
+    """Energy model settings IR free energies are evaluated under, param_file is a ViennaRNA energy parameter file
+    and the default Turner 2004 parameters are used if it is None."""
+
+    temperature: float = 37.0
+    param_file: str = None
+
+
+# Per worker process state, set by _init_worker so it is created once per worker rather than once per chunk
+_worker_state: dict = {}
+
+
+def calc_ir_free_energies(
+    ir_list: Union[List[IR], IRSet],
+    sequence: str,
+    *,
+    n_workers: int = 1,
+    chunk_size: int = IR_ENERGY_CHUNK_SIZE,
+    energy_model: EnergyModel = None,
+    executor: Executor = None,
+) -> np.ndarray:
+    """Returns the free energy of the single IR structure of every IR in ir_list, in ir_list order.
+
+    IRs are split into chunks of chunk_size, with n_workers > 1 the chunks are evaluated in a process pool where each
+    worker holds its own ViennaRNA fold compound for the sequence and reads the sequence and IR table from shared
+    memory. The output does not depend on n_workers or chunk_size. Free energies are evaluated under energy_model, or
+    ViennaRNA's current defaults if it is None.
+
+    If an executor is given, the chunks are evaluated by it instead of a pool created for this call, so a long-lived
+    pool can be reused across sequences. Each task then carries the sequence and its IR chunk, and workers keep the
+    fold compound of the last sequence and energy model they saw."""
+    ir_set: IRSet = IRSet.from_irs(ir_list)
+    n_irs: int = len(ir_set)
+    chunk_bounds: List[Tuple[int, int]] = [
+        (chunk_start, min(chunk_start + chunk_size, n_irs))
+        for chunk_start in range(0, n_irs, chunk_size)
+    ]
+
+    if executor is not None:
+        return np.concatenate(
+            [np.empty(0, dtype=np.float64)]
+            + list(
+                executor.map(
+                    _eval_ir_chunk_task,
+                    repeat(sequence),
+                    repeat(energy_model),
+                    [ir_set.data[start:stop] for start, stop in chunk_bounds],
+                )
+            )
+        )
+
+    if n_workers <= 1 or len(chunk_bounds) <= 1:
+        fold_compound = get_fold_compound(sequence, energy_model)
+        return np.concatenate(
+            [np.empty(0, dtype=np.float64)]
+            + [
+                _eval_ir_chunk(fold_compound, ir_set[start:stop], len(sequence))
+                for start, stop in chunk_bounds
+            ]
+        )
+
+    seq_shm = shared_memory.SharedMemory(create=True, size=max(len(sequence), 1))
+    irs_shm = shared_memory.SharedMemory(create=True, size=ir_set.data.nbytes)
+    try:
+        seq_shm.buf[: len(sequence)] = sequence.encode("ascii")
+        np.ndarray(n_irs, dtype=IR_DTYPE, buffer=irs_shm.buf)[:] = ir_set.data
+
+        with ProcessPoolExecutor(
+            max_workers=min(n_workers, len(chunk_bounds)),
+            initializer=_init_worker,
+            initargs=(seq_shm.name, len(sequence), irs_shm.name, n_irs, energy_model),
+        ) as executor:
+            # map yields results in submission order so the output is deterministic
+            energy_chunks: List[np.ndarray] = list(
+                executor.map(_eval_shared_ir_chunk, chunk_bounds)
+            )
+    finally:
+        seq_shm.close()
+        seq_shm.unlink()
+        irs_shm.close()
+        irs_shm.unlink()
+
+    return np.concatenate(energy_chunks)
+
+
+def get_fold_compound(sequence: str, energy_model: EnergyModel = None):
+    """Returns a ViennaRNA fold compound for the sequence under energy_model. Loading a parameter file changes
+    ViennaRNA's global parameters, they are restored to the Turner 2004 defaults once the fold compound has copied
+    them."""
+    if energy_model is None:
+        return RNA.fold_compound(sequence)
+
+    model_details = RNA.md()
+    model_details.temperature = energy_model.temperature
+    if energy_model.param_file is None:
+        return RNA.fold_compound(sequence, model_details)
+
+    RNA.params_load(str(energy_model.param_file))
+    try:
+        return RNA.fold_compound(sequence, model_details)
+    finally:
+        RNA.params_load_RNA_Turner2004()
+
+
+def _eval_ir_chunk(fold_compound, ir_chunk: IRSet, seq_len: int) -> np.ndarray:
+    db_batch: np.ndarray = irs_to_dot_bracket_batch(ir_chunk, seq_len)
+    return np.array(
+        [
+            fold_compound.eval_structure(db_repr.decode("ascii"))
+            for db_repr in dot_bracket_batch_as_bytes(db_batch)
+        ],
+        dtype=np.float64,
+    )
+
+
+def _init_worker(
+    seq_shm_name: str,
+    seq_len: int,
+    irs_shm_name: str,
+    n_irs: int,
+    energy_model: EnergyModel,
+):
+    seq_shm = shared_memory.SharedMemory(name=seq_shm_name)
+    irs_shm = shared_memory.SharedMemory(name=irs_shm_name)
+    sequence: str = bytes(seq_shm.buf[:seq_len]).decode("ascii")
+
+    # Shared memory handles are kept alive for the lifetime of the worker as the IR table is a view onto them
+    _worker_state["shm"] = (seq_shm, irs_shm)
+    _worker_state["seq_len"] = seq_len
+    _worker_state["ir_set"] = IRSet(
+        np.ndarray(n_irs, dtype=IR_DTYPE, buffer=irs_shm.buf)
+    )
+    _worker_state["fold_compound"] = get_fold_compound(sequence, energy_model)
+
+
+def _eval_shared_ir_chunk(chunk_bounds: Tuple[int, int]) -> np.ndarray:
+    start, stop = chunk_bounds
+    return _eval_ir_chunk(
+        _worker_state["fold_compound"],
+        _worker_state["ir_set"][start:stop],
+        _worker_state["seq_len"],
+    )
+
+
+def _eval_ir_chunk_task(
+    sequence: str, energy_model: EnergyModel, ir_chunk_data: np.ndarray
+) -> np.ndarray:
+    fold_compound_key: Tuple[str, EnergyModel] = (sequence, energy_model)
+    if _worker_state.get("fold_compound_key") != fold_compound_key:
+        _worker_state["fold_compound_key"] = fold_compound_key
+        _worker_state["task_fold_compound"] = get_fold_compound(sequence, energy_model)
+    return _eval_ir_chunk(
+        _worker_state["task_fold_compound"], IRSet(ir_chunk_data), len(sequence)
+    )
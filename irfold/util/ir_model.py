@@ -0,0 +1,91 @@
+__all__ = ["IRModel", "IR_MODEL_FORMAT_VERSION", "IR_MODEL_CP_MODEL_FILE"]
+
+import json
+from pathlib import Path
+from typing import NamedTuple, Union
+
+import numpy as np
+
+from .ir_set import IRSet
+
+# Version of the IR model artifact layout written by IRModel.save, bumped on incompatible changes
+IR_MODEL_FORMAT_VERSION: int = 1
+
+# Files of an IR model artifact directory, arrays are uncompressed .npy so they can be loaded memory mapped
+IR_MODEL_META_FILE: str = "meta.json"
+IR_MODEL_IR_SET_FILE: str = "ir_set.npy"
+IR_MODEL_PAIRS_FILE: str = "incompatible_ir_pair_idxs.npy"
+IR_MODEL_COEFFICIENTS_FILE: str = "variable_coefficients.npy"
+IR_MODEL_CP_MODEL_FILE: str = "cp_model.pb"  # Written by IRfold.save_ir_model
+
+
+class IRModel(NamedTuple):
+    """The IRs found in a sequence that are given a variable (those with valid gap sizes), the index pairs of IRs
+    that cannot both be present in a structure and the objective coefficient of each IR. Everything needed to build
+    and solve the optimisation problem without re-running IR search, pair validation or energy evaluation.
+    """
+
+    sequence: str
+    ir_set: IRSet
+    incompatible_ir_pair_idxs: np.ndarray  # Shape (n_pairs, 2), indices into ir_set
+    variable_coefficients: np.ndarray  # One per IR in ir_set
+    max_mismatches: int = 0
+
+    def subset(self, ir_idxs: np.ndarray, max_mismatches: int = None) -> "IRModel":
+        """Returns the model restricted to the IRs at ir_idxs, keeping only the pairs between kept IRs."""
+        ir_idxs = np.asarray(ir_idxs, dtype=np.int64)
+        old_to_new_idx: np.ndarray = np.full(len(self.ir_set), -1, dtype=np.int64)
+        old_to_new_idx[ir_idxs] = np.arange(len(ir_idxs))
+
+        pair_idxs: np.ndarray = old_to_new_idx[self.incompatible_ir_pair_idxs].reshape(
+            -1, 2
+        )
+        return IRModel(
+            self.sequence,
+            self.ir_set[ir_idxs],
+            pair_idxs[(pair_idxs >= 0).all(axis=1)].astype(np.int32),
+            self.variable_coefficients[ir_idxs],
+            self.max_mismatches if max_mismatches is None else max_mismatches,
+        )
+
+    def save(self, artifact_dir: Union[str, Path]) -> Path:
+        """Writes the model to artifact_dir, creating it if needed: the IR table, pair indices and coefficients as
+        .npy arrays and the sequence, mismatch budget and format version as JSON. Returns the artifact directory.
+        """
+        artifact_path: Path = Path(artifact_dir)
+        artifact_path.mkdir(parents=True, exist_ok=True)
+
+        np.save(artifact_path / IR_MODEL_IR_SET_FILE, self.ir_set.data)
+        np.save(artifact_path / IR_MODEL_PAIRS_FILE, self.incompatible_ir_pair_idxs)
+        np.save(artifact_path / IR_MODEL_COEFFICIENTS_FILE, self.variable_coefficients)
+        with open(artifact_path / IR_MODEL_META_FILE, "w") as f_out:
+            json.dump(
+                {
+                    "format_version": IR_MODEL_FORMAT_VERSION,
+                    "sequence": self.sequence,
+                    "max_mismatches": self.max_mismatches,
+                },
+                f_out,
+            )
+
+        return artifact_path
+
+    @classmethod
+    def load(cls, artifact_dir: Union[str, Path], *, mmap: bool = True) -> "IRModel":
+        """Loads a model written by save, with its arrays memory mapped read-only unless mmap is False."""
+        artifact_path: Path = Path(artifact_dir)
+        with open(artifact_path / IR_MODEL_META_FILE) as f_in:
+            meta: dict = json.load(f_in)
+        if meta["format_version"] != IR_MODEL_FORMAT_VERSION:
+            raise ValueError(
+                f"IR model artifact has format version {meta['format_version']}, expected {IR_MODEL_FORMAT_VERSION}"
+            )
+
+        mmap_mode: str = "r" if mmap else None
+        return cls(
+            meta["sequence"],
+            IRSet(np.load(artifact_path / IR_MODEL_IR_SET_FILE, mmap_mode=mmap_mode)),
+            np.load(artifact_path / IR_MODEL_PAIRS_FILE, mmap_mode=mmap_mode),
+            np.load(artifact_path / IR_MODEL_COEFFICIENTS_FILE, mmap_mode=mmap_mode),
+            meta["max_mismatches"],
+        )
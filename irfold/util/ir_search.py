@@ -0,0 +1,210 @@
+__all__ = [
+    "bases_complementary",
+    "find_watson_crick_irs",
+    "point_mutation_ir_update",
+    "derive_lower_mismatch_irs",
+]
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .ir_set import IR, IRSet
+
+# Watson-Crick complementarity as IUPACpal applies it when no mismatches are permitted
+COMPLEMENTARY_BASES = {("A", "U"), ("U", "A"), ("G", "C"), ("C", "G")}
+
+# COMPLEMENTARY_BASES as a lookup table over base codes, 0 for any character other than A, C, G and U
+BASE_CODES: np.ndarray = np.zeros(256, dtype=np.int64)
+for _base_code, _base in enumerate("ACGU", start=1):
+    BASE_CODES[ord(_base)] = _base_code
+COMPLEMENTARY_CODES: np.ndarray = np.zeros((5, 5), dtype=bool)
+for _base_a, _base_b in COMPLEMENTARY_BASES:
+    COMPLEMENTARY_CODES[BASE_CODES[ord(_base_a)], BASE_CODES[ord(_base_b)]] = True
+
+
+def bases_complementary(base_a: str, base_b: str) -> bool:
+    return (
+        base_a.upper().replace("T", "U"),
+        base_b.upper().replace("T", "U"),
+    ) in COMPLEMENTARY_BASES
+
+
+def find_watson_crick_irs(sequence: str) -> IRSet:
+    """Finds the IRs IUPACpal finds with no mismatches in-process, as every maximal run of two or more complementary
+    base pairs (i, d - i) along each antidiagonal d, without spawning IUPACpal or writing files.
+    """
+    seq_len: int = len(sequence)
+    base_codes: np.ndarray = BASE_CODES[
+        np.frombuffer(
+            sequence.upper().replace("T", "U").encode("ascii"), dtype=np.uint8
+        )
+    ]
+    complementary: np.ndarray = COMPLEMENTARY_CODES[
+        base_codes[:, np.newaxis], base_codes[np.newaxis, :]
+    ]
+
+    irs: List[Tuple[int, int, int, int]] = []
+    for diagonal in range(1, 2 * seq_len - 2):
+        # Left indices of the base pairs (i, diagonal - i) with i < diagonal - i within the sequence
+        left_idxs: np.ndarray = np.arange(
+            max(0, diagonal - seq_len + 1), (diagonal + 1) // 2
+        )
+        if len(left_idxs) < 2:
+            continue
+        is_pair: np.ndarray = complementary[left_idxs, diagonal - left_idxs]
+
+        # Runs of complementary pairs are delimited by the rising and falling edges of is_pair
+        edges: np.ndarray = np.diff(
+            np.concatenate([[False], is_pair, [False]]).astype(np.int8)
+        )
+        for run_start, run_end in zip(
+            left_idxs[0] + (edges == 1).nonzero()[0],
+            left_idxs[0] + (edges == -1).nonzero()[0] - 1,
+        ):
+            if run_end - run_start + 1 >= 2:
+                irs.append(
+                    (run_start, run_end, diagonal - run_end, diagonal - run_start)
+                )
+
+    return IRSet.from_columns(
+        *(np.array([ir[i] for ir in irs], dtype=np.int32) for i in range(4))
+    )
+
+
+def point_mutation_ir_update(
+    ir_set: IRSet, mutated_sequence: str, position: int
+) -> Tuple[np.ndarray, IRSet]:
+    """Updates the IRs found (with no mismatches) in a sequence for a point mutation at position, without a new IR
+    search over the whole sequence.
+
+    An IR is a maximal run of complementary base pairs (i, d - i) along one antidiagonal d. A point mutation can only
+    change the runs on antidiagonals with a base pair involving position, and on each of those only the stretch of
+    complementary pairs either side of that base pair. Returns a mask over ir_set of IRs that are unaffected and the
+    IRs found in the affected stretches of mutated_sequence."""
+    seq_len: int = len(mutated_sequence)
+    affected_stretch_start: np.ndarray = np.full(2 * seq_len, -1, dtype=np.int64)
+    affected_stretch_end: np.ndarray = np.full(2 * seq_len, -2, dtype=np.int64)
+    new_irs: List[Tuple[int, int, int, int]] = []
+
+    for paired_position in range(seq_len):
+        if paired_position == position:
+            continue
+        diagonal: int = position + paired_position
+        mutated_pair_left_idx: int = min(position, paired_position)
+
+        # Extend outwards and inwards from the pair involving position along complementary pairs
+        stretch_start: int = mutated_pair_left_idx
+        while (
+            stretch_start - 1 >= 0
+            and diagonal - stretch_start + 1 < seq_len
+            and bases_complementary(
+                mutated_sequence[stretch_start - 1],
+                mutated_sequence[diagonal - stretch_start + 1],
+            )
+        ):
+            stretch_start -= 1
+        stretch_end: int = mutated_pair_left_idx
+        while stretch_end + 1 < diagonal - stretch_end - 1 and bases_complementary(
+            mutated_sequence[stretch_end + 1],
+            mutated_sequence[diagonal - stretch_end - 1],
+        ):
+            stretch_end += 1
+
+        affected_stretch_start[diagonal] = stretch_start
+        affected_stretch_end[diagonal] = stretch_end
+
+        if bases_complementary(
+            mutated_sequence[position], mutated_sequence[paired_position]
+        ):
+            runs = [(stretch_start, stretch_end)]
+        else:
+            runs = [
+                (stretch_start, mutated_pair_left_idx - 1),
+                (mutated_pair_left_idx + 1, stretch_end),
+            ]
+        new_irs.extend(
+            (run_start, run_end, diagonal - run_end, diagonal - run_start)
+            for run_start, run_end in runs
+            if run_end - run_start + 1 >= 2
+        )
+
+    # IRs lying in an affected stretch are superseded by the runs found in that stretch
+    ir_diagonals: np.ndarray = ir_set.left_start.astype(np.int64) + ir_set.right_end
+    unaffected_mask: np.ndarray = ~(
+        (ir_set.left_start >= affected_stretch_start[ir_diagonals])
+        & (ir_set.left_start <= affected_stretch_end[ir_diagonals])
+    )
+    new_ir_set: IRSet = IRSet.from_columns(
+        *(np.array([ir[i] for ir in new_irs], dtype=np.int32) for i in range(4))
+    )
+
+    return unaffected_mask, new_ir_set
+
+
+def derive_lower_mismatch_irs(
+    irs: List[IR], ir_mismatch_offsets: List[List[int]], max_mismatches: int
+) -> Tuple[List[IR], List[List[int]]]:
+    """Derives the IRs IUPACpal finds with at most max_mismatches from the IRs (and the offsets of their mismatched
+    base pairs, see IRfold._find_irs_with_mismatches) it found with a higher mismatch budget.
+
+    IRs found with a higher budget extend across mismatches, so IRs with fewer mismatches are the maximal windows of
+    each IR containing at most max_mismatches mismatches, trimmed to start and end with a matching base pair and not
+    contained in another such window on the same antidiagonal."""
+    # Candidate windows per antidiagonal keyed by window start, valued by window end and mismatch offsets
+    windows: Dict[int, Dict[int, Tuple[int, List[int]]]] = {}
+    for ((left_start, left_end), (_, right_end)), mismatch_offsets in zip(
+        irs, ir_mismatch_offsets
+    ):
+        diagonal_windows = windows.setdefault(left_start + right_end, {})
+        strand_len: int = left_end - left_start + 1
+        mismatch_offsets_set = set(mismatch_offsets)
+
+        # Maximal windows start at the IR's outermost base pair or just after a mismatch
+        for window_start in [0] + [offset + 1 for offset in mismatch_offsets]:
+            window_mismatches: List[int] = [
+                offset for offset in mismatch_offsets if offset >= window_start
+            ][: max_mismatches + 1]
+            window_end: int = (
+                window_mismatches[max_mismatches] - 1
+                if len(window_mismatches) > max_mismatches
+                else strand_len - 1
+            )
+            while window_start <= window_end and window_start in mismatch_offsets_set:
+                window_start += 1
+            while window_end >= window_start and window_end in mismatch_offsets_set:
+                window_end -= 1
+            if window_end - window_start + 1 < 2:
+                continue
+
+            start_idx: int = left_start + window_start
+            end_idx: int = left_start + window_end
+            if (
+                start_idx not in diagonal_windows
+                or diagonal_windows[start_idx][0] < end_idx
+            ):
+                diagonal_windows[start_idx] = (
+                    end_idx,
+                    [
+                        offset - window_start
+                        for offset in mismatch_offsets
+                        if window_start <= offset <= window_end
+                    ],
+                )
+
+    # Discard windows contained in another window on the same antidiagonal
+    derived_irs: List[IR] = []
+    derived_mismatch_offsets: List[List[int]] = []
+    for diagonal, diagonal_windows in windows.items():
+        furthest_end: int = -1
+        for start_idx in sorted(diagonal_windows.keys()):
+            end_idx, mismatch_offsets = diagonal_windows[start_idx]
+            if end_idx <= furthest_end:
+                continue
+            furthest_end = end_idx
+            derived_irs.append(
+                ((start_idx, end_idx), (diagonal - end_idx, diagonal - start_idx))
+            )
+            derived_mismatch_offsets.append(mismatch_offsets)
+
+    return derived_irs, derived_mismatch_offsets
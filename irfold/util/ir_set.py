@@ -0,0 +1,122 @@
+__all__ = ["IR", "IRSet", "IR_DTYPE", "MIN_GAP_SIZE"]
+
+from typing import Iterable, Iterator, List, Tuple, Union
+
+import numpy as np
+
+IR = Tuple[Tuple[int, int], Tuple[int, int]]
+
+IR_DTYPE = np.dtype(
+    [
+        ("left_start", np.int32),
+        ("left_end", np.int32),
+        ("right_start", np.int32),
+        ("right_end", np.int32),
+    ]
+)
+
+# Smallest number of unpaired bases allowed between the two strands of an IR, see ir_has_valid_gap_size
+MIN_GAP_SIZE: int = 3
+
+
+class IRSet:
+    """Compact container of IRs backed by a structured NumPy array of four int32 columns.
+
+    Slicing with a slice object returns a zero-copy view, indexing with an integer returns the IR in the legacy
+    ((left_start, left_end), (right_start, right_end)) tuple form so an IRSet can be passed anywhere a list of IRs
+    is expected."""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: np.ndarray = None):
+        if data is None:
+            data = np.empty(0, dtype=IR_DTYPE)
+        if data.dtype != IR_DTYPE or data.ndim != 1:
+            raise ValueError(f"IRSet data must be a 1-D array with dtype {IR_DTYPE}")
+        self._data: np.ndarray = data
+
+    @classmethod
+    def from_irs(cls, irs: Union[Iterable[IR], "IRSet"]) -> "IRSet":
+        if isinstance(irs, IRSet):
+            return irs
+        flat_irs: List[tuple] = [(ir[0][0], ir[0][1], ir[1][0], ir[1][1]) for ir in irs]
+        return cls(np.array(flat_irs, dtype=IR_DTYPE))
+
+    @classmethod
+    def from_columns(
+        cls,
+        left_start: np.ndarray,
+        left_end: np.ndarray,
+        right_start: np.ndarray,
+        right_end: np.ndarray,
+    ) -> "IRSet":
+        data: np.ndarray = np.empty(len(left_start), dtype=IR_DTYPE)
+        data["left_start"] = left_start
+        data["left_end"] = left_end
+        data["right_start"] = right_start
+        data["right_end"] = right_end
+        return cls(data)
+
+    @classmethod
+    def concatenate(cls, ir_sets: Iterable["IRSet"]) -> "IRSet":
+        return cls(
+            np.concatenate([np.empty(0, dtype=IR_DTYPE)] + [s.data for s in ir_sets])
+        )
+
+    def to_irs(self) -> List[IR]:
+        return [((ls, le), (rs, re)) for ls, le, rs, re in self._data.tolist()]
+
+    @property
+    def data(self) -> np.ndarray:
+        return self._data
+
+    @property
+    def left_start(self) -> np.ndarray:
+        return self._data["left_start"]
+
+    @property
+    def left_end(self) -> np.ndarray:
+        return self._data["left_end"]
+
+    @property
+    def right_start(self) -> np.ndarray:
+        return self._data["right_start"]
+
+    @property
+    def right_end(self) -> np.ndarray:
+        return self._data["right_end"]
+
+    @property
+    def n_base_pairs(self) -> np.ndarray:
+        return self.left_end - self.left_start + 1
+
+    @property
+    def gap_sizes(self) -> np.ndarray:
+        return self.right_start - self.left_end - 1
+
+    def valid_gap_size_mask(self) -> np.ndarray:
+        """Bulk equivalent of ir_has_valid_gap_size over every IR in the set."""
+        return self.gap_sizes >= MIN_GAP_SIZE
+
+    def filter_valid_gap_size(self) -> "IRSet":
+        return self[self.valid_gap_size_mask()]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[IR]:
+        return iter(self.to_irs())
+
+    def __getitem__(self, item) -> Union[IR, "IRSet"]:
+        if isinstance(item, (int, np.integer)):
+            ls, le, rs, re = self._data[item].tolist()
+            return (ls, le), (rs, re)
+        return IRSet(self._data[item])
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, IRSet):
+            return NotImplemented
+        return np.array_equal(self._data, other._data)
+
+    def __repr__(self) -> str:
+        return f"IRSet(n_irs={len(self)})"
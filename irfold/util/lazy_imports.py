@@ -0,0 +1,47 @@
+__all__ = ["lazy_import"]
+
+import importlib
+import importlib.util
+import sys
+import threading
+from types import ModuleType
+
+
+class _LazyModule(ModuleType):
+    """Stands in for a module until one of its attributes is first accessed, then imports it and forwards attribute
+    access to it. The import is made under a lock so threads first using the module at once all see it loaded,
+    unlike importlib.util.LazyLoader before Python 3.13."""
+
+    def __init__(self, module_name: str):
+        super().__init__(module_name)
+        self.__dict__["_lazy_lock"] = threading.Lock()
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> ModuleType:
+        module: ModuleType = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr_name: str):
+        return getattr(self._load(), attr_name)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(module_name: str) -> ModuleType:
+    """Returns the module, deferring its execution until one of its attributes is first accessed so heavy
+    dependencies are only paid for by code that uses them. Parent packages are imported eagerly. The first access is
+    thread safe.
+    """
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    if importlib.util.find_spec(module_name) is None:
+        raise ModuleNotFoundError(f"No module named '{module_name}'", name=module_name)
+    return _LazyModule(module_name)
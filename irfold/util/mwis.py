@@ -0,0 +1,184 @@
+__all__ = ["ConflictGraph", "build_conflict_graph", "mwis_ir_selection"]
+
+import time
+from typing import List, NamedTuple
+
+import numpy as np
+
+from .ir_set import IRSet
+
+# Perturbations tried by mwis_ir_selection's iterated local search
+MWIS_ILS_ITERATIONS: int = 100
+
+
+class ConflictGraph(NamedTuple):
+    """Graph with an edge between every two IRs that cannot both be present in a structure, in compressed sparse
+    row form: the neighbours of IR i are indices[indptr[i]:indptr[i + 1]]."""
+
+    indptr: np.ndarray
+    indices: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.indices) // 2
+
+    def neighbours(self, ir_idx: int) -> np.ndarray:
+        return self.indices[self.indptr[ir_idx] : self.indptr[ir_idx + 1]]
+
+
+def build_conflict_graph(ir_set: IRSet) -> ConflictGraph:
+    """Builds the conflict graph of the IRs of ir_set, which should all have valid gap sizes, without checking
+    every IR pair: IRs are swept in order of left strand start and each is only compared, vectorised, with the IRs
+    starting within its span. Of those, an IR is compatible only with IRs lying in its gap.
+    """
+    n_irs: int = len(ir_set)
+    ir_order: np.ndarray = np.argsort(ir_set.left_start, kind="stable")
+    left_start: np.ndarray = ir_set.left_start[ir_order]
+    left_end: np.ndarray = ir_set.left_end[ir_order]
+    right_start: np.ndarray = ir_set.right_start[ir_order]
+    right_end: np.ndarray = ir_set.right_end[ir_order]
+    span_ends: np.ndarray = np.searchsorted(left_start, right_end, side="right")
+
+    edge_sources: List[np.ndarray] = []
+    edge_targets: List[np.ndarray] = []
+    for order_idx in range(n_irs):
+        others: slice = slice(order_idx + 1, span_ends[order_idx])
+        in_gap: np.ndarray = (left_end[order_idx] < left_start[others]) & (
+            right_end[others] < right_start[order_idx]
+        )
+        conflicts: np.ndarray = ir_order[others][~in_gap]
+        edge_sources.append(np.full(len(conflicts), ir_order[order_idx], np.int32))
+        edge_targets.append(conflicts.astype(np.int32))
+
+    sources: np.ndarray = np.concatenate(edge_sources + edge_targets or [[]])
+    targets: np.ndarray = np.concatenate(edge_targets + edge_sources or [[]])
+    edge_order: np.ndarray = np.argsort(sources, kind="stable")
+    indptr: np.ndarray = np.zeros(n_irs + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources.astype(np.int64), minlength=n_irs), out=indptr[1:])
+
+    return ConflictGraph(indptr, targets[edge_order].astype(np.int32))
+
+
+class _IndependentSet:
+    """Independent set of a conflict graph, tracking each IR's number of selected neighbours."""
+
+    def __init__(self, graph: ConflictGraph, weights: np.ndarray):
+        self.graph: ConflictGraph = graph
+        self.weights: np.ndarray = weights
+        self.selected: np.ndarray = np.zeros(len(graph), dtype=bool)
+        self.n_selected_neighbours: np.ndarray = np.zeros(len(graph), dtype=np.int32)
+        self.weight: float = 0.0
+
+    def add(self, ir_idx: int) -> None:
+        self.selected[ir_idx] = True
+        self.n_selected_neighbours[self.graph.neighbours(ir_idx)] += 1
+        self.weight += self.weights[ir_idx]
+
+    def remove(self, ir_idx: int) -> None:
+        self.selected[ir_idx] = False
+        self.n_selected_neighbours[self.graph.neighbours(ir_idx)] -= 1
+        self.weight -= self.weights[ir_idx]
+
+    def force_add(self, ir_idx: int) -> np.ndarray:
+        """Adds the IR, removing its selected neighbours, which are returned."""
+        neighbours: np.ndarray = self.graph.neighbours(ir_idx)
+        removed: np.ndarray = neighbours[self.selected[neighbours]]
+        for removed_idx in removed:
+            self.remove(removed_idx)
+        self.add(ir_idx)
+        return removed
+
+    def add_free(self, ir_idxs: np.ndarray) -> None:
+        """Adds, heaviest first, each of the IRs with positive weight that has no selected neighbour."""
+        for ir_idx in ir_idxs[np.argsort(-self.weights[ir_idxs], kind="stable")]:
+            if (
+                not self.selected[ir_idx]
+                and self.n_selected_neighbours[ir_idx] == 0
+                and self.weights[ir_idx] > 0
+            ):
+                self.add(ir_idx)
+
+    def copy_from(self, other: "_IndependentSet") -> None:
+        self.selected[:] = other.selected
+        self.n_selected_neighbours[:] = other.n_selected_neighbours
+        self.weight = other.weight
+
+    def improve(self, candidates: List[int]) -> None:
+        """Applies (k, 1)-swaps, adding an IR and removing its selected neighbours whenever that adds weight, until
+        none of the candidates, or IRs next to a changed IR, gives one."""
+        while candidates:
+            ir_idx: int = candidates.pop()
+            if self.selected[ir_idx] or self.weights[ir_idx] <= 0:
+                continue
+            neighbours: np.ndarray = self.graph.neighbours(ir_idx)
+            selected_neighbours: np.ndarray = neighbours[self.selected[neighbours]]
+            if self.weights[ir_idx] <= self.weights[selected_neighbours].sum():
+                continue
+
+            self.force_add(ir_idx)
+            for removed_idx in selected_neighbours:
+                freed: np.ndarray = self.graph.neighbours(removed_idx)
+                self.add_free(freed)
+                candidates.extend(freed[~self.selected[freed]].tolist())
+
+
+def mwis_ir_selection(
+    graph: ConflictGraph,
+    weights: np.ndarray,
+    *,
+    n_iterations: int = MWIS_ILS_ITERATIONS,
+    time_limit: float = None,
+    seed: int = 0,
+) -> List[int]:
+    """Heuristically selects a maximum weight independent set of the conflict graph, i.e. compatible IRs of
+    greatest total weight, and returns the selected indices. IRs with non-positive weight are never selected.
+
+    A greedy construction, adding IRs in decreasing order of weight over degree + 1, is improved by local search
+    (see _IndependentSet.improve) then by iterated local search: n_iterations times, or until time_limit seconds
+    pass, a random unselected IR is forced into the set and the set improved again, keeping the result if it weighs
+    no less. Each step touches only the neighbourhoods of the IRs it changes."""
+    start: float = time.perf_counter()
+    weights = np.asarray(weights, dtype=np.float64)
+    positive_ir_idxs: np.ndarray = (weights > 0).nonzero()[0]
+    if len(positive_ir_idxs) == 0:
+        return []
+
+    current = _IndependentSet(graph, weights)
+    degrees: np.ndarray = np.diff(graph.indptr)[positive_ir_idxs]
+    for ir_idx in positive_ir_idxs[
+        np.argsort(-weights[positive_ir_idxs] / (degrees + 1), kind="stable")
+    ]:
+        if current.n_selected_neighbours[ir_idx] == 0:
+            current.add(ir_idx)
+    current.improve(positive_ir_idxs.tolist())
+
+    best = _IndependentSet(graph, weights)
+    best.copy_from(current)
+    candidate = _IndependentSet(graph, weights)
+    rng = np.random.default_rng(seed)
+    for _ in range(n_iterations):
+        if time_limit is not None and time.perf_counter() - start > time_limit:
+            break
+        unselected: np.ndarray = positive_ir_idxs[~current.selected[positive_ir_idxs]]
+        if len(unselected) == 0:
+            break
+
+        candidate.copy_from(current)
+        ir_idx: int = rng.choice(unselected)
+        removed: np.ndarray = candidate.force_add(ir_idx)
+        changed: List[int] = []
+        for removed_idx in removed:
+            freed: np.ndarray = graph.neighbours(removed_idx)
+            candidate.add_free(freed)
+            changed.extend(freed.tolist())
+        candidate.improve(changed + graph.neighbours(ir_idx).tolist())
+
+        if candidate.weight >= current.weight:
+            current.copy_from(candidate)
+            if current.weight > best.weight:
+                best.copy_from(current)
+
+    return best.selected.nonzero()[0].tolist()
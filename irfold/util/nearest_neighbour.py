@@ -0,0 +1,161 @@
+__all__ = ["calc_ir_free_energies_nn", "NN_APPROXIMATION_TOLERANCE"]
+
+from typing import List, Union
+
+import numpy as np
+
+from .ir_set import IR, IRSet
+
+# Nearest neighbour parameters from the Turner 2004 set (ViennaRNA's default rna_turner2004.par) in dcal/mol.
+# Pair types are indexed as in ViennaRNA: 1=CG, 2=GC, 3=GU, 4=UG, 5=AU, 6=UA, 7=non-standard.
+# Bases are indexed 0=unknown, 1=A, 2=C, 3=G, 4=U.
+INF: int = 10000000
+
+STACK: np.ndarray = np.array(
+    [
+        [INF, INF, INF, INF, INF, INF, INF, INF],
+        [INF, -240, -330, -210, -140, -210, -210, -140],
+        [INF, -330, -340, -250, -150, -220, -240, -150],
+        [INF, -210, -250, 130, -50, -140, -130, 130],
+        [INF, -140, -150, -50, 30, -60, -100, 30],
+        [INF, -210, -220, -140, -60, -110, -90, -60],
+        [INF, -210, -240, -130, -100, -90, -130, -90],
+        [INF, -140, -150, 130, 30, -60, -90, 130],
+    ],
+    dtype=np.int64,
+)
+
+HAIRPIN: np.ndarray = np.array(
+    [INF, INF, INF, 540, 560, 570, 540, 600, 550, 640, 650, 660, 670, 680, 690, 690]
+    + [700, 710, 710, 720, 720, 730, 730, 740, 740, 750, 750, 750, 760, 760, 770],
+    dtype=np.int64,
+)
+
+DANGLE5: np.ndarray = np.array(
+    [
+        [0, 0, 0, 0, 0],
+        [-10, -50, -30, -20, -10],
+        [0, -20, -30, 0, 0],
+        [-20, -30, -30, -40, -20],
+        [-10, -30, -10, -20, -20],
+        [-20, -30, -30, -40, -20],
+        [-10, -30, -10, -20, -20],
+        [0, -20, -10, 0, 0],
+    ],
+    dtype=np.int64,
+)
+
+DANGLE3: np.ndarray = np.array(
+    [
+        [0, 0, 0, 0, 0],
+        [-40, -110, -40, -130, -60],
+        [-80, -170, -80, -170, -120],
+        [-10, -70, -10, -70, -10],
+        [-50, -80, -50, -80, -60],
+        [-10, -70, -10, -70, -10],
+        [-50, -80, -50, -80, -60],
+        [-10, -70, -10, -70, -10],
+    ],
+    dtype=np.int64,
+)
+
+TERMINAL_AU: int = 50
+LXC: float = 107.856  # Extrapolation coefficient for hairpin loops longer than 30
+
+# The hairpin terminal mismatch and special hairpin bonuses are not tabulated here, they are replaced by the
+# mean terminal mismatch contribution of the Turner 2004 hairpin mismatch table
+HAIRPIN_MISMATCH_MEAN: int = -80
+
+# Stated maximum absolute deviation (kcal/mol) from calc_free_energy for single IRs with canonical base pairs
+NN_APPROXIMATION_TOLERANCE: float = 2.5
+
+BASE_IDXS: np.ndarray = np.zeros(256, dtype=np.int64)
+for _base, _base_idx in zip("ACGUT", [1, 2, 3, 4, 4]):
+    BASE_IDXS[ord(_base)] = _base_idx
+    BASE_IDXS[ord(_base.lower())] = _base_idx
+
+PAIR_TYPES: np.ndarray = np.full((5, 5), 7, dtype=np.int64)
+for (_base_i, _base_j), _pair_type in {
+    (2, 3): 1,
+    (3, 2): 2,
+    (3, 4): 3,
+    (4, 3): 4,
+    (1, 4): 5,
+    (4, 1): 6,
+}.items():
+    PAIR_TYPES[_base_i, _base_j] = _pair_type
+
+
+def calc_ir_free_energies_nn(
+    ir_list: Union[List[IR], IRSet], sequence: str
+) -> np.ndarray:
+    """Approximates the free energy (kcal/mol) of the single IR structure of every IR in ir_list from nearest
+    neighbour stacking, hairpin loop, terminal AU and exterior dangle terms, vectorised over the whole IR set.
+
+    Intended for throughput over exactness, for IRs with valid gap sizes and canonical base pairs results are within
+    NN_APPROXIMATION_TOLERANCE of calc_free_energy. Special hairpin loops (e.g. tetraloop bonuses) are not modelled.
+    """
+    ir_set: IRSet = IRSet.from_irs(ir_list)
+    n_irs: int = len(ir_set)
+    seq_len: int = len(sequence)
+    if n_irs == 0:
+        return np.empty(0, dtype=np.float64)
+
+    seq_base_idxs: np.ndarray = BASE_IDXS[
+        np.frombuffer(sequence.encode("ascii"), dtype=np.uint8)
+    ]
+    outer_i: np.ndarray = ir_set.left_start.astype(np.int64)
+    outer_j: np.ndarray = ir_set.right_end.astype(np.int64)
+    inner_i: np.ndarray = ir_set.left_end.astype(np.int64)
+    inner_j: np.ndarray = ir_set.right_start.astype(np.int64)
+    n_base_pairs: np.ndarray = inner_i - outer_i + 1
+
+    # Stacking energies, one entry per pair of adjacent base pairs across all IRs
+    n_stacks: np.ndarray = n_base_pairs - 1
+    stack_ir_idxs: np.ndarray = np.repeat(np.arange(n_irs), n_stacks)
+    stack_offsets: np.ndarray = np.arange(n_stacks.sum()) - np.repeat(
+        np.cumsum(n_stacks) - n_stacks, n_stacks
+    )
+    stack_i: np.ndarray = outer_i[stack_ir_idxs] + stack_offsets
+    stack_j: np.ndarray = outer_j[stack_ir_idxs] - stack_offsets
+    pair_type: np.ndarray = PAIR_TYPES[seq_base_idxs[stack_i], seq_base_idxs[stack_j]]
+    inner_pair_rtype: np.ndarray = PAIR_TYPES[
+        seq_base_idxs[stack_j - 1], seq_base_idxs[stack_i + 1]
+    ]
+    energies: np.ndarray = np.bincount(
+        stack_ir_idxs, weights=STACK[pair_type, inner_pair_rtype], minlength=n_irs
+    )
+
+    # Hairpin loop closed by the innermost base pair
+    loop_sizes: np.ndarray = inner_j - inner_i - 1
+    closing_type: np.ndarray = PAIR_TYPES[
+        seq_base_idxs[inner_i], seq_base_idxs[inner_j]
+    ]
+    energies += np.where(
+        loop_sizes <= 30,
+        HAIRPIN[np.minimum(loop_sizes, 30)],
+        HAIRPIN[30] + LXC * np.log(np.maximum(loop_sizes, 30) / 30.0),
+    )
+    energies += np.where(
+        loop_sizes == 3,
+        np.where(closing_type > 2, TERMINAL_AU, 0),
+        HAIRPIN_MISMATCH_MEAN,
+    )
+
+    # Exterior loop, terminal AU penalty and dangles on the outermost base pair
+    outer_type: np.ndarray = PAIR_TYPES[seq_base_idxs[outer_i], seq_base_idxs[outer_j]]
+    energies += np.where(outer_type > 2, TERMINAL_AU, 0)
+    has_5_prime_neighbour: np.ndarray = outer_i > 0
+    has_3_prime_neighbour: np.ndarray = outer_j < seq_len - 1
+    energies += np.where(
+        has_5_prime_neighbour,
+        DANGLE5[outer_type, seq_base_idxs[np.maximum(outer_i - 1, 0)]],
+        0,
+    )
+    energies += np.where(
+        has_3_prime_neighbour,
+        DANGLE3[outer_type, seq_base_idxs[np.minimum(outer_j + 1, seq_len - 1)]],
+        0,
+    )
+
+    return energies / 100.0
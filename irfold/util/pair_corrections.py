@@ -0,0 +1,156 @@
+__all__ = [
+    "PAIR_CORRECTION_MAX_LOOP_SIZE",
+    "find_adjacent_ir_pairs",
+    "irs_by_paired_position",
+    "ir_pair_local_context_key",
+    "calc_ir_pair_corrections",
+]
+
+from typing import List, Tuple
+
+import numpy as np
+
+from .energy_cache import LocalEnergyCache, ir_local_context_key
+from .helper_functions import irs_to_dot_bracket
+from .ir_energies import EnergyModel, get_fold_compound
+from .ir_set import IR, IRSet
+
+# Largest number of unpaired bases between two nested IRs for them to be corrected as closing the same loop,
+# ViennaRNA's default maximum interior loop size
+PAIR_CORRECTION_MAX_LOOP_SIZE: int = 30
+
+
+def find_adjacent_ir_pairs(
+    ir_set: IRSet, max_loop_size: int = PAIR_CORRECTION_MAX_LOOP_SIZE
+) -> np.ndarray:
+    """Returns the (outer, inner) indices of the IR pairs of ir_set, which should all have valid gap sizes, where
+    the inner IR lies in the outer's gap with at most max_loop_size unpaired bases between them, i.e. that stack or
+    close an interior loop or bulge together if no other IR pairs a base between them.
+
+    Side by side IRs are not returned: single IR free energies are additive in the exterior loop, as dangles are
+    applied whatever their neighbours pair with. IRs are sorted by left strand start so each is only compared,
+    vectorised, with the IRs starting within max_loop_size bases of its left strand end.
+    """
+    ir_order: np.ndarray = np.argsort(ir_set.left_start, kind="stable")
+    left_start: np.ndarray = ir_set.left_start[ir_order]
+    left_end: np.ndarray = ir_set.left_end[ir_order]
+    right_start: np.ndarray = ir_set.right_start[ir_order]
+    right_end: np.ndarray = ir_set.right_end[ir_order]
+    window_starts: np.ndarray = np.searchsorted(left_start, left_end, side="right")
+    window_ends: np.ndarray = np.searchsorted(
+        left_start, left_end + 1 + max_loop_size, side="right"
+    )
+
+    adjacent_pairs: List[np.ndarray] = []
+    for order_idx in range(len(ir_set)):
+        others: slice = slice(window_starts[order_idx], window_ends[order_idx])
+        left_loop_sizes: np.ndarray = left_start[others] - left_end[order_idx] - 1
+        right_loop_sizes: np.ndarray = right_start[order_idx] - right_end[others] - 1
+        adjacent: np.ndarray = (right_loop_sizes >= 0) & (
+            left_loop_sizes + right_loop_sizes <= max_loop_size
+        )
+        inner_idxs: np.ndarray = ir_order[others][adjacent]
+        adjacent_pairs.append(
+            np.stack([np.full(len(inner_idxs), ir_order[order_idx]), inner_idxs], 1)
+        )
+
+    return np.concatenate([np.empty((0, 2), dtype=np.int64)] + adjacent_pairs).astype(
+        np.int64
+    )
+
+
+def irs_by_paired_position(ir_set: IRSet, seq_len: int) -> List[np.ndarray]:
+    """Returns, for each position of the sequence, the indices of the IRs of ir_set pairing it."""
+    strand_lens: np.ndarray = (ir_set.left_end - ir_set.left_start + 1).astype(np.int64)
+    base_ir_idxs: np.ndarray = np.repeat(np.arange(len(ir_set)), strand_lens)
+    base_offsets: np.ndarray = np.arange(len(base_ir_idxs)) - np.repeat(
+        np.cumsum(strand_lens) - strand_lens, strand_lens
+    )
+    positions: np.ndarray = np.concatenate(
+        [
+            ir_set.left_start[base_ir_idxs] + base_offsets,
+            ir_set.right_start[base_ir_idxs] + base_offsets,
+        ]
+    )
+    ir_idxs: np.ndarray = np.concatenate([base_ir_idxs, base_ir_idxs])
+
+    position_order: np.ndarray = np.argsort(positions, kind="stable")
+    return np.split(
+        ir_idxs[position_order],
+        np.searchsorted(positions[position_order], np.arange(1, seq_len)),
+    )
+
+
+def ir_pair_local_context_key(sequence: str, outer_ir: IR, inner_ir: IR) -> str:
+    """As ir_local_context_key for the structure of two nested IRs: the bases from one before the outer IR's left
+    strand to one after its right strand and both IRs' positions within them."""
+    context_start: int = max(outer_ir[0][0] - 1, 0)
+    context_end: int = min(outer_ir[1][1] + 2, len(sequence))
+    return ":".join(
+        [sequence[context_start:context_end]]
+        + [
+            str(pos - context_start)
+            for ir in (outer_ir, inner_ir)
+            for strand in ir
+            for pos in strand
+        ]
+    )
+
+
+def calc_ir_pair_corrections(
+    ir_set: IRSet,
+    adjacent_pairs: np.ndarray,
+    sequence: str,
+    *,
+    energy_model: EnergyModel = None,
+    energy_cache: LocalEnergyCache = None,
+) -> np.ndarray:
+    """Returns, for each (outer, inner) pair of adjacent_pairs, the rounded free energy of the two IR structure less
+    the rounded free energies of each IR's single IR structure, so that a model's rounded single IR coefficients
+    plus the correction give the rounded energy of the pair. Structures are evaluated in one batch by a fold
+    compound shared by all of them, skipping those found in energy_cache if one is given and adding the rest to it.
+    """
+    if len(adjacent_pairs) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    paired_ir_idxs: np.ndarray = np.unique(adjacent_pairs)
+    structures: List[List[IR]] = [
+        [ir_set[a], ir_set[b]] for a, b in adjacent_pairs.tolist()
+    ] + [[ir_set[ir_idx]] for ir_idx in paired_ir_idxs.tolist()]
+    keys: List[Tuple[EnergyModel, str]] = [
+        (
+            energy_model,
+            (
+                ir_pair_local_context_key(sequence, *structure_irs)
+                if len(structure_irs) == 2
+                else ir_local_context_key(sequence, structure_irs[0])
+            ),
+        )
+        for structure_irs in structures
+    ]
+    energies: List[float] = (
+        [None] * len(keys) if energy_cache is None else energy_cache.get_many(keys)
+    )
+
+    missed_idxs: List[int] = [i for i, energy in enumerate(energies) if energy is None]
+    if missed_idxs:
+        fold_compound = get_fold_compound(sequence, energy_model)
+        for i in missed_idxs:
+            energies[i] = fold_compound.eval_structure(
+                irs_to_dot_bracket(structures[i], len(sequence))
+            )
+        if energy_cache is not None:
+            energy_cache.put_many(
+                [keys[i] for i in missed_idxs], [energies[i] for i in missed_idxs]
+            )
+
+    rounded_energies: np.ndarray = np.round(
+        np.array(energies, dtype=np.float64)
+    ).astype(np.int64)
+    single_coefficients: np.ndarray = np.zeros(len(ir_set), dtype=np.int64)
+    single_coefficients[paired_ir_idxs] = rounded_energies[len(adjacent_pairs) :]
+    return (
+        rounded_energies[: len(adjacent_pairs)]
+        - single_coefficients[adjacent_pairs[:, 0]]
+        - single_coefficients[adjacent_pairs[:, 1]]
+    )
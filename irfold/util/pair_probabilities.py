@@ -0,0 +1,59 @@
+__all__ = [
+    "calc_base_pair_probabilities",
+    "calc_ir_pair_probabilities",
+    "prune_irs_by_pair_probability",
+]
+
+import numpy as np
+
+from .ir_energies import EnergyModel, get_fold_compound
+from .ir_set import IRSet
+
+
+def calc_base_pair_probabilities(
+    sequence: str, energy_model: EnergyModel = None
+) -> np.ndarray:
+    """Returns the symmetric matrix of 0-based base pair probabilities in the sequence's thermodynamic ensemble,
+    computed with ViennaRNA's partition function under energy_model. Boltzmann factors are rescaled by the MFE so
+    long sequences do not overflow."""
+    fold_compound = get_fold_compound(sequence, energy_model)
+    _, mfe = fold_compound.mfe()
+    fold_compound.exp_params_rescale(mfe)
+    fold_compound.pf()
+
+    # ViennaRNA's matrix is 1-based and upper triangular
+    bpp: np.ndarray = np.array(fold_compound.bpp(), dtype=np.float64)[1:, 1:]
+    return bpp + bpp.T
+
+
+def calc_ir_pair_probabilities(ir_set: IRSet, bpp: np.ndarray) -> np.ndarray:
+    """Returns the mean probability, by bpp, of the base pairs each IR of ir_set forms: left_start + k with
+    right_end - k for every k within the IR's strands."""
+    n_irs: int = len(ir_set)
+    strand_lens: np.ndarray = (ir_set.left_end - ir_set.left_start + 1).astype(np.int64)
+    pair_ir_idxs: np.ndarray = np.repeat(np.arange(n_irs), strand_lens)
+    pair_offsets: np.ndarray = np.arange(len(pair_ir_idxs)) - np.repeat(
+        np.cumsum(strand_lens) - strand_lens, strand_lens
+    )
+
+    pair_probs: np.ndarray = bpp[
+        ir_set.left_start[pair_ir_idxs] + pair_offsets,
+        ir_set.right_end[pair_ir_idxs] - pair_offsets,
+    ]
+    return np.bincount(pair_ir_idxs, weights=pair_probs, minlength=n_irs) / np.maximum(
+        strand_lens, 1
+    )
+
+
+def prune_irs_by_pair_probability(
+    ir_set: IRSet,
+    sequence: str,
+    min_pair_probability: float,
+    energy_model: EnergyModel = None,
+) -> IRSet:
+    """Returns the IRs of ir_set whose mean base pair probability (see calc_ir_pair_probabilities) is at least
+    min_pair_probability. Base pair probabilities are computed once for the sequence."""
+    if len(ir_set) == 0:
+        return ir_set
+    bpp: np.ndarray = calc_base_pair_probabilities(sequence, energy_model)
+    return ir_set[calc_ir_pair_probabilities(ir_set, bpp) >= min_pair_probability]
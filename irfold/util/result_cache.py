@@ -0,0 +1,133 @@
+__all__ = ["FoldResultCache", "fold_cache_key", "FOLD_CACHE_VERSION"]
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+# Part of every cache key, bumped when a change to folding changes the result of the same inputs
+FOLD_CACHE_VERSION: int = 1
+
+# Number of results a FoldResultCache keeps in memory by default
+FOLD_CACHE_SIZE: int = 1024
+
+
+def fold_cache_key(sequence: str, **fold_params) -> str:
+    """Returns a hex digest identifying the fold of the sequence under fold_params, which must be JSON serialisable
+    and include every parameter that affects the fold's result. Parameters whose value is a path to a file (e.g. an
+    energy parameter file) should be passed as the file's contents or digest so edits to it change the key.
+    """
+    key_json: str = json.dumps(
+        {
+            "version": FOLD_CACHE_VERSION,
+            "sequence": sequence,
+            "params": fold_params,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(key_json.encode("utf-8")).hexdigest()
+
+
+class FoldResultCache:
+    """Cache of fold results, (dot bracket repr, objective function value), keyed by fold_cache_key.
+
+    Results are kept in an in-memory LRU of max_entries and, if cache_dir is given, in one JSON file per key under
+    cache_dir that any number of processes can share: files are written to a temporary file and atomically renamed
+    into place, so readers never see a partial result. Hits from memory and disk and misses are counted.
+    """
+
+    def __init__(
+        self, max_entries: int = FOLD_CACHE_SIZE, cache_dir: Union[str, Path] = None
+    ):
+        self.max_entries: int = max_entries
+        self.cache_dir: Optional[Path] = None if cache_dir is None else Path(cache_dir)
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self.memory_hits: int = 0
+        self.disk_hits: int = 0
+        self.misses: int = 0
+
+        self._results: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self._results),
+            }
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.memory_hits += 1
+                return self._results[key]
+
+        result: Optional[Tuple[str, float]] = self._read_from_disk(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store_in_memory(key, result)
+            return result
+
+    def put(self, key: str, result: Tuple[str, float]) -> None:
+        db_repr, obj_fn_value = result
+        result = (db_repr, obj_fn_value)
+        with self._lock:
+            self._store_in_memory(key, result)
+        if self.cache_dir is not None:
+            self._write_to_disk(key, result)
+
+    def clear(self) -> None:
+        """Empties the in-memory tier and resets the counters, the on-disk tier is left as other processes may be
+        using it."""
+        with self._lock:
+            self._results.clear()
+            self.memory_hits = self.disk_hits = self.misses = 0
+
+    def _store_in_memory(self, key: str, result: Tuple[str, float]) -> None:
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Path:
+        # Keys are spread over subdirectories so no single directory grows too large
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _read_from_disk(self, key: str) -> Optional[Tuple[str, float]]:
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._disk_path(key)) as f_in:
+                db_repr, obj_fn_value = json.load(f_in)
+        except (OSError, ValueError):
+            # Missing, or left unreadable by something other than this class, either way a miss
+            return None
+        return db_repr, obj_fn_value
+
+    def _write_to_disk(self, key: str, result: Tuple[str, float]) -> None:
+        result_path: Path = self._disk_path(key)
+        result_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_fd, tmp_path = tempfile.mkstemp(dir=result_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(tmp_fd, "w") as f_out:
+                json.dump(list(result), f_out)
+            os.replace(tmp_path, result_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
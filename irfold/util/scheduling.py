@@ -0,0 +1,71 @@
+__all__ = ["FoldCostModel", "ScheduledFold"]
+
+import threading
+from typing import List, NamedTuple, Sequence
+
+import numpy as np
+
+from .admission import FoldReport, PAIR_CHECK_SECONDS
+
+# Prior cost, in seconds, of building and solving a fold's model: a fixed overhead, a free energy evaluation per IR
+# whose cost grows with sequence length and a relative position check per candidate IR pair
+PRIOR_FOLD_COEFFICIENTS: Sequence[float] = (1e-3, 2e-7, PAIR_CHECK_SECONDS)
+
+# Number of most recent observations a FoldCostModel is fitted to
+COST_MODEL_MAX_OBSERVATIONS: int = 1024
+
+
+class ScheduledFold(NamedTuple):
+    """Schedule of one sequence of a batch fold: time spent finding its IRs, predicted and actual time spent
+    building and solving its model and the path the fold took. Folds served from the result cache are not
+    searched or solved, their times are 0 and n_irs None."""
+
+    seq_idx: int
+    seq_len: int
+    n_irs: int
+    search_seconds: float
+    predicted_seconds: float
+    actual_seconds: float
+    fold_report: FoldReport
+
+
+class FoldCostModel:
+    """Predicts the time to build and solve a fold's model from the sequence length and the number of IRs found in
+    it, as a linear model over the features of fold_features. Predictions start from PRIOR_FOLD_COEFFICIENTS and
+    the model is refitted by least squares to the most recent max_observations recorded folds, once there are at
+    least as many observations as features. Safe to share between threads."""
+
+    def __init__(self, max_observations: int = COST_MODEL_MAX_OBSERVATIONS):
+        self.max_observations: int = max_observations
+        self.coefficients: np.ndarray = np.array(PRIOR_FOLD_COEFFICIENTS)
+
+        self._features: List[np.ndarray] = []
+        self._seconds: List[float] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fold_features(seq_len: int, n_irs: int) -> np.ndarray:
+        return np.array([1.0, n_irs * seq_len, n_irs * (n_irs - 1) / 2])
+
+    @property
+    def n_observations(self) -> int:
+        return len(self._seconds)
+
+    def predict(self, seq_len: int, n_irs: int) -> float:
+        with self._lock:
+            return float(self.fold_features(seq_len, n_irs) @ self.coefficients)
+
+    def record(self, seq_len: int, n_irs: int, seconds: float) -> None:
+        """Records the actual time of a fold and refits the model."""
+        with self._lock:
+            self._features.append(self.fold_features(seq_len, n_irs))
+            self._seconds.append(seconds)
+            del self._features[: -self.max_observations]
+            del self._seconds[: -self.max_observations]
+
+            if len(self._seconds) >= len(self.coefficients):
+                coefficients, *_ = np.linalg.lstsq(
+                    np.stack(self._features), np.array(self._seconds), rcond=None
+                )
+                # Costs cannot be negative, a negative fitted coefficient means its feature did not vary enough
+                self.coefficients = np.maximum(coefficients, 0.0)
@@ -0,0 +1,68 @@
+__all__ = [
+    "SOLVER_PROFILES",
+    "SOLVER_PROFILE_DIR",
+    "load_solver_profile",
+    "save_solver_profile",
+]
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Union
+
+SolverParams = Dict[str, Union[int, float, bool, str]]
+
+# Named CP-SAT parameter sets, enum valued parameters are given by name. Profiles saved with save_solver_profile are
+# loaded by name from SOLVER_PROFILE_DIR.
+SOLVER_PROFILES: Dict[str, SolverParams] = {
+    "default": {},
+    # From tune_solver_params on 20 random sequences of 30-120 nt: one worker took 0.17 s in total against 0.20 s
+    # for the defaults, other candidates were within noise of it. One worker also leaves cores free when folds run
+    # in parallel, e.g. in IRfoldEngine.fold_batch
+    "small_models": {"num_workers": 1},
+}
+
+# Directory of saved solver profiles, overridden by the IRFOLD_SOLVER_PROFILE_DIR environment variable
+SOLVER_PROFILE_DIR: Path = Path(
+    os.environ.get(
+        "IRFOLD_SOLVER_PROFILE_DIR", Path.home() / ".irfold" / "solver_profiles"
+    )
+)
+
+
+def load_solver_profile(
+    name: str, profile_dir: Union[str, Path] = None
+) -> SolverParams:
+    """Returns the CP-SAT parameters of the named profile: one of SOLVER_PROFILES, a profile saved with
+    save_solver_profile in profile_dir (SOLVER_PROFILE_DIR if None) or the path of a profile's JSON file.
+    """
+    if name in SOLVER_PROFILES:
+        return dict(SOLVER_PROFILES[name])
+
+    profile_path: Path = Path(name)
+    if profile_path.suffix != ".json":
+        profile_path = (
+            SOLVER_PROFILE_DIR if profile_dir is None else Path(profile_dir)
+        ) / f"{name}.json"
+    if not profile_path.exists():
+        raise ValueError(
+            f"Unknown solver profile {name}, expected one of {list(SOLVER_PROFILES)} or a profile saved in "
+            f"{profile_path.parent}"
+        )
+    with open(profile_path) as f_in:
+        return json.load(f_in)
+
+
+def save_solver_profile(
+    name: str, solver_params: SolverParams, profile_dir: Union[str, Path] = None
+) -> Path:
+    """Saves the CP-SAT parameters as a profile loadable by name from profile_dir (SOLVER_PROFILE_DIR if None),
+    returning the profile's path."""
+    profile_dir_path: Path = (
+        SOLVER_PROFILE_DIR if profile_dir is None else Path(profile_dir)
+    )
+    profile_dir_path.mkdir(parents=True, exist_ok=True)
+    profile_path: Path = profile_dir_path / f"{name}.json"
+    with open(profile_path, "w") as f_out:
+        json.dump(solver_params, f_out, indent=4, sort_keys=True)
+    return profile_path
@@ -0,0 +1,68 @@
+__all__ = [
+    "StructureConstraints",
+    "irs_pairing_positions_mask",
+    "filter_irs_by_constraints",
+]
+
+from typing import Iterable, NamedTuple, Tuple
+
+import numpy as np
+
+from .ir_set import IRSet
+
+
+class StructureConstraints(NamedTuple):
+    """Hard constraints on a fold's structure, the 0-based positions that must be unpaired (e.g. protein footprints
+    or SHAPE reactive bases) and that must be paired."""
+
+    unpaired: Tuple[int, ...] = ()
+    paired: Tuple[int, ...] = ()
+
+    @classmethod
+    def from_string(cls, constraint_str: str) -> "StructureConstraints":
+        """Parses ViennaRNA's hard constraint notation restricted to single positions: "x" for unpaired, "|" for
+        paired and "." for unconstrained."""
+        unknown_chars = set(constraint_str) - set("x|.")
+        if unknown_chars:
+            raise ValueError(f"Unknown constraint characters {sorted(unknown_chars)}")
+        return cls(
+            tuple(pos for pos, c in enumerate(constraint_str) if c == "x"),
+            tuple(pos for pos, c in enumerate(constraint_str) if c == "|"),
+        )
+
+    def validate(self, seq_len: int) -> None:
+        for pos in self.unpaired + self.paired:
+            if not 0 <= pos < seq_len:
+                raise ValueError(
+                    f"Constrained position {pos} outside sequence of length {seq_len}"
+                )
+        if set(self.unpaired) & set(self.paired):
+            raise ValueError(
+                f"Positions {sorted(set(self.unpaired) & set(self.paired))} constrained both paired and unpaired"
+            )
+
+
+def irs_pairing_positions_mask(ir_set: IRSet, positions: Iterable[int]) -> np.ndarray:
+    """Returns the mask of IRs pairing any of the positions, found by binary search of the sorted positions for each
+    strand rather than by testing every IR against every position."""
+    sorted_positions: np.ndarray = np.unique(np.fromiter(positions, dtype=np.int64))
+    mask: np.ndarray = np.zeros(len(ir_set), dtype=bool)
+    for strand_start, strand_end in (
+        (ir_set.left_start, ir_set.left_end),
+        (ir_set.right_start, ir_set.right_end),
+    ):
+        mask |= np.searchsorted(sorted_positions, strand_end, side="right") > (
+            np.searchsorted(sorted_positions, strand_start, side="left")
+        )
+    return mask
+
+
+def filter_irs_by_constraints(
+    ir_set: IRSet, constraints: StructureConstraints
+) -> IRSet:
+    """Returns the IRs of ir_set pairing none of the positions constrained to be unpaired. Positions constrained to be
+    paired cannot be enforced by filtering, they are constraints of the model, see IRfold._get_ilp_model.
+    """
+    if not constraints.unpaired:
+        return ir_set
+    return ir_set[~irs_pairing_positions_mask(ir_set, constraints.unpaired)]
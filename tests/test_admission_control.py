@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from irfold import IRfold, IRfoldEngine
+from irfold.util import (
+    FoldBudget,
+    FoldBudgetExceededError,
+    IRSet,
+    calc_ir_free_energies_nn,
+    estimate_model_size,
+    greedy_ir_selection,
+    ir_pair_invalid_relative_pos,
+)
+
+# Admits the candidate pairs of at most 4 IRs
+TIGHT_BUDGET = FoldBudget(max_bytes=6 * 150)
+
+
+@pytest.fixture(scope="module")
+def valid_irs(sequence, data_dir):
+    return IRSet.from_irs(IRfold._find_irs(sequence, data_dir)).filter_valid_gap_size()
+
+
+def test_estimate_model_size(valid_irs):
+    estimate = estimate_model_size(valid_irs)
+    n_irs = len(valid_irs)
+
+    assert estimate.n_irs == n_irs
+    assert estimate.n_candidate_pairs == n_irs * (n_irs - 1) // 2
+    assert 0 <= estimate.n_conflicts <= estimate.n_candidate_pairs
+
+
+def test_budget_max_irs():
+    assert TIGHT_BUDGET.max_irs() == 4
+    assert FoldBudget(max_seconds=0.0).max_irs() == 1
+
+
+def test_greedy_ir_selection_compatible(valid_irs, sequence):
+    selected_idxs = greedy_ir_selection(
+        valid_irs, calc_ir_free_energies_nn(valid_irs, sequence)
+    )
+
+    assert selected_idxs
+    for i, ir_a_idx in enumerate(selected_idxs):
+        for ir_b_idx in selected_idxs[i + 1 :]:
+            assert not ir_pair_invalid_relative_pos(
+                valid_irs[ir_a_idx], valid_irs[ir_b_idx]
+            )
+
+
+def test_within_budget_folds_fully(sequence, data_dir):
+    engine = IRfoldEngine(data_dir, budget=FoldBudget(max_bytes=10**9))
+    db_repr, obj_fn_value, fold_report = engine.fold_with_report(sequence)
+
+    assert fold_report.path == "full"
+    assert (db_repr, obj_fn_value) == IRfold.fold(sequence, data_dir)
+
+
+@pytest.mark.parametrize("fallback", ["prune", "windowed", "heuristic"])
+def test_fallbacks(fallback, sequence, sequence_length, data_dir, valid_irs):
+    engine = IRfoldEngine(data_dir, budget=TIGHT_BUDGET, fallbacks=(fallback,))
+    db_repr, obj_fn_value, fold_report = engine.fold_with_report(sequence)
+
+    assert fold_report.path == fallback
+    assert fold_report.estimate.n_irs == len(valid_irs)
+    assert len(db_repr) == sequence_length
+    assert obj_fn_value <= 0
+    if fallback != "heuristic":
+        assert fold_report.n_irs_used <= TIGHT_BUDGET.max_irs()
+
+
+def test_fail_fast(sequence, data_dir):
+    engine = IRfoldEngine(data_dir, budget=TIGHT_BUDGET, fallbacks=("fail", "prune"))
+
+    with pytest.raises(FoldBudgetExceededError):
+        engine.fold(sequence)
+
+
+def test_classmethod_fold_budget(sequence, sequence_length, data_dir):
+    db_repr, _ = IRfold.fold(sequence, data_dir, budget=TIGHT_BUDGET)
+
+    assert len(db_repr) == sequence_length
+
+
+def test_unknown_fallback(data_dir):
+    with pytest.raises(ValueError):
+        IRfoldEngine(data_dir, fallbacks=("retry",))
+
+
+def test_fold_async_budget(sequence, data_dir):
+    engine = IRfoldEngine(data_dir, budget=TIGHT_BUDGET, fallbacks=("heuristic",))
+
+    assert asyncio.run(engine.fold_async(sequence)) == engine.fold(sequence)
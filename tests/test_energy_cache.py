@@ -0,0 +1,100 @@
+import asyncio
+
+import numpy as np
+
+from irfold import IRfold, IRfoldEngine
+from irfold.util import (
+    IRSet,
+    LocalEnergyCache,
+    calc_ir_free_energies,
+    calc_ir_free_energies_cached,
+    ir_local_context_key,
+)
+
+HAIRPIN = "GGGCGCAAAAGCGCCC"
+
+
+def test_ir_local_context_key_shared_across_sequences():
+    ir = ((3, 8), (13, 18))
+    shifted_ir = ((13, 18), (23, 28))
+
+    assert ir_local_context_key("UUU" + HAIRPIN + "UUU", ir) == ir_local_context_key(
+        "AAAAAAAAAAAUU" + HAIRPIN + "UUAA", shifted_ir
+    )
+    assert ir_local_context_key("UUU" + HAIRPIN + "UUU", ir) != ir_local_context_key(
+        "UUA" + HAIRPIN + "UUU", ir
+    )
+
+
+def test_calc_ir_free_energies_cached(sequence, data_dir):
+    ir_set = IRSet.from_irs(IRfold._find_irs(sequence, data_dir))
+    energy_cache = LocalEnergyCache()
+
+    free_energies = calc_ir_free_energies_cached(ir_set, sequence, energy_cache)
+
+    assert np.array_equal(free_energies, calc_ir_free_energies(ir_set, sequence))
+    assert energy_cache.hits == 0
+
+    calc_ir_free_energies_cached(ir_set, sequence, energy_cache)
+    assert energy_cache.hits == len(ir_set)
+    assert energy_cache.hit_rate == 0.5
+
+
+def test_calc_ir_free_energies_cached_across_sequences():
+    seq_a, seq_b = "AUU" + HAIRPIN + "UUA", "CCCAAGAUU" + HAIRPIN + "UUACAAG"
+    ir_a, ir_b = ((3, 8), (13, 18)), ((9, 14), (19, 24))
+    energy_cache = LocalEnergyCache()
+
+    energy_a = calc_ir_free_energies_cached(IRSet.from_irs([ir_a]), seq_a, energy_cache)
+    energy_b = calc_ir_free_energies_cached(IRSet.from_irs([ir_b]), seq_b, energy_cache)
+
+    assert energy_cache.hits == 1
+    assert energy_a[0] == energy_b[0]
+    assert energy_b[0] == calc_ir_free_energies([ir_b], seq_b)[0]
+
+
+def test_local_energy_cache_evicts_least_recently_used():
+    energy_cache = LocalEnergyCache(max_entries=2)
+    energy_cache.put_many(["a", "b"], [-1.0, -2.0])
+    energy_cache.get_many(["a"])
+    energy_cache.put_many(["c"], [-3.0])
+
+    assert energy_cache.get_many(["a", "b", "c"]) == [-1.0, None, -3.0]
+    assert energy_cache.stats() == {"hits": 3, "misses": 1, "entries": 2}
+
+
+def test_fold_with_energy_cache(sequence, data_dir):
+    energy_cache = LocalEnergyCache()
+    engine = IRfoldEngine(data_dir, energy_cache=energy_cache)
+
+    assert engine.fold(sequence) == IRfoldEngine(data_dir).fold(sequence)
+    assert energy_cache.misses > 0
+
+    engine.fold(sequence, result_cache=None)
+    assert energy_cache.hits > 0
+
+
+def test_fold_async_with_energy_cache(sequence, data_dir):
+    energy_cache = LocalEnergyCache()
+    engine = IRfoldEngine(data_dir, energy_cache=energy_cache)
+
+    assert asyncio.run(engine.fold_async(sequence)) == IRfoldEngine(data_dir).fold(
+        sequence
+    )
+    assert energy_cache.misses > 0
+
+    asyncio.run(engine.fold_async(sequence))
+    assert energy_cache.hits > 0
+
+
+def test_fold_async_shares_energy_cache_with_fold(sequence, data_dir):
+    energy_cache = LocalEnergyCache()
+    engine = IRfoldEngine(data_dir, energy_cache=energy_cache)
+    engine.fold(sequence)
+    stats = energy_cache.stats()
+
+    asyncio.run(engine.fold_async(sequence))
+
+    assert energy_cache.misses == stats["misses"]
+    assert energy_cache.hits > stats["hits"]
+    assert energy_cache.stats()["entries"] == stats["entries"]
@@ -0,0 +1,102 @@
+import random
+
+import pytest
+from ortools.sat.python import cp_model
+
+from irfold import IRfold, IRfoldEngine
+from irfold.util import (
+    IRSet,
+    find_watson_crick_irs,
+    group_helices,
+    helix_pair_relative_positions,
+    ir_pair_invalid_relative_pos,
+    max_disjoint_irs,
+)
+
+
+def _random_sequences(n_seqs, seq_len, seed=0):
+    rng = random.Random(seed)
+    return ["".join(rng.choice("ACGU") for _ in range(seq_len)) for _ in range(n_seqs)]
+
+
+def test_group_helices():
+    ir_set = IRSet.from_irs(
+        [
+            ((0, 3), (10, 13)),
+            ((1, 2), (11, 12)),
+            ((4, 4), (9, 9)),  # Abuts the first IR on its axis
+            ((6, 7), (20, 21)),  # Another axis
+            ((0, 1), (30, 31)),
+            ((5, 6), (25, 26)),  # Same axis, not contiguous
+        ]
+    )
+
+    assert sorted(sorted(helix.tolist()) for helix in group_helices(ir_set)) == [
+        [0, 1, 2],
+        [3],
+        [4],
+        [5],
+    ]
+
+
+def test_max_disjoint_irs():
+    helix = IRSet.from_irs(
+        [((0, 5), (20, 25)), ((0, 1), (24, 25)), ((2, 3), (22, 23)), ((3, 5), (20, 22))]
+    )
+
+    assert max_disjoint_irs(helix) == 2
+
+
+def test_helix_pair_relative_positions_bound_pairs(sequence):
+    ir_set = find_watson_crick_irs(sequence).filter_valid_gap_size()
+    helices = [ir_set[helix_idxs] for helix_idxs in group_helices(ir_set)]
+
+    for helix_a in helices:
+        for helix_b in helices:
+            if helix_a is helix_b:
+                continue
+            always_compatible, _ = helix_pair_relative_positions(helix_a, helix_b)
+            if always_compatible:
+                assert not any(
+                    ir_pair_invalid_relative_pos(ir_a, ir_b)
+                    for ir_a in helix_a
+                    for ir_b in helix_b
+                )
+
+
+@pytest.mark.parametrize("seq", _random_sequences(5, 60) + _random_sequences(3, 120))
+def test_helix_model_same_optimum(seq, data_dir):
+    ir_set = find_watson_crick_irs(seq)
+
+    ir_model, ir_variables = IRfold._get_ilp_model(
+        ir_set, len(seq), seq, data_dir, "seq"
+    )
+    helix_model, helix_slots = IRfold._get_helix_model(
+        ir_set, len(seq), seq, data_dir, "seq"
+    )
+    ir_solver, helix_solver = cp_model.CpSolver(), cp_model.CpSolver()
+    assert ir_solver.Solve(ir_model) == cp_model.OPTIMAL
+    assert helix_solver.Solve(helix_model) == cp_model.OPTIMAL
+
+    assert helix_solver.ObjectiveValue() == ir_solver.ObjectiveValue()
+    assert len(helix_model.Proto().variables) < len(ir_model.Proto().variables)
+
+    # The chosen IRs are compatible and their coefficients sum to the objective
+    active_irs = ir_set[IRfold._get_active_helix_ir_idxs(helix_solver, helix_slots)]
+    assert not any(
+        ir_pair_invalid_relative_pos(ir_a, ir_b)
+        for i, ir_a in enumerate(active_irs)
+        for ir_b in list(active_irs)[i + 1 :]
+    )
+    assert sum(
+        IRfold._get_ir_coefficients(active_irs, len(seq), seq, data_dir, "seq")
+    ) == pytest.approx(helix_solver.ObjectiveValue())
+
+
+def test_engine_helix_formulation(sequence, data_dir):
+    _, obj_fn_value = IRfold.fold(sequence, data_dir)
+
+    assert (
+        IRfoldEngine(data_dir, model_formulation="helix").fold(sequence)[1]
+        == obj_fn_value
+    )
@@ -1,7 +1,12 @@
 from pathlib import Path
 
+import numpy as np
+
 from irfold.util import (
     irs_to_dot_bracket,
+    irs_to_dot_bracket_buffer,
+    irs_to_dot_bracket_batch,
+    dot_bracket_batch_as_bytes,
     calc_free_energy,
     write_solver_performance_to_file,
 )
@@ -21,6 +26,29 @@ def test_db_conversion_output_matches_irs(
         assert generated_db_repr == db_repr
 
 
+def test_db_buffer_conversion_reuses_buffer(
+    all_irs, all_ir_dot_bracket_reprs, sequence_length
+):
+    buffer = bytearray(sequence_length)
+    for ir, db_repr in zip(all_irs, all_ir_dot_bracket_reprs):
+        generated_db_repr = irs_to_dot_bracket_buffer([ir], sequence_length, buffer)
+        assert generated_db_repr is buffer
+        assert generated_db_repr.decode("ascii") == db_repr
+
+
+def test_db_batch_conversion_output_matches_irs(
+    all_irs, all_ir_dot_bracket_reprs, sequence_length
+):
+    batch = irs_to_dot_bracket_batch(list(all_irs), sequence_length)
+    batch_as_bytes = dot_bracket_batch_as_bytes(batch)
+
+    assert batch.shape == (len(list(all_irs)), sequence_length)
+    assert np.shares_memory(batch, batch_as_bytes)
+    assert [db.decode("ascii") for db in batch_as_bytes] == list(
+        all_ir_dot_bracket_reprs
+    )
+
+
 # ToDo: Write tests for IR pair and triplet dot bracket conversions
 
 
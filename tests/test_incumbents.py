@@ -0,0 +1,49 @@
+import csv
+
+import pytest
+
+from irfold import IRfold, IRfoldEngine
+from irfold.util import FoldResultCache
+
+
+@pytest.mark.parametrize("model_formulation", ["ir", "helix"])
+def test_incumbents_improve_to_fold_result(sequence, data_dir, model_formulation):
+    engine = IRfoldEngine(data_dir, model_formulation=model_formulation)
+    incumbents = []
+
+    db_repr, obj_fn_value = engine.fold(sequence, on_incumbent=incumbents.append)
+
+    assert incumbents
+    assert incumbents[-1].dot_bracket_repr == db_repr
+    assert incumbents[-1].obj_fn_value == obj_fn_value
+    for incumbent, next_incumbent in zip(incumbents, incumbents[1:]):
+        assert next_incumbent.obj_fn_value < incumbent.obj_fn_value
+        assert next_incumbent.elapsed_seconds >= incumbent.elapsed_seconds
+    for incumbent in incumbents:
+        assert incumbent.obj_fn_bound <= incumbent.obj_fn_value
+        assert len(incumbent.dot_bracket_repr) == len(sequence)
+
+
+def test_observed_folds_bypass_result_cache(sequence, data_dir):
+    engine = IRfoldEngine(data_dir, result_cache=FoldResultCache())
+    engine.fold(sequence)
+    incumbents = []
+
+    engine.fold(sequence, on_incumbent=incumbents.append)
+
+    assert incumbents
+
+
+def test_anytime_curve_written_to_file(sequence, sequence_name, tmp_path):
+    for _ in range(2):
+        IRfold.fold(
+            sequence, str(tmp_path), seq_name=sequence_name, save_performance=True
+        )
+
+    with open(tmp_path / f"{IRfold.__name__}_anytime_curves.csv") as f_in:
+        rows = list(csv.DictReader(f_in))
+
+    assert rows
+    assert {row["seq_name"] for row in rows} == {sequence_name}
+    # Incumbent indices restart for the second fold
+    assert [int(row["incumbent_idx"]) for row in rows].count(0) == 2
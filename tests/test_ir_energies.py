@@ -0,0 +1,42 @@
+import random
+
+from irfold import IRfold
+from irfold.util import calc_ir_free_energies, calc_free_energy, irs_to_dot_bracket
+
+
+def test_energies_match_calc_free_energy(
+    all_irs, sequence, sequence_name, sequence_length, data_dir
+):
+    all_irs = list(all_irs)
+    ir_free_energies = calc_ir_free_energies(all_irs, sequence)
+
+    assert len(ir_free_energies) == len(all_irs)
+    for ir, ir_free_energy in zip(all_irs, ir_free_energies):
+        expected_free_energy = calc_free_energy(
+            irs_to_dot_bracket([ir], sequence_length),
+            sequence,
+            data_dir,
+            sequence_name,
+            show_warnings=False,
+        )
+        assert ir_free_energy == expected_free_energy
+
+
+def test_parallel_evaluation_is_order_preserving_and_deterministic(all_irs, sequence):
+    all_irs = list(all_irs)
+    serial_free_energies = calc_ir_free_energies(all_irs, sequence)
+    parallel_free_energies = calc_ir_free_energies(
+        all_irs, sequence, n_workers=3, chunk_size=4
+    )
+
+    assert parallel_free_energies.tolist() == serial_free_energies.tolist()
+
+
+def test_fold_with_workers_matches_serial_fold(data_dir):
+    random.seed(0)
+    seq = "".join(random.choice("ACGU") for _ in range(60))
+
+    _, parallel_obj_fn_value = IRfold.fold(seq, out_dir=data_dir, n_workers=2)
+    _, serial_obj_fn_value = IRfold.fold(seq, out_dir=data_dir)
+
+    assert parallel_obj_fn_value == serial_obj_fn_value
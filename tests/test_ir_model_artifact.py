@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from irfold import IRfold
+from irfold.util import IRModel, IRSet
+
+
+def test_save_load_round_trip(sequence, data_dir, tmp_path):
+    ir_model = IRfold.build_ir_model(sequence, data_dir)
+    IRfold.save_ir_model(ir_model, tmp_path / "model")
+
+    loaded_ir_model = IRModel.load(tmp_path / "model")
+
+    assert loaded_ir_model.sequence == ir_model.sequence
+    assert loaded_ir_model.max_mismatches == ir_model.max_mismatches
+    assert loaded_ir_model.ir_set == ir_model.ir_set
+    assert np.array_equal(
+        loaded_ir_model.incompatible_ir_pair_idxs, ir_model.incompatible_ir_pair_idxs
+    )
+    assert np.array_equal(
+        loaded_ir_model.variable_coefficients, ir_model.variable_coefficients
+    )
+    assert isinstance(loaded_ir_model.variable_coefficients, np.memmap)
+    assert IRfold.solve_ir_model(loaded_ir_model) == IRfold.solve_ir_model(ir_model)
+
+
+def test_load_without_mmap(sequence, data_dir, tmp_path):
+    IRfold.build_ir_model(sequence, data_dir).save(tmp_path)
+
+    assert not isinstance(
+        IRModel.load(tmp_path, mmap=False).variable_coefficients, np.memmap
+    )
+
+
+def test_solve_saved_cp_model(sequence, data_dir, tmp_path):
+    ir_model = IRfold.build_ir_model(sequence, data_dir)
+    IRfold.save_ir_model(ir_model, tmp_path)
+
+    ilp_model, variables = IRfold.load_ilp_model(tmp_path)
+    solver = IRfold._new_solver({"num_workers": 1})
+    solver.Solve(ilp_model)
+
+    db_repr, obj_fn_value, active_ir_idxs = IRfold.solve_ir_model(ir_model)
+    assert len(variables) == len(ir_model.ir_set)
+    assert solver.ObjectiveValue() == obj_fn_value
+    assert IRfold._get_active_ir_idxs(solver, variables) == active_ir_idxs
+
+
+def test_resolve_with_solver_params(sequence, data_dir, tmp_path):
+    ir_model = IRfold.build_ir_model(sequence, data_dir)
+    ir_model.save(tmp_path)
+
+    assert IRfold.solve_ir_model(
+        IRModel.load(tmp_path), solver_params={"num_workers": 1}
+    ) == IRfold.solve_ir_model(ir_model)
+
+
+def test_empty_model(tmp_path):
+    ir_model = IRModel(
+        "AAAA",
+        IRSet(),
+        np.empty((0, 2), dtype=np.int32),
+        np.empty(0, dtype=np.int64),
+    )
+    IRfold.save_ir_model(ir_model, tmp_path)
+
+    assert IRfold.solve_ir_model(IRModel.load(tmp_path))[0] == "...."
+
+
+def test_format_version_checked(sequence, data_dir, tmp_path):
+    IRfold.build_ir_model(sequence, data_dir).save(tmp_path)
+    meta_file = tmp_path / "meta.json"
+    meta_file.write_text(
+        meta_file.read_text().replace('"format_version": 1', '"format_version": 0')
+    )
+
+    with pytest.raises(ValueError):
+        IRModel.load(tmp_path)
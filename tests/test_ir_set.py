@@ -0,0 +1,62 @@
+import numpy as np
+
+from irfold import IRfold
+from irfold.util import IRSet, ir_has_valid_gap_size, irs_to_dot_bracket
+
+
+def test_round_trip_to_legacy_form(all_irs):
+    all_irs = list(all_irs)
+    ir_set = IRSet.from_irs(all_irs)
+
+    assert len(ir_set) == len(all_irs)
+    assert ir_set.to_irs() == all_irs
+    assert list(ir_set) == all_irs
+    assert ir_set[3] == all_irs[3]
+
+
+def test_slice_is_zero_copy_view(all_irs):
+    ir_set = IRSet.from_irs(list(all_irs))
+    ir_slice = ir_set[2:5]
+
+    assert isinstance(ir_slice, IRSet)
+    assert len(ir_slice) == 3
+    assert np.shares_memory(ir_slice.data, ir_set.data)
+
+
+def test_bulk_gap_size_filter_matches_scalar_check(all_irs):
+    all_irs = list(all_irs)
+    ir_set = IRSet.from_irs(all_irs)
+
+    assert ir_set.valid_gap_size_mask().tolist() == [
+        ir_has_valid_gap_size(ir) for ir in all_irs
+    ]
+    assert ir_set.filter_valid_gap_size().to_irs() == [
+        ir for ir in all_irs if ir_has_valid_gap_size(ir)
+    ]
+
+
+def test_accepted_by_dot_bracket_conversion(all_irs, sequence_length):
+    all_irs = list(all_irs)
+
+    assert irs_to_dot_bracket(IRSet.from_irs(all_irs), sequence_length) == (
+        irs_to_dot_bracket(all_irs, sequence_length)
+    )
+
+
+def test_accepted_by_get_ilp_model(
+    all_irs,
+    sequence,
+    sequence_length,
+    sequence_name,
+    data_dir,
+    ir_indicator_variables_names,
+):
+    _, variables = IRfold._get_ilp_model(
+        IRSet.from_irs(list(all_irs)),
+        sequence_length,
+        sequence,
+        data_dir,
+        sequence_name,
+    )
+
+    assert [v.Name() for v in variables] == ir_indicator_variables_names
@@ -0,0 +1,82 @@
+import pytest
+
+from irfold import IRfold, IRfoldEngine
+from irfold.util import EnergyModel, find_watson_crick_irs
+
+
+def test_engine_fold_matches_classmethod_fold(sequence, data_dir):
+    with IRfoldEngine(data_dir) as engine:
+        assert engine.fold(sequence) == IRfold.fold(sequence, data_dir)
+
+
+def test_found_irs_cached(sequence, data_dir, monkeypatch):
+    engine = IRfoldEngine(data_dir)
+    first_fold = engine.fold(sequence)
+
+    def fail_find_irs(*args, **kwargs):
+        raise AssertionError("IRs searched for again")
+
+    monkeypatch.setattr(IRfold, "_find_irs", fail_find_irs)
+    assert engine.fold(sequence) == first_fold
+
+
+def test_ir_cache_size(data_dir):
+    engine = IRfoldEngine(data_dir, ir_cache_size=1)
+    first_irs = engine.find_irs("GGGAAACCC")
+    engine.find_irs("GCGCUUCGGCGC")
+
+    assert engine.find_irs("GGGAAACCC") is not first_irs
+
+
+def test_watson_crick_backend(sequence, data_dir):
+    iupacpal_irs = IRfold._find_irs(sequence, data_dir)
+
+    assert sorted(find_watson_crick_irs(sequence).filter_valid_gap_size()) == sorted(
+        ir for ir in iupacpal_irs if ir[1][0] - ir[0][1] - 1 >= 3
+    )
+    assert IRfoldEngine(data_dir, ir_search_backend="watson_crick").fold(
+        sequence
+    ) == IRfold.fold(sequence, data_dir)
+
+
+def test_worker_pool_reused(sequence, data_dir):
+    serial_fold = IRfoldEngine(data_dir).fold(sequence)
+
+    with IRfoldEngine(data_dir, n_workers=2) as engine:
+        assert engine.fold(sequence) == serial_fold
+        executor = engine._executor
+        assert engine.fold(sequence[:-1]) == IRfold.fold(sequence[:-1], data_dir)
+        assert engine._executor is executor
+    assert engine._executor is None
+
+
+def test_energy_model(sequence, data_dir):
+    engine = IRfoldEngine(data_dir, energy_model=EnergyModel(temperature=50.0))
+
+    assert engine.fold(sequence) == IRfold.fold_sweep(sequence, [50.0], data_dir)[0]
+
+
+def test_solver_params(sequence, data_dir):
+    engine = IRfoldEngine(data_dir, solver_params={"num_workers": 1})
+
+    assert engine.fold(sequence) == IRfold.fold(sequence, data_dir)
+
+
+@pytest.mark.parametrize(
+    "engine_kwargs",
+    [
+        {"ir_search_backend": "unknown"},
+        {"ir_search_backend": "watson_crick", "max_mismatches": 1},
+        {"solver_params": {"not_a_parameter": 1}},
+        {"model_formulation": "unknown"},
+        {"solve_backend": "unknown"},
+        {"min_pair_probability": 1.5},
+    ],
+)
+def test_invalid_configuration(engine_kwargs, data_dir):
+    with pytest.raises(ValueError):
+        IRfoldEngine(data_dir, **engine_kwargs)
+
+
+def test_default_engine_shared():
+    assert IRfoldEngine.default() is IRfoldEngine.default()
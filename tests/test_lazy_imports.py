@@ -0,0 +1,55 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from irfold.util import lazy_import
+
+PACKAGE_DIR = str(Path(__file__).resolve().parents[1])
+
+
+@pytest.mark.parametrize("module_name", ["ortools.sat.python.cp_model", "RNA", "tqdm"])
+def test_import_does_not_load_heavy_dependency(module_name):
+    check_loaded = (
+        "import sys, irfold, irfold.util\n"
+        f"module = sys.modules.get({module_name!r})\n"
+        "print(module is not None and type(module).__name__ != '_LazyModule')"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", check_loaded],
+        cwd=PACKAGE_DIR,
+        capture_output=True,
+        check=True,
+    ).stdout
+
+    assert out.decode().strip() == "False"
+
+
+def test_lazy_import_loads_on_attribute_access():
+    json_module = lazy_import("json")
+
+    assert json_module.loads("[1]") == [1]
+
+
+def test_lazy_import_unknown_module():
+    with pytest.raises(ModuleNotFoundError):
+        lazy_import("not_a_module_irfold")
+
+
+def test_lazy_import_concurrent_first_use():
+    fold_concurrently = (
+        "from concurrent.futures import ThreadPoolExecutor\n"
+        "from irfold import IRfoldEngine\n"
+        "from irfold.IRfold import cp_model\n"
+        "with ThreadPoolExecutor(16) as pool:\n"
+        "    list(pool.map(lambda _: cp_model.CpModel(), range(16)))\n"
+        "seqs = ['GGGAAACCC' * (i % 4 + 2) + 'A' * i for i in range(16)]\n"
+        "IRfoldEngine(ir_search_backend='watson_crick').fold_batch(\n"
+        "    seqs, n_search_workers=8, n_solve_workers=8\n"
+        ")\n"
+    )
+
+    subprocess.run(
+        [sys.executable, "-c", fold_concurrently], cwd=PACKAGE_DIR, check=True
+    )
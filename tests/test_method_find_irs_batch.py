@@ -0,0 +1,58 @@
+import pytest
+
+from irfold import IRfold
+from irfold.util import ir_has_valid_gap_size
+
+SHORT_SEQUENCES = [
+    "GGGAAACCC",
+    "UGAUGACUUAUGCUUAACCAAAGCACGGCA",
+    "ACG",
+    "GCGCUUCGGCGCAAAGCGCUUCGGCGC",
+    "AUGGCUACGUAGCCAUUUUU",
+]
+
+
+def _valid_irs(irs):
+    return sorted(ir for ir in irs if ir_has_valid_gap_size(ir))
+
+
+@pytest.mark.parametrize("max_pack_len", [10, 1000])
+@pytest.mark.parametrize("max_packed_seq_len", [20, 1000])
+def test_batch_matches_per_sequence(
+    sequence, data_dir, max_pack_len, max_packed_seq_len
+):
+    sequences = SHORT_SEQUENCES + [sequence]
+
+    batch_irs = IRfold._find_irs_batch(
+        sequences,
+        out_dir=data_dir,
+        max_pack_len=max_pack_len,
+        max_packed_seq_len=max_packed_seq_len,
+    )
+
+    assert len(batch_irs) == len(sequences)
+    for seq, irs in zip(sequences, batch_irs):
+        expected = IRfold._find_irs(seq, out_dir=data_dir) if len(seq) >= 4 else []
+        assert _valid_irs(irs) == _valid_irs(expected)
+
+
+def test_batch_irs_within_sequence(data_dir):
+    for seq, irs in zip(
+        SHORT_SEQUENCES, IRfold._find_irs_batch(SHORT_SEQUENCES, out_dir=data_dir)
+    ):
+        for (left_start, left_end), (right_start, right_end) in irs:
+            assert 0 <= left_start <= left_end < right_start <= right_end < len(seq)
+
+
+def test_batch_with_mismatches(data_dir):
+    batch_irs = IRfold._find_irs_batch(
+        SHORT_SEQUENCES, out_dir=data_dir, max_mismatches=1
+    )
+
+    for seq, irs in zip(SHORT_SEQUENCES, batch_irs):
+        expected = (
+            IRfold._find_irs(seq, out_dir=data_dir, max_mismatches=1)
+            if len(seq) >= 4
+            else []
+        )
+        assert sorted(irs) == sorted(expected)
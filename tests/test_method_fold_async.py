@@ -0,0 +1,85 @@
+import asyncio
+import threading
+
+import pytest
+
+from irfold import IRfold, IRfoldEngine
+
+
+def test_fold_async_matches_fold(sequence, data_dir):
+    assert asyncio.run(IRfold.fold_async(sequence)) == IRfold.fold(sequence, data_dir)
+
+
+def test_fold_async_with_mismatches_matches_fold(sequence, data_dir):
+    assert asyncio.run(
+        IRfold.fold_async(sequence, data_dir, max_mismatches=1)
+    ) == IRfold.fold(sequence, data_dir, max_mismatches=1)
+
+
+def test_fold_async_watson_crick_with_mismatches_matches_fold(sequence, data_dir):
+    engine = IRfoldEngine(data_dir, ir_search_backend="watson_crick")
+
+    async_result = asyncio.run(engine.fold_async(sequence, max_mismatches=1))
+
+    assert async_result == IRfold.fold(sequence, data_dir, max_mismatches=1)
+    assert engine.fold(sequence, max_mismatches=1) == async_result
+
+
+def test_fold_async_iupacpal_subprocess(sequence, data_dir):
+    engine = IRfoldEngine(data_dir)
+
+    async def find_irs():
+        return await engine._find_irs_async(sequence, "seq", 0)
+
+    assert sorted(asyncio.run(find_irs())) == sorted(
+        IRfold._find_irs(sequence, data_dir)
+    )
+
+
+def test_bounded_concurrency(sequence, data_dir):
+    engine = IRfoldEngine(data_dir, max_concurrency=1)
+    sequences = [sequence, sequence[:-1], sequence[1:]]
+
+    async def fold_all():
+        return await asyncio.gather(*[engine.fold_async(seq) for seq in sequences])
+
+    assert asyncio.run(fold_all()) == [IRfold.fold(seq, data_dir) for seq in sequences]
+
+
+class BlockingSolver:
+    """Stands in for CpSolver, Solve blocks until StopSearch is called."""
+
+    def __init__(self):
+        self.stopped = threading.Event()
+
+    def Solve(self, ilp_model):
+        self.stopped.wait(10)
+
+    def StopSearch(self):
+        self.stopped.set()
+
+
+def test_timeout_stops_search(sequence, data_dir, monkeypatch):
+    engine = IRfoldEngine(data_dir)
+    solver = BlockingSolver()
+    monkeypatch.setattr(engine, "_new_solver", lambda: solver)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(engine.fold_async(sequence, timeout=0.5))
+    assert solver.stopped.is_set()
+
+
+def test_cancellation_stops_search(sequence, data_dir, monkeypatch):
+    engine = IRfoldEngine(data_dir)
+    solver = BlockingSolver()
+    monkeypatch.setattr(engine, "_new_solver", lambda: solver)
+
+    async def fold_then_cancel():
+        fold_task = asyncio.ensure_future(engine.fold_async(sequence))
+        await asyncio.sleep(0.5)
+        fold_task.cancel()
+        await fold_task
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(fold_then_cancel())
+    assert solver.stopped.is_set()
@@ -0,0 +1,97 @@
+import os
+
+import numpy as np
+import pytest
+
+from irfold import IRfold, IRfoldEngine
+from irfold.util import FoldCostModel, FoldResultCache
+
+SEQUENCES = [
+    "GGGAAACCC",
+    "UGAUGACUUAUGCUUAACCAAAGCACGGCA",
+    "ACG",
+    "GCGCUUCGGCGCAAAGCGCUUCGGCGC",
+]
+
+
+@pytest.mark.parametrize("n_search_workers", [1, 4])
+@pytest.mark.parametrize("n_solve_workers", [1, 3])
+def test_fold_batch_matches_fold(sequence, data_dir, n_search_workers, n_solve_workers):
+    sequences = SEQUENCES + [sequence]
+
+    assert IRfoldEngine(data_dir).fold_batch(
+        sequences, n_search_workers=n_search_workers, n_solve_workers=n_solve_workers
+    ) == [IRfold.fold(seq, data_dir) for seq in sequences]
+
+
+@pytest.mark.parametrize(
+    "solver_params, expected_num_workers",
+    [(None, max(1, os.cpu_count() // 2)), ({"num_workers": 3}, 3)],
+)
+def test_fold_batch_divides_solver_workers(
+    data_dir, monkeypatch, solver_params, expected_num_workers
+):
+    engine = IRfoldEngine(data_dir, solver_params=solver_params)
+    fold = engine._fold
+    num_workers = []
+
+    def record_num_workers(*args, **kwargs):
+        num_workers.append(kwargs["solver_params"]["num_workers"])
+        return fold(*args, **kwargs)
+
+    monkeypatch.setattr(engine, "_fold", record_num_workers)
+    engine.fold_batch(SEQUENCES, n_solve_workers=2)
+
+    assert num_workers and set(num_workers) == {expected_num_workers}
+
+
+def test_schedule_report(sequence, data_dir):
+    engine = IRfoldEngine(data_dir)
+    sequences = SEQUENCES + [sequence]
+
+    _, schedule = engine.fold_batch_with_report(sequences)
+
+    assert [scheduled.seq_idx for scheduled in schedule] == list(range(len(sequences)))
+    for seq, scheduled in zip(sequences, schedule):
+        assert scheduled.seq_len == len(seq)
+        assert scheduled.n_irs == len(engine.find_irs(seq))
+        assert scheduled.predicted_seconds >= 0
+        assert scheduled.actual_seconds > 0
+    assert engine.cost_model.n_observations == len(sequences)
+
+
+def test_cached_folds_not_scheduled(sequence, data_dir):
+    engine = IRfoldEngine(data_dir, result_cache=FoldResultCache())
+    engine.fold(sequence)
+
+    results, schedule = engine.fold_batch_with_report([sequence])
+
+    assert results == [IRfold.fold(sequence, data_dir)]
+    assert schedule[0].fold_report.path == "cached"
+    assert engine.cost_model.n_observations == 0
+
+
+def test_cost_model_refined():
+    cost_model = FoldCostModel()
+    true_coefficients = np.array([0.01, 1e-5, 1e-4])
+    for seq_len, n_irs in [(50, 10), (100, 40), (200, 150), (400, 300)]:
+        cost_model.record(
+            seq_len,
+            n_irs,
+            float(FoldCostModel.fold_features(seq_len, n_irs) @ true_coefficients),
+        )
+
+    assert cost_model.predict(300, 200) == pytest.approx(
+        float(FoldCostModel.fold_features(300, 200) @ true_coefficients)
+    )
+
+
+def test_fold_errors_raised(data_dir, monkeypatch):
+    engine = IRfoldEngine(data_dir)
+
+    def fail_fold(*args, **kwargs):
+        raise RuntimeError("fold failed")
+
+    monkeypatch.setattr(engine, "_fold", fail_fold)
+    with pytest.raises(RuntimeError):
+        engine.fold_batch(SEQUENCES)
@@ -0,0 +1,110 @@
+import itertools
+import random
+
+import pytest
+
+from irfold import IRfold, IRfoldEngine
+from irfold.util import (
+    EXTERIOR_LOOP,
+    NO_REGION,
+    IRSet,
+    coarse_ir_mask,
+    ir_pair_invalid_relative_pos,
+    refinement_regions,
+)
+
+
+def _random_sequence(seq_len, seed):
+    rng = random.Random(seed)
+    return "".join(rng.choice("ACGU") for _ in range(seq_len))
+
+
+def test_coarse_ir_mask(sequence, data_dir):
+    irs = IRSet.from_irs(IRfold._find_irs(sequence, data_dir))
+
+    assert coarse_ir_mask(irs, 3).tolist() == [
+        left_end - left_start + 1 >= 3 for (left_start, left_end), _ in irs
+    ]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_refinement_regions(seed, data_dir):
+    seq = _random_sequence(60, seed)
+    irs = IRSet.from_irs(IRfold._find_irs(seq, data_dir)).filter_valid_gap_size()
+    coarse_mask = coarse_ir_mask(irs, 3)
+    coarse_irs = []
+    for ir in irs[coarse_mask]:
+        if not any(ir_pair_invalid_relative_pos(ir, other) for other in coarse_irs):
+            coarse_irs.append(ir)
+
+    regions = refinement_regions(irs[~coarse_mask], IRSet.from_irs(coarse_irs))
+
+    for fine_ir, region in zip(irs[~coarse_mask], regions.tolist()):
+        if any(ir_pair_invalid_relative_pos(fine_ir, ir) for ir in coarse_irs):
+            assert region == NO_REGION
+            continue
+        enclosing = [
+            i
+            for i, ((_, left_end), (right_start, _)) in enumerate(coarse_irs)
+            if left_end < fine_ir[0][0] and fine_ir[1][1] < right_start
+        ]
+        assert region == (
+            max(enclosing, key=lambda i: coarse_irs[i][0][1])
+            if enclosing
+            else EXTERIOR_LOOP
+        )
+
+
+def test_refinement_regions_no_coarse_irs(sequence, data_dir):
+    irs = IRSet.from_irs(IRfold._find_irs(sequence, data_dir))
+
+    assert (refinement_regions(irs, IRSet()) == EXTERIOR_LOOP).all()
+
+
+def test_fold_coarse_to_fine_single_level(sequence, data_dir):
+    assert IRfold.fold_coarse_to_fine(
+        sequence, data_dir, min_stem_len=1
+    ) == IRfold.fold(sequence, data_dir)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_fold_coarse_to_fine(seed, data_dir):
+    seq = _random_sequence(80, seed)
+    engine = IRfoldEngine(data_dir)
+    irs = engine.find_irs(seq).filter_valid_gap_size()
+    coarse_mask = coarse_ir_mask(irs, 3)
+
+    db_repr, obj_fn_value = engine.fold_coarse_to_fine(
+        seq, min_stem_len=3, n_refine_workers=1
+    )
+
+    assert engine.fold_coarse_to_fine(seq, min_stem_len=3, n_refine_workers=4) == (
+        db_repr,
+        obj_fn_value,
+    )
+    assert obj_fn_value >= engine.fold(seq)[1]
+
+    # Refining the loops independently is as good as refining them together
+    coarse_irs, coarse_obj_fn_value = engine._solve_irs(
+        irs[coarse_mask], seq, data_dir, "seq"
+    )
+    fine_irs = irs[~coarse_mask]
+    _, fine_obj_fn_value = engine._solve_irs(
+        fine_irs[refinement_regions(fine_irs, coarse_irs) != NO_REGION],
+        seq,
+        data_dir,
+        "seq",
+    )
+    assert obj_fn_value == coarse_obj_fn_value + fine_obj_fn_value
+    assert all(
+        db_repr[pos] != "."
+        for (left_start, left_end), (right_start, right_end) in coarse_irs
+        for pos in itertools.chain(
+            range(left_start, left_end + 1), range(right_start, right_end + 1)
+        )
+    )
+
+
+def test_fold_coarse_to_fine_pair_corrections(sequence, data_dir):
+    with pytest.raises(ValueError):
+        IRfoldEngine(data_dir, pair_corrections=True).fold_coarse_to_fine(sequence)
@@ -0,0 +1,71 @@
+import itertools
+
+import pytest
+
+from irfold import IRfold, IRfoldEngine
+from irfold.util import (
+    FoldBudget,
+    FoldBudgetExceededError,
+    ir_pair_invalid_relative_pos,
+    irs_to_dot_bracket,
+)
+
+
+def _all_structures(sequence, data_dir):
+    """Every structure of the sequence with the lowest objective function value of the IR selections rendering it,
+    by brute force over IR selections."""
+    ir_set = IRfold._find_irs(sequence, data_dir)
+    valid_irs = [ir for ir in ir_set if ir[1][0] - ir[0][1] - 1 >= 3]
+    coefficients = IRfold._get_ir_coefficients(
+        valid_irs, len(sequence), sequence, data_dir, "seq"
+    )
+
+    structures = {}
+    for n_irs in range(len(valid_irs) + 1):
+        for ir_idxs in itertools.combinations(range(len(valid_irs)), n_irs):
+            if any(
+                ir_pair_invalid_relative_pos(valid_irs[a], valid_irs[b])
+                for a, b in itertools.combinations(ir_idxs, 2)
+            ):
+                continue
+            db_repr = irs_to_dot_bracket([valid_irs[i] for i in ir_idxs], len(sequence))
+            obj_fn_value = sum(coefficients[i] for i in ir_idxs)
+            structures[db_repr] = min(
+                structures.get(db_repr, obj_fn_value), obj_fn_value
+            )
+    return structures
+
+
+def test_fold_k_best(sequence, data_dir):
+    k = 8
+    k_best = IRfold.fold_k_best(sequence, k, data_dir)
+
+    assert k_best[0][1] == IRfold.fold(sequence, data_dir)[1]
+    assert len({db_repr for db_repr, _ in k_best}) == k
+    assert [obj_fn_value for _, obj_fn_value in k_best] == sorted(
+        _all_structures(sequence, data_dir).values()
+    )[:k]
+
+
+def test_fold_k_best_exhausts_structures(data_dir):
+    all_structures = _all_structures("GGGAAACCC", data_dir)
+
+    k_best = IRfold.fold_k_best("GGGAAACCC", len(all_structures) + 5, data_dir)
+
+    assert dict(k_best) == all_structures
+    assert [obj_fn_value for _, obj_fn_value in k_best] == sorted(
+        all_structures.values()
+    )
+
+
+def test_fold_k_best_no_irs(data_dir):
+    assert IRfold.fold_k_best("AAAAAAA", 3, data_dir) == [(".......", 0)]
+
+
+def test_fold_k_best_heuristic_budget(sequence, data_dir):
+    engine = IRfoldEngine(
+        data_dir, budget=FoldBudget(max_bytes=0), fallbacks=("heuristic",)
+    )
+
+    with pytest.raises(FoldBudgetExceededError):
+        engine.fold_k_best(sequence, 2)
@@ -0,0 +1,56 @@
+import pytest
+
+from irfold import IRfold
+from irfold.util import derive_lower_mismatch_irs
+
+
+@pytest.mark.parametrize(
+    "ir_fold_variant",
+    [IRfold],
+)
+def test_mismatch_counts_within_budget(
+    ir_fold_variant, sequence, sequence_name, data_dir
+):
+    found_irs, ir_mismatch_offsets = ir_fold_variant._find_irs_with_mismatches(
+        sequence, data_dir, seq_name=sequence_name, max_mismatches=1
+    )
+
+    assert len(found_irs) == len(ir_mismatch_offsets)
+    assert all(len(offsets) <= 1 for offsets in ir_mismatch_offsets)
+    assert any(len(offsets) == 1 for offsets in ir_mismatch_offsets)
+    assert found_irs == ir_fold_variant._find_irs(
+        sequence, data_dir, seq_name=sequence_name, max_mismatches=1
+    )
+
+
+@pytest.mark.parametrize(
+    "ir_fold_variant",
+    [IRfold],
+)
+def test_derived_irs_match_direct_search(
+    ir_fold_variant, sequence, sequence_name, data_dir, all_irs
+):
+    found_irs, ir_mismatch_offsets = ir_fold_variant._find_irs_with_mismatches(
+        sequence, data_dir, seq_name=sequence_name, max_mismatches=1
+    )
+    derived_irs, derived_mismatch_offsets = derive_lower_mismatch_irs(
+        found_irs, ir_mismatch_offsets, 0
+    )
+
+    assert sorted(derived_irs) == sorted(all_irs)
+    assert all(offsets == [] for offsets in derived_mismatch_offsets)
+
+
+@pytest.mark.parametrize(
+    "ir_fold_variant",
+    [IRfold],
+)
+def test_sweep_matches_fold_per_level(ir_fold_variant, sequence, data_dir):
+    results = ir_fold_variant.fold_mismatch_sweep(sequence, [0, 1], data_dir)
+
+    assert sorted(results.keys()) == [0, 1]
+    for level, (_, obj_fn_value) in results.items():
+        _, expected_obj_fn_value = ir_fold_variant.fold(
+            sequence, data_dir, max_mismatches=level
+        )
+        assert obj_fn_value == expected_obj_fn_value
@@ -0,0 +1,79 @@
+from pathlib import Path
+
+import RNA
+import pytest
+
+from irfold import IRfold
+from irfold.util import EnergyModel
+
+
+@pytest.mark.parametrize(
+    "ir_fold_variant",
+    [IRfold],
+)
+def test_one_result_per_energy_model(
+    ir_fold_variant, sequence, sequence_length, data_dir
+):
+    results = ir_fold_variant.fold_sweep(
+        sequence, [25.0, 37.0, EnergyModel(temperature=50.0)], out_dir=data_dir
+    )
+
+    assert len(results) == 3
+    for secondary_structure_pred, obj_fn_value in results:
+        assert len(secondary_structure_pred) == sequence_length
+        assert secondary_structure_pred.count("(") == secondary_structure_pred.count(
+            ")"
+        )
+
+
+@pytest.mark.parametrize(
+    "ir_fold_variant",
+    [IRfold],
+)
+def test_default_energy_model_matches_fold(ir_fold_variant, sequence, data_dir):
+    [(_, sweep_obj_fn_value)] = ir_fold_variant.fold_sweep(
+        sequence, [EnergyModel()], out_dir=data_dir
+    )
+    _, obj_fn_value = ir_fold_variant.fold(sequence, out_dir=data_dir)
+
+    assert sweep_obj_fn_value == obj_fn_value
+
+
+@pytest.mark.parametrize(
+    "ir_fold_variant",
+    [IRfold],
+)
+def test_parallel_sweep_matches_serial_sweep(ir_fold_variant, sequence, data_dir):
+    temperatures = [20.0, 37.0, 60.0]
+
+    serial_obj_fn_values = [
+        obj_fn_value
+        for _, obj_fn_value in ir_fold_variant.fold_sweep(
+            sequence, temperatures, out_dir=data_dir
+        )
+    ]
+    parallel_obj_fn_values = [
+        obj_fn_value
+        for _, obj_fn_value in ir_fold_variant.fold_sweep(
+            sequence, temperatures, out_dir=data_dir, n_workers=3
+        )
+    ]
+
+    assert parallel_obj_fn_values == serial_obj_fn_values
+
+
+@pytest.mark.parametrize(
+    "ir_fold_variant",
+    [IRfold],
+)
+def test_param_file_energy_model(ir_fold_variant, sequence, data_dir):
+    param_file = str(Path(data_dir) / "turner2004.par")
+    RNA.params_save(param_file)
+
+    [(_, param_file_obj_fn_value), (_, default_obj_fn_value)] = (
+        ir_fold_variant.fold_sweep(
+            sequence, [EnergyModel(param_file=param_file), 37.0], out_dir=data_dir
+        )
+    )
+
+    assert param_file_obj_fn_value == default_obj_fn_value
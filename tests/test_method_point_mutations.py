@@ -0,0 +1,51 @@
+import pytest
+
+from irfold import IRfold
+
+
+@pytest.mark.parametrize("position, base", [(0, "U"), (5, "A"), (11, "C"), (23, "A")])
+def test_incremental_model_matches_rebuilt_model(
+    sequence, sequence_name, data_dir, position, base
+):
+    base_ir_model = IRfold.build_ir_model(sequence, data_dir, seq_name=sequence_name)
+    (_, obj_fn_value), mutant_ir_model = IRfold.refold_point_mutation(
+        base_ir_model, position, base
+    )
+
+    mutant_sequence = sequence[:position] + base + sequence[position + 1 :]
+    rebuilt_ir_model = IRfold.build_ir_model(
+        mutant_sequence, data_dir, seq_name=sequence_name
+    )
+
+    assert mutant_ir_model.sequence == mutant_sequence
+    assert sorted(mutant_ir_model.ir_set.to_irs()) == sorted(
+        rebuilt_ir_model.ir_set.to_irs()
+    )
+    assert dict(
+        zip(
+            mutant_ir_model.ir_set.to_irs(),
+            mutant_ir_model.variable_coefficients.tolist(),
+        )
+    ) == dict(
+        zip(
+            rebuilt_ir_model.ir_set.to_irs(),
+            rebuilt_ir_model.variable_coefficients.tolist(),
+        )
+    )
+    assert obj_fn_value == IRfold.solve_ir_model(rebuilt_ir_model)[1]
+
+
+def test_scan_point_mutations(sequence, sequence_length, data_dir):
+    results = IRfold.scan_point_mutations(sequence, [0, 7], data_dir)
+
+    assert len(results) == 6
+    assert (0, sequence[0]) not in results
+    for secondary_structure_pred, _ in results.values():
+        assert len(secondary_structure_pred) == sequence_length
+
+
+def test_mismatch_model_rejected(sequence, data_dir):
+    base_ir_model = IRfold.build_ir_model(sequence, data_dir, max_mismatches=1)
+
+    with pytest.raises(ValueError):
+        IRfold.refold_point_mutation(base_ir_model, 0, "U")
@@ -0,0 +1,78 @@
+import random
+
+import numpy as np
+import pytest
+from ortools.sat.python import cp_model
+
+from irfold import IRfold, IRfoldEngine
+from irfold.util import (
+    build_conflict_graph,
+    find_watson_crick_irs,
+    ir_pair_invalid_relative_pos,
+    mwis_ir_selection,
+)
+
+
+def _random_sequence(seq_len, seed):
+    rng = random.Random(seed)
+    return "".join(rng.choice("ACGU") for _ in range(seq_len))
+
+
+def test_conflict_graph_matches_pair_checks():
+    ir_set = find_watson_crick_irs(_random_sequence(80, 0)).filter_valid_gap_size()
+
+    graph = build_conflict_graph(ir_set)
+
+    for ir_idx in range(len(ir_set)):
+        assert sorted(graph.neighbours(ir_idx).tolist()) == [
+            other_idx
+            for other_idx in range(len(ir_set))
+            if other_idx != ir_idx
+            and ir_pair_invalid_relative_pos(ir_set[ir_idx], ir_set[other_idx])
+        ]
+
+
+def test_empty_conflict_graph():
+    graph = build_conflict_graph(find_watson_crick_irs("AAAA"))
+
+    assert len(graph) == 0 and graph.n_edges == 0
+    assert mwis_ir_selection(graph, np.array([])) == []
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_mwis_selection_independent_and_near_optimal(seed, data_dir):
+    seq = _random_sequence(100, seed)
+    ir_set = find_watson_crick_irs(seq).filter_valid_gap_size()
+    coefficients = np.array(
+        IRfold._get_ir_coefficients(ir_set, len(seq), seq, data_dir, "seq")
+    )
+
+    selected_idxs = mwis_ir_selection(build_conflict_graph(ir_set), -coefficients)
+
+    assert not any(
+        ir_pair_invalid_relative_pos(ir_set[a], ir_set[b])
+        for a in selected_idxs
+        for b in selected_idxs
+        if a < b
+    )
+    ilp_model, _ = IRfold._get_ilp_model(ir_set, len(seq), seq, data_dir, "seq")
+    solver = cp_model.CpSolver()
+    solver.Solve(ilp_model)
+    assert coefficients[selected_idxs].sum() >= solver.ObjectiveValue()
+    assert coefficients[selected_idxs].sum() <= 0.9 * solver.ObjectiveValue()
+
+
+def test_fold_mwis_backend(sequence, data_dir):
+    db_repr, obj_fn_value = IRfold.fold(sequence, data_dir, solve_backend="mwis")
+
+    assert len(db_repr) == len(sequence)
+    assert obj_fn_value == IRfold.fold(sequence, data_dir)[1]
+    assert IRfoldEngine(data_dir, solve_backend="mwis").fold(sequence) == (
+        db_repr,
+        obj_fn_value,
+    )
+
+
+def test_unknown_solve_backend(sequence, data_dir):
+    with pytest.raises(ValueError):
+        IRfold.fold(sequence, data_dir, solve_backend="unknown")
@@ -0,0 +1,44 @@
+import random
+
+from irfold import IRfold
+from irfold.util import (
+    IRSet,
+    calc_ir_free_energies,
+    calc_ir_free_energies_nn,
+    NN_APPROXIMATION_TOLERANCE,
+)
+
+
+def test_approximation_within_tolerance_of_vienna(
+    all_irs, sequence, sequence_name, data_dir
+):
+    random.seed(1)
+    sequences = [sequence] + [
+        "".join(random.choice("ACGU") for _ in range(80)) for _ in range(5)
+    ]
+
+    for i, seq in enumerate(sequences):
+        ir_set = IRSet.from_irs(
+            IRfold._find_irs(seq, data_dir, seq_name=f"{sequence_name}_nn_{i}")
+        ).filter_valid_gap_size()
+
+        approx_free_energies = calc_ir_free_energies_nn(ir_set, seq)
+        free_energies = calc_ir_free_energies(ir_set, seq)
+
+        assert len(approx_free_energies) == len(ir_set)
+        assert all(
+            abs(approx_free_energies - free_energies) <= NN_APPROXIMATION_TOLERANCE
+        )
+
+
+def test_empty_ir_set(sequence):
+    assert len(calc_ir_free_energies_nn(IRSet(), sequence)) == 0
+
+
+def test_fold_with_approx_energies(sequence, sequence_length, data_dir):
+    secondary_structure_pred, obj_fn_value = IRfold.fold(
+        sequence, out_dir=data_dir, approx_energies=True
+    )
+
+    assert len(secondary_structure_pred) == sequence_length
+    assert isinstance(obj_fn_value, float)
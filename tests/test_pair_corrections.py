@@ -0,0 +1,181 @@
+import asyncio
+import itertools
+
+import pytest
+
+from irfold import IRfold, IRfoldEngine
+from irfold.util import (
+    FoldResultCache,
+    IRSet,
+    LocalEnergyCache,
+    calc_ir_pair_corrections,
+    find_adjacent_ir_pairs,
+    get_fold_compound,
+    ir_pair_invalid_relative_pos,
+    irs_by_paired_position,
+    irs_to_dot_bracket,
+)
+
+SEQUENCES = [
+    "CAGAUUUUCAUAUUAUGCAGAAAAUCUACU",
+    "AAAGCGGCACUUGUGAAGUGUUCCCCACGC",
+    "CCGUAAUGCCUUUCCCUAACAGAGUUUUUC",
+]
+
+
+def _valid_irs(sequence, data_dir):
+    return IRSet.from_irs(IRfold._find_irs(sequence, data_dir)).filter_valid_gap_size()
+
+
+def _pairs_position(ir, pos):
+    (left_start, left_end), (right_start, right_end) = ir
+    return left_start <= pos <= left_end or right_start <= pos <= right_end
+
+
+@pytest.mark.parametrize("seq", SEQUENCES)
+def test_find_adjacent_ir_pairs(seq, data_dir):
+    irs = _valid_irs(seq, data_dir)
+
+    adjacent_pairs = find_adjacent_ir_pairs(irs, max_loop_size=4)
+
+    expected = {
+        (a, b)
+        for a, b in itertools.permutations(range(len(irs)), 2)
+        if irs[a][0][1] < irs[b][0][0]
+        and irs[b][1][1] < irs[a][1][0]
+        and (irs[b][0][0] - irs[a][0][1] - 1) + (irs[a][1][0] - irs[b][1][1] - 1) <= 4
+    }
+    assert set(map(tuple, adjacent_pairs.tolist())) == expected
+
+
+def test_irs_by_paired_position(sequence, data_dir):
+    irs = _valid_irs(sequence, data_dir)
+
+    irs_by_position = irs_by_paired_position(irs, len(sequence))
+
+    assert len(irs_by_position) == len(sequence)
+    for pos, ir_idxs in enumerate(irs_by_position):
+        assert sorted(ir_idxs.tolist()) == [
+            i for i, ir in enumerate(irs) if _pairs_position(ir, pos)
+        ]
+
+
+@pytest.mark.parametrize("seq", SEQUENCES)
+def test_calc_ir_pair_corrections(seq, data_dir):
+    irs = _valid_irs(seq, data_dir)
+    adjacent_pairs = find_adjacent_ir_pairs(irs)
+    fold_compound = get_fold_compound(seq)
+
+    def rounded_energy(*ir_idxs):
+        return round(
+            fold_compound.eval_structure(
+                irs_to_dot_bracket([irs[i] for i in ir_idxs], len(seq))
+            )
+        )
+
+    corrections = calc_ir_pair_corrections(irs, adjacent_pairs, seq)
+
+    assert corrections.tolist() == [
+        rounded_energy(a, b) - rounded_energy(a) - rounded_energy(b)
+        for a, b in adjacent_pairs.tolist()
+    ]
+    energy_cache = LocalEnergyCache()
+    calc_ir_pair_corrections(irs, adjacent_pairs, seq, energy_cache=energy_cache)
+    assert (
+        calc_ir_pair_corrections(irs, adjacent_pairs, seq, energy_cache=energy_cache)
+        == corrections
+    ).all()
+    assert energy_cache.hit_rate == 0.5
+
+
+def test_side_by_side_irs_additive(sequence, data_dir):
+    irs = _valid_irs(sequence, data_dir)
+    fold_compound = get_fold_compound(sequence)
+
+    for a, b in itertools.combinations(range(len(irs)), 2):
+        if irs[a][1][1] < irs[b][0][0]:
+            assert fold_compound.eval_structure(
+                irs_to_dot_bracket([irs[a], irs[b]], len(sequence))
+            ) == pytest.approx(
+                fold_compound.eval_structure(
+                    irs_to_dot_bracket([irs[a]], len(sequence))
+                )
+                + fold_compound.eval_structure(
+                    irs_to_dot_bracket([irs[b]], len(sequence))
+                )
+            )
+
+
+@pytest.mark.parametrize("seq", SEQUENCES)
+def test_pair_corrections_model_optimum(seq, data_dir):
+    """The model's optimum is the lowest, over IR selections, of the single IR coefficients plus the corrections of
+    the adjacent pairs closing a loop no other selected IR pairs a base of. No more than 3 IRs fit in these
+    sequences' structures."""
+    irs = _valid_irs(seq, data_dir)
+    coefficients = IRfold._get_ir_coefficients(irs, len(seq), seq, data_dir, "seq")
+    adjacent_pairs = find_adjacent_ir_pairs(irs).tolist()
+    corrections = calc_ir_pair_corrections(
+        irs, find_adjacent_ir_pairs(irs), seq
+    ).tolist()
+
+    def modelled_obj_fn_value(ir_idxs):
+        obj_fn_value = sum(coefficients[i] for i in ir_idxs)
+        for (a, b), correction in zip(adjacent_pairs, corrections):
+            loop_positions = list(range(irs[a][0][1] + 1, irs[b][0][0])) + list(
+                range(irs[b][1][1] + 1, irs[a][1][0])
+            )
+            if (
+                a in ir_idxs
+                and b in ir_idxs
+                and not any(
+                    _pairs_position(irs[c], pos)
+                    for c in ir_idxs
+                    for pos in loop_positions
+                )
+            ):
+                obj_fn_value += correction
+        return obj_fn_value
+
+    best_obj_fn_value = min(
+        modelled_obj_fn_value(ir_idxs)
+        for n_irs in range(4)
+        for ir_idxs in itertools.combinations(range(len(irs)), n_irs)
+        if not any(
+            ir_pair_invalid_relative_pos(irs[a], irs[b])
+            for a, b in itertools.combinations(ir_idxs, 2)
+        )
+    )
+
+    _, obj_fn_value = IRfoldEngine(data_dir, pair_corrections=True).fold(seq)
+
+    assert obj_fn_value == best_obj_fn_value
+
+
+@pytest.mark.parametrize(
+    "engine_kwargs",
+    [
+        {"model_formulation": "helix"},
+        {"solve_backend": "mwis"},
+        {"approx_energies": True},
+    ],
+)
+def test_pair_corrections_invalid_configuration(engine_kwargs, data_dir):
+    with pytest.raises(ValueError):
+        IRfoldEngine(data_dir, pair_corrections=True, **engine_kwargs)
+
+
+def test_pair_corrections_in_cache_key(sequence):
+    assert IRfoldEngine().fold_cache_key(sequence) != IRfoldEngine(
+        pair_corrections=True
+    ).fold_cache_key(sequence)
+
+
+def test_pair_corrections_fold_async(data_dir):
+    seq = "GGGAAACCCAUGCAUGCGCGAUCGAUUUCGAUCGCGCAUGCAUGGGAAACCCUU"
+    engine = IRfoldEngine(
+        data_dir, pair_corrections=True, result_cache=FoldResultCache()
+    )
+
+    assert asyncio.run(engine.fold_async(seq)) == IRfoldEngine(
+        data_dir, pair_corrections=True
+    ).fold(seq)
@@ -0,0 +1,86 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from irfold import IRfold, IRfoldEngine
+from irfold.util import (
+    IRSet,
+    calc_base_pair_probabilities,
+    calc_ir_pair_probabilities,
+    prune_irs_by_pair_probability,
+)
+
+
+def test_calc_base_pair_probabilities(sequence):
+    bpp = calc_base_pair_probabilities(sequence)
+
+    assert bpp.shape == (len(sequence), len(sequence))
+    assert np.allclose(bpp, bpp.T)
+    assert np.all(bpp >= 0)
+    # Each base pairs with at most one other in every structure of the ensemble
+    assert np.all(bpp.sum(axis=1) <= 1 + 1e-9)
+
+
+def test_calc_ir_pair_probabilities(sequence, data_dir):
+    ir_set = IRSet.from_irs(IRfold._find_irs(sequence, data_dir))
+    bpp = calc_base_pair_probabilities(sequence)
+
+    ir_pair_probs = calc_ir_pair_probabilities(ir_set, bpp)
+
+    expected = [
+        np.mean(
+            [
+                bpp[left_start + k, right_end - k]
+                for k in range(left_end - left_start + 1)
+            ]
+        )
+        for (left_start, left_end), (_, right_end) in ir_set
+    ]
+    assert np.allclose(ir_pair_probs, expected)
+
+
+def test_prune_irs_by_pair_probability(sequence, data_dir):
+    ir_set = IRSet.from_irs(IRfold._find_irs(sequence, data_dir))
+
+    assert len(prune_irs_by_pair_probability(ir_set, sequence, 0.0)) == len(ir_set)
+    pruned = prune_irs_by_pair_probability(ir_set, sequence, 0.1)
+    assert 0 < len(pruned) < len(ir_set)
+    assert set(pruned.to_irs()) <= set(ir_set.to_irs())
+
+
+def test_fold_min_pair_probability(sequence, data_dir):
+    engine = IRfoldEngine(data_dir)
+    _, obj_fn_value = engine.fold(sequence)
+
+    assert engine.fold(sequence, min_pair_probability=0.0)[1] == obj_fn_value
+    assert engine.fold(sequence, min_pair_probability=0.1)[1] >= obj_fn_value
+
+
+def test_fold_min_pair_probability_invalid(sequence, data_dir):
+    with pytest.raises(ValueError):
+        IRfoldEngine(data_dir).fold(sequence, min_pair_probability=-0.1)
+
+
+def test_fold_min_pair_probability_in_cache_key(sequence):
+    engine = IRfoldEngine()
+
+    assert engine.fold_cache_key(sequence) != engine.fold_cache_key(
+        sequence, min_pair_probability=0.1
+    )
+
+
+@pytest.mark.parametrize("min_pair_probability", [0.1, 0.5])
+def test_fold_async_min_pair_probability(sequence, data_dir, min_pair_probability):
+    engine = IRfoldEngine(data_dir, min_pair_probability=min_pair_probability)
+
+    assert asyncio.run(engine.fold_async(sequence)) == engine.fold(sequence)
+
+
+def test_fold_coarse_to_fine_min_pair_probability(sequence, data_dir):
+    engine = IRfoldEngine(data_dir, min_pair_probability=0.9)
+    db_repr, _ = engine.fold(sequence)
+
+    coarse_to_fine_db_repr, _ = engine.fold_coarse_to_fine(sequence, min_stem_len=2)
+
+    assert coarse_to_fine_db_repr == db_repr
@@ -0,0 +1,95 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from irfold import IRfold, IRfoldEngine
+from irfold.util import EnergyModel, FoldResultCache, fold_cache_key
+
+
+def test_key_depends_on_sequence_and_params():
+    key = fold_cache_key("GGGAAACCC", max_mismatches=0)
+
+    assert key == fold_cache_key("GGGAAACCC", max_mismatches=0)
+    assert key != fold_cache_key("GGGAAACCG", max_mismatches=0)
+    assert key != fold_cache_key("GGGAAACCC", max_mismatches=1)
+
+
+def test_memory_lru():
+    cache = FoldResultCache(max_entries=2)
+    cache.put("a", ("(...)", -1.0))
+    cache.put("b", ("(...)", -2.0))
+    cache.get("a")
+    cache.put("c", ("(...)", -3.0))
+
+    assert cache.get("b") is None
+    assert cache.get("a") == ("(...)", -1.0)
+    assert cache.stats() == {
+        "memory_hits": 2,
+        "disk_hits": 0,
+        "misses": 1,
+        "entries": 2,
+    }
+
+
+def test_disk_tier_shared(tmp_path):
+    FoldResultCache(cache_dir=tmp_path).put("a", ("(...)", -1.0))
+    other_cache = FoldResultCache(cache_dir=tmp_path)
+
+    assert other_cache.get("a") == ("(...)", -1.0)
+    assert other_cache.get("a") == ("(...)", -1.0)
+    assert (other_cache.disk_hits, other_cache.memory_hits) == (1, 1)
+
+
+def _put_result(cache_dir, worker_idx):
+    cache = FoldResultCache(cache_dir=cache_dir)
+    for _ in range(50):
+        cache.put("shared", ("((...))", -float(worker_idx)))
+        assert cache._read_from_disk("shared") is not None
+
+
+def test_disk_tier_concurrent_writers(tmp_path):
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        list(executor.map(_put_result, [tmp_path] * 4, range(4)))
+
+    assert FoldResultCache(cache_dir=tmp_path).get("shared")[0] == "((...))"
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_engine_result_cache(sequence, data_dir, monkeypatch):
+    cache = FoldResultCache()
+    engine = IRfoldEngine(data_dir, result_cache=cache)
+    result = engine.fold(sequence)
+
+    def fail_fold(*args, **kwargs):
+        raise AssertionError("Sequence folded again")
+
+    monkeypatch.setattr(engine, "_fold", fail_fold)
+    assert engine.fold(sequence) == result
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    with pytest.raises(AssertionError):
+        engine.fold(sequence, max_mismatches=1)
+
+
+def test_classmethod_fold_result_cache(sequence, data_dir):
+    cache = FoldResultCache()
+
+    assert IRfold.fold(sequence, data_dir, result_cache=cache) == IRfold.fold(
+        sequence, data_dir, result_cache=cache
+    )
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_engine_configuration_in_key(sequence, data_dir):
+    keys = {
+        IRfoldEngine(data_dir, **engine_kwargs).fold_cache_key(sequence)
+        for engine_kwargs in [
+            {},
+            {"energy_model": EnergyModel(temperature=50.0)},
+            {"solver_params": {"num_workers": 1}},
+            {"approx_energies": True},
+            {"ir_search_backend": "watson_crick"},
+        ]
+    }
+
+    assert len(keys) == 5
@@ -0,0 +1,80 @@
+import pytest
+
+from irfold import IRfold, IRfoldEngine, tune_solver_params
+from irfold.util import (
+    FoldResultCache,
+    SOLVER_PROFILES,
+    load_solver_profile,
+    save_solver_profile,
+)
+
+SEQUENCES = ["UGAUGACUUAUGCUUAACCAAAGCACGGCA", "GCGCUUCGGCGCAAAGCGCUUCGGCGC"]
+
+
+def test_tune_solver_params(data_dir):
+    candidate_params = {
+        "default": {},
+        "single_worker": {"num_workers": 1},
+        "fixed_search": {"num_workers": 1, "search_branching": "FIXED_SEARCH"},
+    }
+
+    result = tune_solver_params(
+        SEQUENCES, data_dir, candidate_params=candidate_params, n_repeats=2
+    )
+
+    assert len(result.trials) == len(SEQUENCES) * len(candidate_params) * 2
+    assert all(trial.optimal for trial in result.trials)
+    assert result.recommended_name in candidate_params
+    assert result.recommended_params == candidate_params[result.recommended_name]
+    assert result.total_solve_seconds(result.recommended_name) == min(
+        result.total_solve_seconds(name) for name in candidate_params
+    )
+
+
+def test_no_candidate_optimal(data_dir):
+    with pytest.raises(ValueError):
+        tune_solver_params(
+            SEQUENCES[:1],
+            data_dir,
+            candidate_params={"no_time": {"max_time_in_seconds": 0.0}},
+            n_repeats=1,
+        )
+
+
+def test_solver_profile_round_trip(tmp_path):
+    profile_params = {"num_workers": 1, "search_branching": "FIXED_SEARCH"}
+    profile_path = save_solver_profile("tuned", profile_params, tmp_path)
+
+    assert load_solver_profile("tuned", tmp_path) == profile_params
+    assert load_solver_profile(str(profile_path)) == profile_params
+    assert load_solver_profile("small_models") == SOLVER_PROFILES["small_models"]
+    with pytest.raises(ValueError):
+        load_solver_profile("not_a_profile", tmp_path)
+
+
+def test_fold_with_solver_profile(sequence, data_dir, tmp_path):
+    profile_path = save_solver_profile(
+        "tuned", {"num_workers": 1, "search_branching": "FIXED_SEARCH"}, tmp_path
+    )
+    fold_result = IRfold.fold(sequence, data_dir)
+
+    assert IRfold.fold(sequence, data_dir, solver_profile=str(profile_path)) == (
+        fold_result
+    )
+    engine = IRfoldEngine(data_dir, solver_profile=str(profile_path))
+    assert engine.solver_params["search_branching"] == "FIXED_SEARCH"
+    assert engine.fold(sequence) == fold_result
+
+
+def test_solver_profile_in_cache_key(sequence, data_dir):
+    engine = IRfoldEngine(data_dir, result_cache=FoldResultCache())
+    engine.fold(sequence)
+
+    _, _, fold_report = engine.fold_with_report(sequence, solver_profile="small_models")
+
+    assert fold_report.path != "cached"
+
+
+def test_enum_parameter_by_name():
+    with pytest.raises(ValueError):
+        IRfold._new_solver({"search_branching": "NOT_A_SEARCH"})
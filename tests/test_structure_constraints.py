@@ -0,0 +1,110 @@
+import pytest
+
+from irfold import IRfold, IRfoldEngine
+from irfold.util import (
+    IRSet,
+    StructureConstraints,
+    filter_irs_by_constraints,
+    irs_pairing_positions_mask,
+)
+
+
+def _pairs_any(ir, positions):
+    (left_start, left_end), (right_start, right_end) = ir
+    return any(
+        left_start <= pos <= left_end or right_start <= pos <= right_end
+        for pos in positions
+    )
+
+
+def test_from_string():
+    constraints = StructureConstraints.from_string("x..|x.|")
+
+    assert constraints == StructureConstraints((0, 4), (3, 6))
+
+
+def test_from_string_unknown_characters():
+    with pytest.raises(ValueError):
+        StructureConstraints.from_string("x.(.)")
+
+
+@pytest.mark.parametrize(
+    "constraints",
+    [
+        StructureConstraints(unpaired=(10,)),
+        StructureConstraints(paired=(-1,)),
+        StructureConstraints(unpaired=(2,), paired=(2,)),
+    ],
+)
+def test_validate(constraints):
+    with pytest.raises(ValueError):
+        constraints.validate(10)
+
+
+def test_irs_pairing_positions_mask(sequence, data_dir):
+    ir_set = IRSet.from_irs(IRfold._find_irs(sequence, data_dir))
+    positions = [0, 5, 17, len(sequence) - 1]
+
+    mask = irs_pairing_positions_mask(ir_set, positions)
+
+    assert mask.tolist() == [_pairs_any(ir, positions) for ir in ir_set]
+
+
+def test_filter_irs_by_constraints(sequence, data_dir):
+    ir_set = IRSet.from_irs(IRfold._find_irs(sequence, data_dir))
+    constraints = StructureConstraints(unpaired=(3, 20), paired=(10,))
+
+    filtered = filter_irs_by_constraints(ir_set, constraints)
+
+    assert list(filtered) == [ir for ir in ir_set if not _pairs_any(ir, (3, 20))]
+
+
+def test_fold_unpaired_constraints(sequence, data_dir):
+    db_repr, _ = IRfold.fold(sequence, data_dir)
+    unpaired = tuple(pos for pos, c in enumerate(db_repr) if c != ".")[:4]
+
+    constrained_db_repr, obj_fn_value = IRfold.fold(
+        sequence, data_dir, constraints=StructureConstraints(unpaired=unpaired)
+    )
+
+    assert all(constrained_db_repr[pos] == "." for pos in unpaired)
+    assert obj_fn_value >= IRfold.fold(sequence, data_dir)[1]
+
+
+def test_fold_paired_constraints(sequence, data_dir):
+    db_repr, obj_fn_value = IRfold.fold(sequence, data_dir)
+    ir_set = IRSet.from_irs(IRfold._find_irs(sequence, data_dir))
+    paired = next(
+        pos
+        for pos in range(len(sequence))
+        if db_repr[pos] == "." and irs_pairing_positions_mask(ir_set, [pos]).any()
+    )
+
+    constrained_db_repr, constrained_obj_fn_value = IRfold.fold(
+        sequence, data_dir, constraints=StructureConstraints(paired=(paired,))
+    )
+
+    assert constrained_db_repr[paired] != "."
+    assert constrained_obj_fn_value >= obj_fn_value
+
+
+def test_fold_paired_constraint_cannot_be_paired(data_dir):
+    with pytest.raises(ValueError):
+        IRfold.fold(
+            "AAAAAAAAAA", data_dir, constraints=StructureConstraints(paired=(4,))
+        )
+
+
+def test_fold_paired_constraints_require_cp_sat_ir_model(sequence, data_dir):
+    engine = IRfoldEngine(out_dir=data_dir, model_formulation="helix")
+
+    with pytest.raises(ValueError):
+        engine.fold(sequence, constraints=StructureConstraints(paired=(0,)))
+
+
+def test_fold_constraints_in_cache_key(sequence):
+    engine = IRfoldEngine()
+
+    assert engine.fold_cache_key(sequence) != engine.fold_cache_key(
+        sequence, constraints=StructureConstraints(unpaired=(0,))
+    )
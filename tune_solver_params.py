@@ -0,0 +1,65 @@
+import argparse
+import random
+import tempfile
+
+from irfold import tune_solver_params
+from irfold.util import save_solver_profile
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        description="Compare CP-SAT parameter sets on IRfold's models and save the fastest that stays optimal"
+    )
+    parser.add_argument("--fasta", help="Sequence corpus, random if not given")
+    parser.add_argument("--n-seqs", type=int, default=20)
+    parser.add_argument("--min-len", type=int, default=30)
+    parser.add_argument("--max-len", type=int, default=120)
+    parser.add_argument("--n-repeats", type=int, default=3)
+    parser.add_argument("--profile-name", default="tuned")
+    args = parser.parse_args()
+
+    if args.fasta is None:
+        random.seed(0)
+        seqs = [
+            "".join(
+                random.choice("ACGU")
+                for _ in range(random.randint(args.min_len, args.max_len))
+            )
+            for _ in range(args.n_seqs)
+        ]
+    else:
+        # Each record's sequence may be wrapped over several lines
+        seqs = []
+        with open(args.fasta) as f_in:
+            for line in f_in:
+                line = line.strip()
+                if line.startswith(">"):
+                    seqs.append("")
+                elif line:
+                    if not seqs:
+                        seqs.append("")
+                    seqs[-1] += line
+        seqs = [seq for seq in seqs if seq]
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        result = tune_solver_params(
+            seqs, out_dir, n_repeats=args.n_repeats, show_prog=True
+        )
+
+    candidate_names = list(dict.fromkeys(t.candidate_name for t in result.trials))
+    for candidate_name in candidate_names:
+        candidate_trials = [
+            t for t in result.trials if t.candidate_name == candidate_name
+        ]
+        n_optimal = sum(t.optimal for t in candidate_trials)
+        print(
+            f"{candidate_name:<20}: total median solve time "
+            f"{result.total_solve_seconds(candidate_name):.3f} s, "
+            f"{n_optimal}/{len(candidate_trials)} solves optimal"
+        )
+
+    profile_path = save_solver_profile(args.profile_name, result.recommended_params)
+    print(
+        f"\nRecommended parameters : {result.recommended_name} {result.recommended_params}"
+    )
+    print(f"Saved as profile       : {args.profile_name} ({profile_path})")